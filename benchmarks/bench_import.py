@@ -0,0 +1,147 @@
+"""Cold start cost of the client: import time and first request.
+
+Usage: python benchmarks/bench_import.py [--runs N] [--top N]
+           [--transports requests,stdlib] [--max-ms MS]
+
+Every run happens in a fresh interpreter, so nothing is cached in
+sys.modules. For each transport the script reports the median time of
+'import paywhirl', of creating a client and of its first get_account()
+against the stub server, and whether requests and asyncio ended up
+loaded. It then lists the modules with the highest self import time
+under 'python -X importtime -c "import paywhirl"'.
+
+With --max-ms, the script exits with status 1 when, with any of the
+transports, importing paywhirl and creating a client takes longer than
+the budget (medians, in milliseconds).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# run in the child interpreter, timing each step of a cold start
+COLD_START = '''
+import sys, time, json
+started = time.perf_counter()
+import paywhirl
+imported = time.perf_counter()
+pw = paywhirl.PayWhirl('key', 'secret', api_base=sys.argv[1], transport=sys.argv[2])
+created = time.perf_counter()
+pw.get_account()
+called = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'client_ms': (created - imported) * 1000,
+    'first_call_ms': (called - created) * 1000,
+    'requests': 'requests' in sys.modules,
+    'asyncio': 'asyncio' in sys.modules,
+}))
+'''
+
+
+def child_env() -> Dict[str, str]:
+    """The environment of child interpreters, importing this checkout."""
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, (ROOT, env.get('PYTHONPATH'))))
+    return env
+
+
+def start_stub() -> Tuple[subprocess.Popen, str]:
+    """Run stub_server.py in a child process and return it with its URL."""
+
+    command = [sys.executable, os.path.join(ROOT, 'benchmarks', 'stub_server.py'),
+               '--port', '0']
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, universal_newlines=True)
+    line = process.stdout.readline()
+    return process, line.split()[-1]
+
+
+def cold_start(url: str, transport: str) -> Dict[str, float]:
+    """Time one cold start in a fresh interpreter."""
+
+    output = subprocess.check_output(
+        [sys.executable, '-c', COLD_START, url, transport],
+        env=child_env(), universal_newlines=True)
+    return json.loads(output)
+
+
+def import_times() -> Tuple[int, Dict[str, int]]:
+    """Return the total import time of paywhirl, in µs, and the self
+    import time of every module it imports."""
+
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import paywhirl'],
+        env=child_env(), stderr=subprocess.PIPE, universal_newlines=True,
+        check=True).stderr
+    total = 0
+    times = {}
+    started = False
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        name = fields[2].strip()
+        if started:
+            times[name] = int(fields[0])
+            if name == 'paywhirl':
+                total = int(fields[1])
+        elif name == 'site':
+            # site and its imports come first and are not paywhirl's
+            started = True
+    return total, times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--runs', type=int, default=15)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--transports', default='requests,stdlib')
+    parser.add_argument('--max-ms', type=float)
+    args = parser.parse_args()
+
+    process, url = start_stub()
+    over = []
+    try:
+        print('{0:<10} {1:>10} {2:>10} {3:>14} {4:>9} {5:>8}'.format(
+            'transport', 'import ms', 'client ms', 'first call ms', 'requests', 'asyncio'))
+        for transport in args.transports.split(','):
+            runs = [cold_start(url, transport) for _ in range(args.runs)]
+            result = dict((key, statistics.median(run[key] for run in runs))
+                          for key in ('import_ms', 'client_ms', 'first_call_ms'))
+            print('{0:<10} {1:>10.1f} {2:>10.1f} {3:>14.1f} {4:>9} {5:>8}'.format(
+                transport, result['import_ms'], result['client_ms'], result['first_call_ms'],
+                'loaded' if runs[-1]['requests'] else '-',
+                'loaded' if runs[-1]['asyncio'] else '-'))
+            ready = result['import_ms'] + result['client_ms']
+            if args.max_ms is not None and ready > args.max_ms:
+                over.append((transport, ready))
+    finally:
+        process.terminate()
+        process.wait()
+
+    samples = [import_times() for _ in range(args.runs)]
+    medians = dict((name, statistics.median(times.get(name, 0) for _, times in samples))
+                   for name in samples[0][1])
+    print()
+    print('import paywhirl: {0:.1f} ms under -X importtime'.format(
+        statistics.median(total for total, _ in samples) / 1000))
+    ranked = sorted(medians.items(), key=lambda item: item[1], reverse=True)  # type: List
+    for name, micros in ranked[:args.top]:
+        print('  {0:>8.2f} ms  {1}'.format(micros / 1000, name))
+
+    for transport, ready in over:
+        print('OVER BUDGET {0}: a client is ready after {1:.1f} ms, budget {2} ms'.format(
+            transport, ready, args.max_ms))
+    if over:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
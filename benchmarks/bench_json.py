@@ -0,0 +1,62 @@
+"""Compare the JSON codecs on list-endpoint sized payloads.
+
+Usage: python benchmarks/bench_json.py [rounds]
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from paywhirl.codec import CODECS # pylint: disable=wrong-import-position
+
+
+def customer(index: int) -> dict:
+    """A customer record shaped like the ones get_customers() returns."""
+
+    return {
+        'id': 100000 + index,
+        'user_id': 42,
+        'first_name': 'First' + str(index),
+        'last_name': 'Last' + str(index),
+        'email': str.format('customer{0}@example.com', index),
+        'phone': '555-0100',
+        'address': str.format('{0} Main Street', index),
+        'city': 'Springfield',
+        'state': 'IL',
+        'zip': '62701',
+        'country': 'US',
+        'currency': 'USD',
+        'gateway_type': 'Stripe',
+        'gateway_id': 7,
+        'gateway_reference': str.format('cus_{0:016x}', index),
+        'default_card': 9000 + index,
+        'utm_source': '',
+        'deleted_at': None,
+        'created_at': '2020-01-01 00:00:00',
+        'updated_at': '2020-06-01 12:30:00',
+        'metadata': {'tags': ['vip', 'newsletter'], 'score': index * 0.5},
+    }
+
+
+def main() -> None:
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    for size in (100, 500):
+        page = [customer(index) for index in range(size)]
+        raw = CODECS['stdlib']().dumps(page)
+        print(str.format('page of {0} customers, {1} KiB', size, len(raw) // 1024))
+        for name, factory in CODECS.items():
+            try:
+                codec = factory()
+            except ImportError:
+                print(str.format('  {0:<8} not installed', name))
+                continue
+            loads = timeit.timeit(lambda: codec.loads(raw), number=rounds) / rounds
+            dumps = timeit.timeit(lambda: codec.dumps(page), number=rounds) / rounds
+            print(str.format('  {0:<8} loads {1:8.1f} us   dumps {2:8.1f} us',
+                             name, loads * 1e6, dumps * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""Compare per-call latency with and without the pooled session.
+
+Usage: python benchmarks/bench_pool.py [calls]
+"""
+
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from paywhirl import PayWhirl # pylint: disable=wrong-import-position
+from stub_server import serve # pylint: disable=wrong-import-position
+
+
+def per_call(label: str, func, calls: int) -> None:
+    """Run func calls times and print the mean latency."""
+
+    func()  # warm up
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    elapsed = time.perf_counter() - start
+    print('{0:<24} {1:8.1f} us/call'.format(label, elapsed / calls * 1e6))
+
+
+def main() -> None:
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    server, url = serve()
+
+    headers = {'api-key': 'key', 'api-secret': 'secret'}
+    per_call('unpooled requests.get',
+             lambda: requests.get(url + '/account', headers=headers).json(),
+             calls)
+
+    with PayWhirl('key', 'secret', api_base=url) as pw:
+        per_call('pooled PayWhirl', pw.get_account, calls)
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,311 @@
+"""Client throughput, latency and memory against the replaying stub server.
+
+Usage: python benchmarks/bench_suite.py [--calls N] [--workers N]
+           [--modes serial,pooled,threaded,async]
+           [--transports requests,stdlib,urllib3,http2,memory] [--latency S]
+           [--error-rate F] [--throttle-rate F]
+           [--save results.json] [--baseline results.json] [--tolerance F]
+
+The stub server runs in a separate process, so that it does not compete
+with the client for the GIL. Every mode makes the same mix of endpoint
+calls (see WORKLOAD):
+
+    serial    one thread, a new connection per call (keep_alive=False)
+    pooled    one thread, connections reused
+    threaded  --workers threads sharing one pooled client
+    async     AsyncPayWhirl with --workers calls in flight
+
+The synchronous modes are run with every transport of --transports
+(see paywhirl.transport), and reported as mode/transport except with the
+default 'requests':
+
+    http2     HTTP2Transport(prior_knowledge=True) against a second stub
+              server speaking cleartext HTTP/2, so that the threaded mode
+              multiplexes every call over a single connection
+    memory    MemoryTransport answering from the fixtures, without any
+              network: the overhead of the client alone
+
+For each mode calls/s, p50 and p99 latency and the peak memory allocated
+by a shorter traced run are reported. With --baseline, the script exits
+with status 1 when calls/s dropped, or p99 grew, by more than --tolerance
+compared to a run saved with --save.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from paywhirl import PayWhirl
+from paywhirl.transport import HTTP2Transport, MemoryTransport, TRANSPORTS
+from stub_server import load_fixtures
+
+MODES = ('serial', 'pooled', 'threaded', 'async')
+TRANSPORT_NAMES = tuple(TRANSPORTS) + ('memory',)
+
+# the responses of the memory transport, loaded once
+FIXTURES = {}  # type: Dict[str, Any]
+
+
+class Target(NamedTuple):
+    """The transport of a run and the stub servers it can use."""
+
+    transport: str
+    url: str
+    h2_url: Optional[str] = None
+
+
+# (endpoint method, arguments), called in turn
+WORKLOAD = (
+    ('get_customer', (1,)),
+    ('get_customers', ({'limit': 100},)),
+    ('get_subscription', (1,)),
+    ('get_invoices', (1,)),
+    ('get_plans', ({'limit': 20},)),
+    ('get_account', ()),
+    ('create_charge', ({'customer_id': 1, 'amount': '16.88'},)),
+    ('mark_invoice_as_paid', (1,)),
+)
+
+
+def start_stub(args: argparse.Namespace, http2: bool = False) -> Tuple[subprocess.Popen, str]:
+    """Run stub_server.py in a child process and return it with its URL."""
+
+    command = [sys.executable, os.path.join(os.path.dirname(__file__), 'stub_server.py'),
+               '--port', '0', '--seed', '1',
+               '--latency', str(args.latency),
+               '--error-rate', str(args.error_rate),
+               '--throttle-rate', str(args.throttle_rate),
+               '--retry-after', '0.05']
+    if http2:
+        command.append('--http2')
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, universal_newlines=True)
+    line = process.stdout.readline()
+    return process, line.split()[-1]
+
+
+def client(target: Target, **kwargs: Any) -> PayWhirl:
+    """Create a client using the transport of target."""
+
+    if target.transport == 'memory':
+        if not FIXTURES:
+            FIXTURES.update(load_fixtures())
+        return PayWhirl('key', 'secret', transport=MemoryTransport(FIXTURES), **kwargs)
+    if target.transport == 'http2':
+        transport = HTTP2Transport(pool_maxsize=kwargs.pop('pool_maxsize', 10),
+                                   prior_knowledge=True)
+        return PayWhirl('key', 'secret', api_base=target.h2_url, transport=transport, **kwargs)
+    return PayWhirl('key', 'secret', api_base=target.url, transport=target.transport, **kwargs)
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Return a percentile of an already sorted list."""
+
+    return ordered[int(round(fraction * (len(ordered) - 1)))]
+
+
+def calls(count: int) -> List[Tuple[str, tuple]]:
+    """Return count calls of the workload."""
+
+    return [WORKLOAD[index % len(WORKLOAD)] for index in range(count)]
+
+
+def timed(pw: Any, call: Tuple[str, tuple], latencies: List[float],
+          errors: List[BaseException]) -> None:
+    """Make one call, recording its latency or its error."""
+
+    started = time.perf_counter()
+    try:
+        getattr(pw, call[0])(*call[1])
+    except Exception as err: # pylint: disable=broad-except
+        errors.append(err)
+    latencies.append(time.perf_counter() - started)
+
+
+async def atimed(pw: Any, call: Tuple[str, tuple], latencies: List[float],
+                 errors: List[BaseException]) -> None:
+    """Async counterpart of timed()."""
+
+    started = time.perf_counter()
+    try:
+        await getattr(pw, call[0])(*call[1])
+    except Exception as err: # pylint: disable=broad-except
+        errors.append(err)
+    latencies.append(time.perf_counter() - started)
+
+
+def run_serial(target: Target, todo: List[Tuple[str, tuple]], workers: int,
+               latencies: List[float], errors: List[BaseException]) -> None:
+    # pylint: disable=unused-argument
+    with client(target, keep_alive=False) as pw:
+        for call in todo:
+            timed(pw, call, latencies, errors)
+
+
+def run_pooled(target: Target, todo: List[Tuple[str, tuple]], workers: int,
+               latencies: List[float], errors: List[BaseException]) -> None:
+    # pylint: disable=unused-argument
+    with client(target) as pw:
+        for call in todo:
+            timed(pw, call, latencies, errors)
+
+
+def run_threaded(target: Target, todo: List[Tuple[str, tuple]], workers: int,
+                 latencies: List[float], errors: List[BaseException]) -> None:
+    with client(target, pool_maxsize=workers) as pw:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for call in todo:
+                executor.submit(timed, pw, call, latencies, errors)
+
+
+def run_async(target: Target, todo: List[Tuple[str, tuple]], workers: int,
+              latencies: List[float], errors: List[BaseException]) -> None:
+    from paywhirl.aio import AsyncPayWhirl # pylint: disable=import-outside-toplevel
+
+    async def worker(pw: Any, queue: Iterator[Tuple[str, tuple]]) -> None:
+        for call in queue:
+            await atimed(pw, call, latencies, errors)
+
+    async def main() -> None:
+        # as many workers as calls in flight, so that latencies do not
+        # include time spent waiting for a turn
+        queue = iter(todo)
+        async with AsyncPayWhirl('key', 'secret', api_base=target.url,
+                                 pool_maxsize=workers, max_concurrency=workers) as pw:
+            await asyncio.gather(*[worker(pw, queue) for _ in range(workers)])
+
+    asyncio.run(main())
+
+
+RUNNERS = {
+    'serial': run_serial,
+    'pooled': run_pooled,
+    'threaded': run_threaded,
+    'async': run_async,
+}  # type: Dict[str, Callable[..., None]]
+
+
+def measure(mode: str, target: Target, count: int, workers: int) -> Dict[str, float]:
+    """Benchmark one mode and return its results."""
+
+    runner = RUNNERS[mode]
+    runner(target, calls(len(WORKLOAD)), workers, [], [])  # warm up
+
+    latencies = []  # type: List[float]
+    errors = []  # type: List[BaseException]
+    started = time.perf_counter()
+    runner(target, calls(count), workers, latencies, errors)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    # tracing allocations slows everything down, so memory is measured
+    # on a separate, shorter run
+    tracemalloc.start()
+    runner(target, calls(max(len(WORKLOAD), count // 10)), workers, [], [])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'calls_per_sec': count / elapsed,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'peak_kib': peak / 1024,
+        'errors': len(errors),
+    }
+
+
+def regressions(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+                tolerance: float) -> List[str]:
+    """Describe every mode that got slower than the baseline."""
+
+    found = []
+    for mode, result in results.items():
+        before = baseline.get(mode)
+        if before is None:
+            continue
+        if result['calls_per_sec'] < before['calls_per_sec'] * (1 - tolerance):
+            found.append('{0}: {1:.0f} calls/s, was {2:.0f}'.format(
+                mode, result['calls_per_sec'], before['calls_per_sec']))
+        if result['p99_ms'] > before['p99_ms'] * (1 + tolerance):
+            found.append('{0}: p99 {1:.2f} ms, was {2:.2f}'.format(
+                mode, result['p99_ms'], before['p99_ms']))
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--calls', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--modes', default=','.join(MODES))
+    parser.add_argument('--transports', default='requests')
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--save')
+    parser.add_argument('--baseline')
+    parser.add_argument('--tolerance', type=float, default=0.15)
+    args = parser.parse_args()
+    transports = args.transports.split(',')
+    unknown = [name for name in transports if name not in TRANSPORT_NAMES]
+    if unknown:
+        parser.error('unknown transport: ' + ', '.join(unknown))
+
+    processes = []
+    results = {}
+    try:
+        process, url = start_stub(args)
+        processes.append(process)
+        h2_url = None
+        if 'http2' in transports:
+            process, h2_url = start_stub(args, http2=True)
+            processes.append(process)
+
+        print('{0:<18} {1:>10} {2:>9} {3:>9} {4:>10} {5:>7}'.format(
+            'mode', 'calls/s', 'p50 ms', 'p99 ms', 'peak KiB', 'errors'))
+        for transport in transports:
+            target = Target(transport, url, h2_url)
+            for mode in args.modes.split(','):
+                if mode == 'async':
+                    # AsyncPayWhirl always uses aiohttp
+                    if transport != transports[0]:
+                        continue
+                    label = mode
+                else:
+                    label = mode if transport == 'requests' else mode + '/' + transport
+                try:
+                    result = measure(mode, target, args.calls, args.workers)
+                except ImportError as err:
+                    print('{0:<18} skipped: {1}'.format(label, err))
+                    continue
+                results[label] = result
+                print('{0:<18} {1:>10.0f} {2:>9.2f} {3:>9.2f} {4:>10.0f} {5:>7}'.format(
+                    label, result['calls_per_sec'], result['p50_ms'], result['p99_ms'],
+                    result['peak_kib'], result['errors']))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as out:
+            json.dump(results, out, indent=1)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as stored:
+            found = regressions(results, json.load(stored), args.tolerance)
+        for line in found:
+            print('REGRESSION', line)
+        if found:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
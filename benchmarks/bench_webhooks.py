@@ -0,0 +1,244 @@
+"""Webhook ingestion throughput for a burst of redelivered events.
+
+Usage: python benchmarks/bench_webhooks.py [--events N] [--duplicates F]
+           [--workers 1,8,32] [--producers N] [--work-ms MS]
+           [--modes inline,threaded,async] [--logs memory,sqlite]
+
+Replays a burst of --events signed webhook payloads built from the
+records of fixtures.json, with a --duplicates fraction of them delivered
+a second time, in random order. --producers threads (tasks in the async
+mode) call receive() like the request threads of a web server. Handlers
+simulate --work-ms of I/O each:
+
+    inline    WebhookDispatcher(max_workers=0), handlers run in receive()
+    threaded  WebhookDispatcher with each --workers count
+    async     AsyncWebhookDispatcher with each --workers count
+
+Redeliveries are recognised by an EventLog in memory, or in a sqlite
+file with --logs sqlite. For each run the script reports how fast
+receive() returns (accepted/s, i.e. how fast webhook requests can be
+answered), how fast the burst is handled, the p50 and p99 latency from
+receiving an event to the end of its handler, and the redeliveries
+dropped. Events not handled exactly once are counted as errors.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# pylint: disable=wrong-import-position
+from paywhirl.backends import SQLiteBackend
+from paywhirl.webhooks import AsyncWebhookDispatcher, EventLog, WebhookDispatcher, sign
+from stub_server import load_fixtures
+
+MODES = ('inline', 'threaded', 'async')
+LOGS = ('memory', 'sqlite')
+
+SECRET = 'whsec_bench'
+
+# (event type, fixture of its record)
+EVENT_TYPES = (
+    ('invoice.created', 'GET /invoice/{id}'),
+    ('invoice.paid', 'GET /invoice/{id}'),
+    ('subscription.created', 'GET /subscription/{id}'),
+    ('subscription.updated', 'GET /subscription/{id}'),
+    ('customer.updated', 'GET /customer/{id}'),
+)
+
+
+class Delivery(NamedTuple):
+    """One webhook request of the burst."""
+
+    event_id: str
+    body: bytes
+    signature: str
+
+
+class Tally:
+    """What the handlers of one run saw, shared by every thread."""
+
+    def __init__(self) -> None:
+        self.received = {}  # type: Dict[str, float]
+        self.handled = {}  # type: Dict[str, int]
+        self.latencies = []  # type: List[float]
+        self.lock = threading.Lock()
+
+    def start(self, event_id: str) -> None:
+        """Stamp the first delivery of an event."""
+
+        self.received.setdefault(event_id, time.perf_counter())
+
+    def finish(self, event_id: str) -> None:
+        """Record that a handler of the event completed."""
+
+        now = time.perf_counter()
+        with self.lock:
+            self.handled[event_id] = self.handled.get(event_id, 0) + 1
+            self.latencies.append(now - self.received[event_id])
+
+
+def burst(count: int, duplicates: float, seed: int = 1) -> Tuple[List[Delivery], int]:
+    """Return the deliveries of a burst and the number of unique events."""
+
+    fixtures = load_fixtures()
+    rng = random.Random(seed)
+    deliveries = []
+    for index in range(count):
+        event_type, fixture = EVENT_TYPES[index % len(EVENT_TYPES)]
+        event_id = str.format('evt_{0:08d}', index)
+        body = json.dumps({'id': event_id, 'type': event_type,
+                           'created_at': 1555237351 + index,
+                           'data': fixtures[fixture]}).encode('utf-8')
+        deliveries.append(Delivery(event_id, body, sign(body, SECRET)))
+    deliveries.extend(rng.sample(deliveries, int(count * duplicates)))
+    rng.shuffle(deliveries)
+    return deliveries, count
+
+
+def event_log(kind: str, directory: str) -> EventLog:
+    """Create an empty EventLog of the given kind."""
+
+    if kind == 'sqlite':
+        path = tempfile.mktemp(suffix='.sqlite', dir=directory)
+        return EventLog(backend=SQLiteBackend(path, maxsize=10 ** 6))
+    return EventLog()
+
+
+def produce(deliveries: List[Delivery], producers: int,
+            receive: Callable[[Delivery], Any]) -> None:
+    """Call receive() for every delivery from producers threads."""
+
+    def worker(share: List[Delivery]) -> None:
+        for delivery in share:
+            receive(delivery)
+
+    threads = [threading.Thread(target=worker, args=(deliveries[index::producers],))
+               for index in range(producers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def run_threaded(deliveries: List[Delivery], log: EventLog, workers: int,
+                 args: argparse.Namespace, tally: Tally) -> Tuple[float, float, Dict]:
+    """Replay the burst through a WebhookDispatcher."""
+
+    work = args.work_ms / 1000
+
+    def handler(event: Any) -> None:
+        if work:
+            time.sleep(work)
+        tally.finish(event.id)
+
+    def receive(delivery: Delivery) -> None:
+        tally.start(delivery.event_id)
+        hooks.receive(delivery.body, delivery.signature, timeout=None)
+
+    hooks = WebhookDispatcher(SECRET, max_workers=workers, queue_size=args.queue_size,
+                              log=log)
+    hooks.on('*', handler)
+    started = time.perf_counter()
+    produce(deliveries, args.producers, receive)
+    accepted = time.perf_counter() - started
+    hooks.close()
+    return accepted, time.perf_counter() - started, hooks.stats()
+
+
+def run_async(deliveries: List[Delivery], log: EventLog, workers: int,
+              args: argparse.Namespace, tally: Tally) -> Tuple[float, float, Dict]:
+    """Replay the burst through an AsyncWebhookDispatcher."""
+
+    work = args.work_ms / 1000
+
+    async def handler(event: Any) -> None:
+        if work:
+            await asyncio.sleep(work)
+        tally.finish(event.id)
+
+    async def producer(hooks: AsyncWebhookDispatcher, share: List[Delivery]) -> None:
+        for delivery in share:
+            tally.start(delivery.event_id)
+            await hooks.receive(delivery.body, delivery.signature, timeout=None)
+
+    async def main() -> Tuple[float, float, Dict]:
+        hooks = AsyncWebhookDispatcher(SECRET, max_workers=workers,
+                                       queue_size=args.queue_size, log=log)
+        hooks.on('*', handler)
+        started = time.perf_counter()
+        await asyncio.gather(*[producer(hooks, deliveries[index::args.producers])
+                               for index in range(args.producers)])
+        accepted = time.perf_counter() - started
+        await hooks.close()
+        return accepted, time.perf_counter() - started, hooks.stats()
+
+    return asyncio.run(main())
+
+
+def measure(mode: str, log: EventLog, workers: int, deliveries: List[Delivery],
+            unique: int, args: argparse.Namespace) -> Dict[str, float]:
+    """Replay the burst once and return the results."""
+
+    tally = Tally()
+    if mode == 'async':
+        accepted, elapsed, stats = run_async(deliveries, log, workers, args, tally)
+    else:
+        accepted, elapsed, stats = run_threaded(
+            deliveries, log, workers if mode == 'threaded' else 0, args, tally)
+    latencies = sorted(tally.latencies)
+    once = sum(1 for count in tally.handled.values() if count == 1)
+    return {
+        'accepted_per_sec': len(deliveries) / accepted,
+        'handled_per_sec': unique / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p99_ms': latencies[int(round(0.99 * (len(latencies) - 1)))] * 1000,
+        'dropped': stats['duplicates'],
+        'errors': unique - once,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--events', type=int, default=20000)
+    parser.add_argument('--duplicates', type=float, default=0.1)
+    parser.add_argument('--workers', default='1,8,32')
+    parser.add_argument('--producers', type=int, default=8)
+    parser.add_argument('--queue-size', type=int, default=1000)
+    parser.add_argument('--work-ms', type=float, default=1.0)
+    parser.add_argument('--modes', default=','.join(MODES))
+    parser.add_argument('--logs', default='memory')
+    args = parser.parse_args()
+
+    deliveries, unique = burst(args.events, args.duplicates)
+    print('{0} deliveries of {1} events, handlers taking {2} ms'.format(
+        len(deliveries), unique, args.work_ms))
+    print('{0:<22} {1:>11} {2:>10} {3:>9} {4:>9} {5:>8} {6:>7}'.format(
+        'mode', 'accepted/s', 'handled/s', 'p50 ms', 'p99 ms', 'dropped', 'errors'))
+    with tempfile.TemporaryDirectory() as directory:
+        for kind in args.logs.split(','):
+            for mode in args.modes.split(','):
+                counts = [0] if mode == 'inline' else [
+                    int(count) for count in args.workers.split(',')]
+                for workers in counts:
+                    label = mode if mode == 'inline' else mode + '/' + str(workers)
+                    if kind != 'memory':
+                        label += '/' + kind
+                    result = measure(mode, event_log(kind, directory), workers,
+                                     deliveries, unique, args)
+                    print('{0:<22} {1:>11.0f} {2:>10.0f} {3:>9.2f} {4:>9.2f} {5:>8} {6:>7}'.format(
+                        label, result['accepted_per_sec'], result['handled_per_sec'],
+                        result['p50_ms'], result['p99_ms'], result['dropped'],
+                        result['errors']))
+
+
+if __name__ == '__main__':
+    main()
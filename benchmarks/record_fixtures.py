@@ -0,0 +1,83 @@
+"""Record the GET responses of a real (test) account into fixtures.json.
+
+Usage: PAYWHIRL_KEY=... PAYWHIRL_SECRET=... python benchmarks/record_fixtures.py
+
+Only read-only endpoints are called. The ids of the first customer, plan,
+invoice, etc. returned by the list endpoints are used for the per-record
+endpoints. Responses of mutating endpoints stay as they are in the file.
+Review the result before committing it: it contains real account data.
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from paywhirl import PayWhirl # pylint: disable=wrong-import-position
+from paywhirl.cache import route # pylint: disable=wrong-import-position
+from stub_server import FIXTURES, load_fixtures # pylint: disable=wrong-import-position
+
+
+def first_id(records: object) -> object:
+    """Return the id of the first record of a list response, or None."""
+
+    if isinstance(records, list) and records and isinstance(records[0], dict):
+        return records[0].get('id')
+    return None
+
+
+def main() -> None:
+    pw = PayWhirl(os.environ['PAYWHIRL_KEY'], os.environ['PAYWHIRL_SECRET'],
+                  api_base=os.environ.get('PAYWHIRL_BASE', 'https://api.paywhirl.com'))
+    fixtures = load_fixtures()
+    recorded = {}
+
+    def record(path: str, method, *args) -> object:
+        body = method(*args)
+        recorded['GET ' + route(path)] = body
+        return body
+
+    customer = first_id(record('/customers', pw.get_customers, {'limit': 100}))
+    plan = first_id(record('/plans', pw.get_plans, {'limit': 100}))
+    record('/subscribers', pw.get_subscribers, {'limit': 100})
+    gateway = first_id(record('/gateways', pw.get_gateways))
+    promo = first_id(record('/promo', pw.get_promos))
+    shipping = first_id(record('/shipping/', pw.get_shipping_rules))
+    tax = first_id(record('/tax', pw.get_tax_rules))
+    record('/questions', pw.get_questions)
+    record('/account', pw.get_account)
+    record('/stats', pw.get_stats)
+
+    if customer is not None:
+        record('/customer/1', pw.get_customer, customer)
+        record('/customer/profile/1', pw.get_profile, customer)
+        record('/answers', pw.get_answers, customer)
+        address = first_id(record('/customer/addresses/1', pw.get_addresses, customer))
+        card = first_id(record('/cards/1', pw.get_cards, customer))
+        subscription = first_id(record('/subscriptions/1', pw.get_subscriptions, customer))
+        invoice = first_id(record('/invoices/1', pw.get_invoices, customer, True))
+        for path, method, record_id in (
+                ('/customer/address/1', pw.get_address, address),
+                ('/card/1', pw.get_card, card),
+                ('/subscription/1', pw.get_subscription, subscription),
+                ('/invoice/1', pw.get_invoice, invoice)):
+            if record_id is not None:
+                record(path, method, record_id)
+    for path, method, record_id in (
+            ('/plan/1', pw.get_plan, plan),
+            ('/gateway/1', pw.get_gateway, gateway),
+            ('/promo/1', pw.get_promo, promo),
+            ('/shipping/1', pw.get_shipping_rule, shipping),
+            ('/tax/1', pw.get_tax_rule, tax)):
+        if record_id is not None:
+            record(path, method, record_id)
+
+    fixtures.update(recorded)
+    with open(FIXTURES, 'w', encoding='utf-8') as out:
+        json.dump(fixtures, out, indent=1, sort_keys=True)
+    print('recorded', len(recorded), 'GET fixtures into', FIXTURES)
+
+
+if __name__ == '__main__':
+    main()
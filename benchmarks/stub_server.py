@@ -0,0 +1,313 @@
+"""Local stand-in for api.paywhirl.com used by the benchmarks.
+
+Requests are answered from recorded fixtures (fixtures.json, keyed by
+'METHOD /route/{id}' as in paywhirl.metrics) covering every endpoint of
+the client. List fixtures honour 'limit' and the 'after_id' and
+'starting_after' cursors, so pagination terminates. Without a matching
+fixture, a GET answers {'id': 1, 'path': ...} and other verbs echo the
+request body back.
+
+The server speaks HTTP/1.1 so that clients can keep connections alive.
+Responses carry an ETag and GETs honour If-None-Match with 304 Not
+Modified. Latency, server errors and 429 rate limiting can be injected:
+
+    python benchmarks/stub_server.py --port 8321 --latency 0.02 \\
+        --error-rate 0.01 --throttle-rate 0.05
+
+With --http2, the server speaks cleartext HTTP/2 (h2c) instead, to
+measure HTTP2Transport(prior_knowledge=True) multiplexing calls over
+a single connection. It needs the h2 package.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import socket
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from paywhirl.cache import route # pylint: disable=wrong-import-position
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures.json')
+
+CURSORS = ('after_id', 'starting_after')
+
+
+def load_fixtures(path: str = FIXTURES) -> Dict[str, Any]:
+    """Read a fixtures file."""
+
+    with open(path, encoding='utf-8') as fixtures:
+        return json.load(fixtures)
+
+
+class StubServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer holding the fixtures and fault injection settings.
+
+    Attributes:
+        fixtures: response bodies keyed by 'METHOD /route'.
+        latency: seconds added to every response.
+        jitter: extra random latency, up to this many seconds.
+        error_rate: the fraction of requests answered with a 500.
+        throttle_rate: the fraction of requests answered with a 429
+            and a Retry-After header.
+        retry_after: the Retry-After value sent with a 429, in seconds.
+    """
+
+    daemon_threads = True
+    # the default backlog of 5 drops connections opened in bursts
+    request_queue_size = 128
+
+    def __init__(self, address: Tuple[str, int], fixtures: Dict[str, Any] = None,
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, retry_after: float = 1.0,
+                 seed: Optional[int] = None) -> None:
+        super().__init__(address, StubHandler)
+        self.fixtures = fixtures if fixtures is not None else {}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def roll(self) -> Tuple[float, float]:
+        """Return a random fault draw and a random jitter for one request."""
+
+        with self._lock:
+            return self._random.random(), self._random.random() * self.jitter
+
+    def respond(self, method: str, target: str, body: bytes,
+                if_none_match: Optional[str] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """Answer one request: return its status, headers and body."""
+
+        draw, jitter = self.roll()
+        if self.latency or jitter:
+            time.sleep(self.latency + jitter)
+        if draw < self.throttle_rate:
+            return 429, {'Retry-After': str(self.retry_after),
+                         'Content-Type': 'application/json'}, b'{"error":"Too Many Requests"}'
+        if draw < self.throttle_rate + self.error_rate:
+            return 500, {'Content-Type': 'application/json'}, b'{"error":"Internal Server Error"}'
+
+        url = urlsplit(target)
+        fixture = self.fixtures.get(method + ' ' + route(url.path))
+        if fixture is None:
+            if method == 'GET':
+                fixture = {'id': 1, 'path': target}
+            else:
+                fixture = json.loads(body.decode('utf-8') or '{}')
+        elif isinstance(fixture, list):
+            fixture = _page(fixture, parse_qs(url.query))
+
+        payload = json.dumps(fixture).encode('utf-8')
+        etag = '"' + hashlib.sha1(payload).hexdigest() + '"'
+        if method == 'GET' and if_none_match == etag:
+            return 304, {'ETag': etag}, b''
+        return 200, {'ETag': etag, 'Content-Type': 'application/json'}, payload
+
+
+def _page(records: list, query: Dict[str, list]) -> list:
+    for cursor in CURSORS:
+        if cursor in query:
+            after = int(query[cursor][0])
+            records = [record for record in records if record.get('id', 0) > after]
+    if 'limit' in query:
+        records = records[:int(query['limit'][0])]
+    return records
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answer requests from the server's fixtures."""
+
+    protocol_version = 'HTTP/1.1'
+    # headers and body are written separately; without this, Nagle's
+    # algorithm adds ~40ms of delayed-ACK latency to every response
+    disable_nagle_algorithm = True
+
+    server: StubServer
+
+    def log_message(self, *args) -> None: # pylint: disable=arguments-differ
+        pass
+
+    def _send(self, status: int, body: bytes = b'', headers: Dict[str, str] = None) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if self.headers.get('Connection', '').lower() == 'close':
+            # like real servers, so that the client does not reuse it
+            self.send_header('Connection', 'close')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self) -> None:
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        status, headers, body = self.server.respond(
+            self.command, self.path, raw, self.headers.get('If-None-Match'))
+        self._send(status, body, headers)
+
+    do_GET = do_POST = do_PATCH = do_DELETE = _handle
+
+
+class H2StubHandler(socketserver.BaseRequestHandler):
+    """Answer requests over cleartext HTTP/2 (h2c with prior knowledge).
+
+    Each stream is answered on its own thread, so that concurrent
+    requests multiplexed over the connection are served concurrently.
+    """
+
+    server: StubServer
+
+    def setup(self) -> None:
+        # pylint: disable=import-outside-toplevel,import-error
+        import h2.config
+        import h2.connection
+
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.conn = h2.connection.H2Connection(
+            h2.config.H2Configuration(client_side=False, header_encoding='utf-8'))
+        # held while using conn; notified when the client opens its window
+        self.window = threading.Condition()
+        self.closed = False
+
+    def _flush(self) -> None:
+        data = self.conn.data_to_send()
+        if data:
+            self.request.sendall(data)
+
+    def handle(self) -> None:
+        # pylint: disable=import-outside-toplevel,import-error
+        import h2.events
+        import h2.exceptions
+
+        with self.window:
+            self.conn.initiate_connection()
+            self._flush()
+        streams = {}  # type: Dict[int, Tuple[Dict[str, str], bytearray]]
+        try:
+            while True:
+                data = self.request.recv(65536)
+                if not data:
+                    return
+                with self.window:
+                    try:
+                        events = self.conn.receive_data(data)
+                    except h2.exceptions.ProtocolError:
+                        # a misbehaving client: end the connection, as
+                        # real servers do
+                        self.conn.close_connection()
+                        self._flush()
+                        return
+                    for event in events:
+                        if isinstance(event, h2.events.RequestReceived):
+                            streams[event.stream_id] = (dict(event.headers), bytearray())
+                        elif isinstance(event, h2.events.DataReceived):
+                            streams[event.stream_id][1].extend(event.data)
+                            self.conn.acknowledge_received_data(
+                                event.flow_controlled_length, event.stream_id)
+                        elif isinstance(event, h2.events.StreamEnded):
+                            headers, body = streams.pop(event.stream_id)
+                            threading.Thread(target=self._answer, daemon=True,
+                                             args=(event.stream_id, headers, bytes(body))).start()
+                        elif isinstance(event, h2.events.ConnectionTerminated):
+                            return
+                    self.window.notify_all()
+                    self._flush()
+        finally:
+            with self.window:
+                self.closed = True
+                self.window.notify_all()
+
+    def _answer(self, stream_id: int, headers: Dict[str, str], body: bytes) -> None:
+        import h2.exceptions # pylint: disable=import-outside-toplevel,import-error
+
+        status, extra, payload = self.server.respond(
+            headers[':method'], headers[':path'], body, headers.get('if-none-match'))
+        response = [(':status', str(status)), ('content-length', str(len(payload)))]
+        response.extend((name.lower(), value) for name, value in extra.items())
+        with self.window:
+            try:
+                self.conn.send_headers(stream_id, response, end_stream=not payload)
+                while payload and not self.closed:
+                    size = min(len(payload), self.conn.max_outbound_frame_size,
+                               self.conn.local_flow_control_window(stream_id))
+                    if size <= 0:
+                        self.window.wait(1.0)
+                        continue
+                    self.conn.send_data(stream_id, payload[:size],
+                                        end_stream=size == len(payload))
+                    payload = payload[size:]
+                self._flush()
+            except (h2.exceptions.ProtocolError, OSError):
+                pass  # the client went away or reset the stream
+
+
+class H2StubServer(StubServer):
+    """StubServer speaking cleartext HTTP/2 instead of HTTP/1.1."""
+
+    def __init__(self, address: Tuple[str, int], fixtures: Dict[str, Any] = None,
+                 **faults: Any) -> None:
+        super().__init__(address, fixtures, **faults)
+        self.RequestHandlerClass = H2StubHandler
+
+
+def serve(host: str = '127.0.0.1', port: int = 0, fixtures: Dict[str, Any] = None,
+          http2: bool = False, **faults: Any) -> Tuple[StubServer, str]:
+    """Start the stub server on a daemon thread and return it with its base URL.
+
+    Args:
+        host: the address to listen on.
+        port: the port to listen on, 0 for any free one.
+        fixtures: response bodies keyed by 'METHOD /route'. Defaults
+            to none, use load_fixtures() to replay fixtures.json.
+        http2: speak cleartext HTTP/2 (h2c, requires the h2 package)
+            instead of HTTP/1.1. Clients must use it from the first
+            request, like HTTP2Transport(prior_knowledge=True).
+        faults: latency, jitter, error_rate, throttle_rate, retry_after
+            and seed, see StubServer.
+    """
+
+    server = (H2StubServer if http2 else StubServer)((host, port), fixtures, **faults)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, 'http://{0}:{1}'.format(*server.server_address[:2])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8321)
+    parser.add_argument('--fixtures', default=FIXTURES)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--retry-after', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--http2', action='store_true')
+    args = parser.parse_args()
+
+    server, url = serve(args.host, args.port, load_fixtures(args.fixtures), args.http2,
+                        latency=args.latency, jitter=args.jitter,
+                        error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+                        retry_after=args.retry_after, seed=args.seed)
+    print('stub PayWhirl API listening on', url, flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,16 @@
-from .paywhirl import PayWhirl, HTTPError
+from .backends import CacheBackend, MemoryBackend, SQLiteBackend
+from .batch import BatchResult
+from .cache import ResponseCache
+from .conditional import ConditionalCache
+from .idempotency import IdempotencyStore
+from .metrics import MetricsCollector, RequestEvent
+from .paywhirl import PayWhirl
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+from .singleflight import SingleFlight
+from .transport import HTTPError, Transport
 
-__all__ = ['PayWhirl', 'HTTPError']
+__all__ = ['PayWhirl', 'HTTPError', 'BatchResult', 'RateLimiter', 'RetryPolicy',
+           'ResponseCache', 'CacheBackend', 'MemoryBackend', 'SQLiteBackend',
+           'ConditionalCache', 'SingleFlight', 'MetricsCollector', 'RequestEvent',
+           'IdempotencyStore', 'Transport']
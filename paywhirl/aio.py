@@ -0,0 +1,396 @@
+"""Asynchronous PayWhirl API client
+=================================
+
+AsyncPayWhirl exposes exactly the same methods as PayWhirl, but every
+method returns an awaitable. The endpoint methods of both clients are
+generated from the same declarations (see paywhirl.endpoints), and both
+share their configuration and hooks (see paywhirl.base), so the two can
+never drift apart.
+The stream_* and iter_* methods return async iterators instead, for
+use with "async for".
+
+Requires the optional aiohttp dependency (pip install paywhirl[async]).
+
+Example Usage:
+--------------
+```
+import asyncio
+from paywhirl.aio import AsyncPayWhirl
+
+async def main():
+    async with AsyncPayWhirl(api_key, api_secret, max_concurrency=50) as pw:
+        customers = await pw.get_customers({'limit': 100})
+        invoices = await asyncio.gather(
+            *[pw.get_invoices(c['id']) for c in customers])
+
+asyncio.run(main())
+```
+
+Requests answered with a 4xx or 5xx status raise paywhirl.HTTPError, as
+with PayWhirl; its response holds the status, headers and body.
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Iterable, Iterator, List, Optional
+
+from .base import BaseClient
+from .batch import BatchResult, amap_as_completed, amap_ordered
+from .cache import cache_key
+from .conditional import NOT_MODIFIED_ERROR
+from .endpoint_methods import AsyncEndpointMethods
+from .idempotency import new_key
+from .metrics import RequestEvent
+from .pagination import apaginate
+from .ratelimit import parse_retry_after
+from .retry import IDEMPOTENCY_HEADER, is_idempotent
+from .streaming import CHUNK_SIZE, aiter_array
+from .transport import HTTPError, Response, _error_message, _query_pairs, transient
+
+try:
+    import aiohttp
+except ImportError: # pragma: no cover
+    aiohttp = None
+
+
+class AIOHTTPResponse(Response):
+    """A failed aiohttp response, read whole, as attached to HTTPError."""
+
+    def __init__(self, raw: Any, body: bytes, elapsed: float) -> None:
+        super().__init__(raw.status, raw.reason or '', str(raw.url), raw.headers, elapsed)
+        self._body = body
+
+    def _read(self) -> bytes:
+        return self._body
+
+    def _chunks(self, chunk_size: int) -> Iterator[bytes]:
+        for start in range(0, len(self._body), chunk_size):
+            yield self._body[start:start + chunk_size]
+
+
+class AsyncPayWhirl(AsyncEndpointMethods, BaseClient):
+    """asyncio PayWhirl API client"""
+
+    _max_concurrency: int
+    _semaphore: Any
+    _session: Any
+
+    def __init__( # pylint: disable=too-many-arguments
+            self,
+            api_key: str,
+            api_secret: str,
+            api_base: str = 'https://api.paywhirl.com',
+            pool_maxsize: int = 100,
+            max_concurrency: int = 100,
+            transport: str = None,
+            **kwargs: Any) -> None:
+        """Initialize the async paywhirl object for making requests.
+
+        Accepts every keyword argument of PayWhirl. pool_connections and
+        pool_block have no effect: requests are sent with aiohttp, which
+        always waits for a free connection once pool_maxsize is reached.
+
+        Args:
+            api_key: the api key for your account
+            api_secret: your secret key
+            api_base: the target URL for requests.
+                Defaults to 'https://api.paywhirl.com'
+            pool_maxsize: the maximum number of connections kept open
+                per host. Defaults to 100.
+            max_concurrency: the maximum number of requests allowed in
+                flight at once; further calls wait their turn.
+                Defaults to 100.
+            transport: None or 'aiohttp', the only transport of
+                AsyncPayWhirl.
+
+        Raises:
+            TypeError: transport names another transport.
+        """
+
+        if transport not in (None, 'aiohttp'):
+            raise TypeError(str.format(
+                'AsyncPayWhirl only supports the aiohttp transport, got {0!r}', transport))
+
+        if aiohttp is None:
+            raise ImportError(
+                'AsyncPayWhirl requires aiohttp: pip install paywhirl[async]')
+
+        self._max_concurrency = max_concurrency
+        self._semaphore = None
+        self._session = None
+        super().__init__(api_key, api_secret, api_base,
+                         pool_maxsize=pool_maxsize, **kwargs)
+
+    async def __aenter__(self) -> 'AsyncPayWhirl':
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close all pooled connections held by this client.
+
+        The client can not be used to make requests afterwards.
+        """
+
+        self._closed = True
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _client_timeout(self) -> Any:
+        if self._timeout is None:
+            return aiohttp.ClientTimeout(total=None)
+        if isinstance(self._timeout, tuple):
+            connect, read = self._timeout
+            return aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+        return aiohttp.ClientTimeout(
+            sock_connect=self._timeout, sock_read=self._timeout)
+
+    def _ensure_session(self) -> Any:
+        # aiohttp sessions must be created inside a running event loop,
+        # so the session is opened by the first request
+        if self._closed:
+            raise RuntimeError('PayWhirl client has been closed')
+        if self._session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self._pool_maxsize,
+                limit_per_host=self._pool_maxsize,
+                ssl=None if self._verify_ssl else False,
+                force_close=not self._keep_alive)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self._headers(),
+                timeout=self._client_timeout())
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        return self._session
+
+    async def _request(self, method: str, path: str, params: Any = None,
+                       headers: dict = None) -> Any:
+        if self._closed:
+            raise RuntimeError('PayWhirl client has been closed')
+
+        if method == 'get' and self._single_flight is not None:
+            result = await self._single_flight.ado(
+                cache_key(path, params, self._scope),
+                lambda: self._cached(method, path, params, headers))
+        else:
+            result = await self._cached(method, path, params, headers)
+        return self._typed(method, path, result)
+
+    async def _idempotent_post(self, path: str, data: Any,
+                               idempotency_key: Optional[str]) -> Any:
+        headers = {IDEMPOTENCY_HEADER: idempotency_key or new_key()}
+        if self._idempotency is None or idempotency_key is None:
+            return await self._request('post', path, data, headers)
+        return await self._idempotency.arun(
+            idempotency_key, path, data, lambda: self._request('post', path, data, headers),
+            self._scope)
+
+    async def _cached(self, method: str, path: str, params: Any = None,
+                      headers: dict = None) -> Any:
+        cache = self._cache
+        if cache is None:
+            return await self._send(method, path, params, headers)
+
+        if method != 'get':
+            result = await self._send(method, path, params, headers)
+            cache.invalidate_path(method, path)
+            cache.write_through(method, path, result, self._scope)
+            return result
+
+        if cache.group(path) is None:
+            found, result = cache.lookup(path, params, self._scope)
+            if found:
+                return result
+            return await self._send(method, path, params, headers)
+        return await cache.afetch(
+            path, params, lambda: self._send(method, path, params, headers),
+            self._scope)
+
+    async def _send(self, method: str, path: str, params: Any = None,
+                    headers: dict = None) -> Any:
+        if not self._before_hooks and not self._after_hooks:
+            return await self._perform(method, path, params, headers, None)
+
+        event = RequestEvent(method, path)
+        for hook in self._before_hooks:
+            hook(event)
+        try:
+            return await self._perform(method, path, params, headers, event)
+        except BaseException as err:
+            event.error = err
+            raise
+        finally:
+            event.finish()
+            for hook in self._after_hooks:
+                hook(event)
+
+    async def _perform(self, method: str, path: str, params: Any,
+                       headers: Optional[dict], event: Optional[RequestEvent],
+                       stream: bool = False) -> Any:
+        # pylint: disable=too-many-arguments,too-many-locals
+        # pylint: disable=too-many-branches,too-many-statements
+        session = self._ensure_session()
+
+        params = params or {}
+        url = self._api_base + path
+        kwargs = {}
+
+        if method == 'get':
+            # aiohttp rejects None and bool values
+            kwargs['params'] = _query_pairs(params)
+        else:
+            kwargs['data'] = self._codec.dumps(params)
+            headers = dict(headers or {}, **{'Content-Type': 'application/json'})
+            if event is not None:
+                event.bytes_sent = len(kwargs['data'])
+
+        policy = self._retry_policies.get(method)
+        if policy is not None and not is_idempotent(method, headers):
+            policy = None
+
+        conditional = self._conditional if method == 'get' and not stream else None
+        key = unchanged = None
+        if conditional is not None:
+            key = cache_key(path, params, self._scope)
+            headers, unchanged = conditional.prepare(key, headers)
+        kwargs['headers'] = headers
+
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                if self._rate_limiter is not None:
+                    await self._rate_limiter.acquire_async()
+
+                if event is not None:
+                    event.attempts += 1
+                sent = time.perf_counter()
+                try:
+                    resp = await session.request(method, url, **kwargs)
+                    # released on the way out, unless handed to a stream
+                    keep = False
+                    try:
+                        if event is not None:
+                            event.wait_time = time.perf_counter() - sent
+                            event.status = resp.status
+                        if self._rate_limiter is not None:
+                            self._rate_limiter.observe(resp.status, resp.headers)
+                        delay = None
+                        if policy is not None and policy.retries_status(resp.status):
+                            delay = policy.next_delay(
+                                attempt, parse_retry_after(resp.headers.get('Retry-After')))
+                        if delay is None:
+                            if resp.status >= 400:
+                                failed = AIOHTTPResponse(resp, await resp.read(),
+                                                         time.perf_counter() - sent)
+                                raise HTTPError(_error_message(failed), response=failed)
+                            if attempt and policy is not None:
+                                policy.stats.add('recovered')
+                            if stream:
+                                keep = True
+                                return resp
+                            if conditional is not None and resp.status == 304:
+                                if unchanged is None:
+                                    failed = AIOHTTPResponse(resp, b'',
+                                                             time.perf_counter() - sent)
+                                    raise HTTPError(NOT_MODIFIED_ERROR.format(url),
+                                                    response=failed)
+                                conditional.not_modified()
+                                return unchanged
+                            body = self._decode(await resp.read(), event)
+                            if conditional is not None:
+                                conditional.remember(key, resp.headers, body)
+                            return body
+                    finally:
+                        if not keep:
+                            resp.release()
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as err:
+                    delay = policy.next_delay(attempt) if policy and transient(err) else None
+                    if delay is None:
+                        raise
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _stream(self, path: str, params: Any, name: str) -> AsyncIterator[Any]:
+        return self._streamed(path, params, self._stream_model(name), name)
+
+    async def _streamed(self, path: str, params: Any, model: Any,
+                        name: Optional[str]) -> AsyncIterator[Any]:
+        self._ensure_session()
+        event = None
+        if self._before_hooks or self._after_hooks:
+            event = RequestEvent('get', path)
+            event.endpoint = name
+            for hook in self._before_hooks:
+                hook(event)
+        try:
+            resp = await self._perform('get', path, params, None, event, stream=True)
+            async with resp:
+                chunks = self._acounted(resp.content.iter_chunked(CHUNK_SIZE), event)
+                async for record in aiter_array(chunks, self._codec):
+                    yield record if model is None else model.from_dict(record)
+        except Exception as err:
+            if event is not None:
+                event.error = err
+            raise
+        finally:
+            if event is not None:
+                event.finish()
+                for hook in self._after_hooks:
+                    hook(event)
+
+    @staticmethod
+    async def _acounted(chunks: AsyncIterator[bytes],
+                        event: Optional[RequestEvent]) -> AsyncIterator[bytes]:
+        async for chunk in chunks:
+            if event is not None:
+                event.bytes_received += len(chunk)
+            yield chunk
+
+    def iter_customers(self, data: dict = None, page_size: int = 100,
+                       prefetch: bool = False, stream: bool = False) -> AsyncIterator[Any]:
+        """Async version of PayWhirl.iter_customers(), use with "async for"."""
+
+        fetch = self._page_fetcher(self.get_customers, self.stream_customers,
+                                   prefetch, stream)
+        data = dict(data or {}, order_key='id', order_direction='asc')
+        return apaginate(fetch, data, 'after_id',
+                         page_size=page_size, prefetch=prefetch)
+
+    def iter_plans(self, data: dict = None, page_size: int = 100,
+                   prefetch: bool = False) -> AsyncIterator[Any]:
+        """Async version of PayWhirl.iter_plans(), use with "async for"."""
+
+        data = dict(data or {}, order_key='id', order_direction='asc')
+        return apaginate(self.get_plans, data, 'after_id',
+                         page_size=page_size, prefetch=prefetch)
+
+    def iter_subscribers(self, data: dict = None, page_size: int = 100,
+                         prefetch: bool = False, stream: bool = False) -> AsyncIterator[Any]:
+        """Async version of PayWhirl.iter_subscribers(), use with "async for"."""
+
+        fetch = self._page_fetcher(self.get_subscribers, self.stream_subscribers,
+                                   prefetch, stream)
+        data = dict(data or {}, order='asc')
+        return apaginate(fetch, data, 'starting_after',
+                         page_size=page_size, prefetch=prefetch)
+
+    async def map(self, method: str, items: Iterable[Any], max_workers: int = None,
+                  **kwargs: Any) -> List[BatchResult]:
+        """Async version of PayWhirl.map().
+
+        max_workers defaults to max_concurrency.
+        """
+
+        return await amap_ordered(self._endpoint(method), items,
+                                  max_workers or self._max_concurrency, kwargs)
+
+    def map_as_completed(self, method: str, items: Iterable[Any],
+                         max_workers: int = None,
+                         **kwargs: Any) -> AsyncIterator[BatchResult]:
+        """Async version of PayWhirl.map_as_completed(), use with "async for"."""
+
+        return amap_as_completed(self._endpoint(method), items,
+                                 max_workers or self._max_concurrency, kwargs)
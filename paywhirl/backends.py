@@ -0,0 +1,201 @@
+"""Storage backends for ResponseCache
+==================================
+
+MemoryBackend keeps responses in the current process and is the default.
+SQLiteBackend stores them in a sqlite database file, so that every worker
+process on a host (e.g. gunicorn workers) shares one cache:
+
+```
+backend = SQLiteBackend('/var/cache/paywhirl.sqlite', maxsize=10000)
+pw = PayWhirl(api_key, api_secret, cache=ResponseCache(backend=backend))
+```
+
+Backends store opaque serialized bytes together with the wall clock time
+they expire at. Expired entries are kept until evicted so that they can
+be served while another caller refreshes them. Both backends also hand
+out short-lived refresh leases, which ResponseCache uses to make sure only
+one caller (thread or process) refetches an expired entry.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+class CacheBackend:
+    """Interface implemented by ResponseCache storage backends."""
+
+    def get(self, key: str) -> Optional[Tuple[float, bytes]]:
+        """Return the (expires, data) of an entry, fresh or not, or None."""
+        raise NotImplementedError
+
+    def set(self, key: str, group: str, expires: float, data: bytes) -> int:
+        """Store an entry and return the number of entries evicted."""
+        raise NotImplementedError
+
+    def invalidate(self, group: str = None) -> int:
+        """Delete every entry of a group, or all of them; return the count."""
+        raise NotImplementedError
+
+    def acquire(self, key: str, timeout: float) -> bool:
+        """Take the refresh lease of a key for up to timeout seconds.
+
+        Returns:
+            False when somebody else holds an unexpired lease.
+        """
+        raise NotImplementedError
+
+    def release(self, key: str) -> None:
+        """Give up the refresh lease of a key."""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """Thread-safe LRU backend local to the current process."""
+
+    maxsize: int
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # type: OrderedDict
+        self._leases = {}  # type: Dict[str, float]
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[float, bytes]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0], entry[2]
+
+    def set(self, key: str, group: str, expires: float, data: bytes) -> int:
+        with self._lock:
+            self._entries[key] = (expires, group, data)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    def invalidate(self, group: str = None) -> int:
+        with self._lock:
+            if group is None:
+                stale = list(self._entries)
+            else:
+                stale = [key for key, entry in self._entries.items()
+                         if entry[1] == group]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def acquire(self, key: str, timeout: float) -> bool:
+        now = time.time()
+        with self._lock:
+            if self._leases.get(key, 0.0) > now:
+                return False
+            self._leases[key] = now + timeout
+            return True
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._leases.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteBackend(CacheBackend):
+    """Backend shared by every process able to open the same sqlite file.
+
+    When full, the entries closest to expiring are evicted first, so
+    reads never have to write to the database.
+    """
+
+    path: str
+    maxsize: int
+
+    _SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS entries ('
+        ' key TEXT PRIMARY KEY, grp TEXT NOT NULL,'
+        ' expires REAL NOT NULL, data BLOB NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS entries_grp ON entries (grp)',
+        'CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires)',
+        'CREATE TABLE IF NOT EXISTS leases ('
+        ' key TEXT PRIMARY KEY, expires REAL NOT NULL)',
+    )
+
+    def __init__(self, path: str, maxsize: int = 10000,
+                 busy_timeout: float = 5.0) -> None:
+        """Open (and create if needed) a shared cache database.
+
+        Args:
+            path: the database file. Every process must use the same.
+            maxsize: the number of entries kept before evicting.
+                Defaults to 10000.
+            busy_timeout: seconds to wait for another process holding
+                the database lock. Defaults to 5.
+        """
+
+        self.path = path
+        self.maxsize = maxsize
+        self._busy_timeout = busy_timeout
+        self._local = threading.local()
+        with self._connection() as conn:
+            for statement in self._SCHEMA:
+                conn.execute(statement)
+
+    def _connection(self) -> 'sqlite3.Connection':
+        # sqlite connections can not be shared between threads, nor
+        # survive a fork, so keep one per thread and per process.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            import sqlite3 # pylint: disable=import-outside-toplevel
+            conn = sqlite3.connect(self.path, timeout=self._busy_timeout,
+                                   isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[Tuple[float, bytes]]:
+        row = self._connection().execute(
+            'SELECT expires, data FROM entries WHERE key = ?', (key,)).fetchone()
+        return None if row is None else (row[0], bytes(row[1]))
+
+    def set(self, key: str, group: str, expires: float, data: bytes) -> int:
+        conn = self._connection()
+        conn.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)',
+                     (key, group, expires, data))
+        excess = conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0] - self.maxsize
+        if excess <= 0:
+            return 0
+        conn.execute('DELETE FROM entries WHERE key IN ('
+                     ' SELECT key FROM entries ORDER BY expires LIMIT ?)', (excess,))
+        return excess
+
+    def invalidate(self, group: str = None) -> int:
+        conn = self._connection()
+        if group is None:
+            return conn.execute('DELETE FROM entries').rowcount
+        return conn.execute('DELETE FROM entries WHERE grp = ?', (group,)).rowcount
+
+    def acquire(self, key: str, timeout: float) -> bool:
+        now = time.time()
+        conn = self._connection()
+        conn.execute('DELETE FROM leases WHERE key = ? AND expires <= ?', (key, now))
+        return conn.execute('INSERT OR IGNORE INTO leases VALUES (?, ?)',
+                            (key, now + timeout)).rowcount == 1
+
+    def release(self, key: str) -> None:
+        self._connection().execute('DELETE FROM leases WHERE key = ?', (key,))
+
+    def __len__(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM entries').fetchone()[0]
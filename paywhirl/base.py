@@ -0,0 +1,173 @@
+"""Shared client base
+==================
+
+BaseClient holds what PayWhirl and AsyncPayWhirl have in common: their
+configuration, request hooks and the steps of a call that do no I/O.
+Each client adds its own request pipeline (_request() down to
+_perform()), close(), map() and iteration on top, blocking or async, so
+that neither overrides the other's methods.
+"""
+
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .cache import ResponseCache, client_scope, route
+from .codec import JSONCodec, get_codec
+from .conditional import ConditionalCache
+from .endpoints import ENDPOINTS, ROUTE_MODELS
+from .idempotency import IdempotencyStore
+from .metrics import MetricsCollector, RequestEvent
+from .models import to_models
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy, default_policies
+from .singleflight import SingleFlight
+from .tracing import Tracer
+
+Timeout = Union[None, float, Tuple[float, float]]
+
+
+class BaseClient:
+    """Configuration and request hooks shared by PayWhirl and AsyncPayWhirl."""
+
+    _api_key: str
+    _api_secret: str
+    _api_base: str
+    _scope: str
+    _verify_ssl: bool
+    _timeout: Timeout
+    _pool_connections: int
+    _pool_maxsize: int
+    _pool_block: bool
+    _keep_alive: bool
+    _closed: bool
+    _default_headers: Dict[str, str]
+    _rate_limiter: Optional[RateLimiter]
+    _retry_policies: Dict[str, RetryPolicy]
+    _cache: Optional[ResponseCache]
+    _conditional: Optional[ConditionalCache]
+    _single_flight: Optional[SingleFlight]
+    _before_hooks: List[Callable[[RequestEvent], Any]]
+    _after_hooks: List[Callable[[RequestEvent], Any]]
+    _codec: JSONCodec
+    _models: bool
+    _idempotency: Optional[IdempotencyStore]
+
+    def __init__( # pylint: disable=too-many-arguments
+            self,
+            api_key: str,
+            api_secret: str,
+            api_base: str = 'https://api.paywhirl.com',
+            pool_connections: int = 10,
+            pool_maxsize: int = 10,
+            pool_block: bool = False,
+            keep_alive: bool = True,
+            timeout: Timeout = None,
+            rate_limiter: RateLimiter = None,
+            retry_policies: Dict[str, RetryPolicy] = None,
+            cache: ResponseCache = None,
+            conditional: ConditionalCache = None,
+            single_flight: SingleFlight = None,
+            metrics: MetricsCollector = None,
+            tracer: Tracer = None,
+            json_codec: Union[str, JSONCodec] = None,
+            models: bool = False,
+            idempotency: IdempotencyStore = None) -> None:
+        """Store the configuration. Takes the arguments of PayWhirl but transport."""
+
+        self._api_key = api_key
+        self._api_secret = api_secret
+        self._api_base = api_base
+        self._scope = client_scope(api_base, api_key)
+        self._verify_ssl = True
+        self._timeout = timeout
+        self._pool_connections = pool_connections
+        self._pool_maxsize = pool_maxsize
+        self._pool_block = pool_block
+        self._keep_alive = keep_alive
+        self._closed = False
+        self._rate_limiter = rate_limiter
+        self._retry_policies = (default_policies() if retry_policies is None
+                                else dict(retry_policies))
+        self._cache = cache
+        self._conditional = conditional
+        self._single_flight = single_flight
+        self._codec = get_codec(json_codec)
+        self._models = models
+        self._idempotency = idempotency
+        self._before_hooks = []
+        self._after_hooks = []
+        if metrics is not None:
+            self.add_hook('after_request', metrics.record)
+        if tracer is not None and tracer.enabled:
+            self.add_hook('before_request', tracer.before_request)
+            self.add_hook('after_request', tracer.after_request)
+        self._default_headers = self._headers()
+
+    def _headers(self) -> dict:
+        return {
+            'api-key': self._api_key,
+            'api-secret': self._api_secret,
+            'Connection': 'keep-alive' if self._keep_alive else 'close',
+        }
+
+    def add_hook(self, event: str, func: Callable[[RequestEvent], Any]) -> None:
+        """Call func around every HTTP request made by this client.
+
+        Args:
+            event: 'before_request' or 'after_request'
+            func: called with the RequestEvent of the request. After
+                the request, the event holds its status, timings and
+                sizes, and the exception raised if it failed.
+        """
+
+        self._hooks(event).append(func)
+
+    def remove_hook(self, event: str, func: Callable[[RequestEvent], Any]) -> None:
+        """Stop calling a hook added with add_hook()."""
+
+        self._hooks(event).remove(func)
+
+    def _hooks(self, event: str) -> List[Callable[[RequestEvent], Any]]:
+        if event == 'before_request':
+            return self._before_hooks
+        if event == 'after_request':
+            return self._after_hooks
+        raise ValueError(str.format('unknown hook event {0!r}', event))
+
+    def _endpoint(self, method: str) -> Callable:
+        if method not in ENDPOINTS:
+            raise AttributeError(str.format('unknown PayWhirl method {0!r}', method))
+        return getattr(self, method)
+
+    @staticmethod
+    def _page_fetcher(get: Callable, stream_method: Callable, prefetch: bool,
+                      stream: bool) -> Callable:
+        if not stream:
+            return get
+        if prefetch:
+            raise ValueError('stream and prefetch can not be combined')
+        return stream_method
+
+    def _typed(self, method: str, path: str, result: Any) -> Any:
+        # converted last, so caches and coalesced callers share plain
+        # JSON data and every caller gets its own records
+        if not self._models or method != 'get':
+            return result
+        model = ROUTE_MODELS.get(route(path))
+        if model is None:
+            return result
+        return to_models(model, result)
+
+    def _stream_model(self, name: str) -> Any:
+        if self._closed:
+            raise RuntimeError('PayWhirl client has been closed')
+        return ENDPOINTS[name].model if self._models else None
+
+    def _decode(self, content: bytes, event: Optional[RequestEvent]) -> Any:
+        if event is None:
+            return self._codec.loads(content)
+        event.bytes_received = len(content)
+        started = time.perf_counter()
+        body = self._codec.loads(content)
+        event.decode_time = time.perf_counter() - started
+        return body
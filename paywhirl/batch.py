@@ -0,0 +1,133 @@
+"""Concurrent fan-out of a single endpoint method over many inputs."""
+
+import contextvars
+from typing import (Any, AsyncIterator, Callable, Iterable, Iterator,
+                    List, NamedTuple, Optional)
+
+
+class BatchResult(NamedTuple):
+    """The outcome of one call made by PayWhirl.map().
+
+    Attributes:
+        index: the position of the input in the original iterable
+        item: the input that was passed to the endpoint method
+        result: the value returned by the call, None if it failed
+        error: the exception raised by the call, None if it succeeded
+    """
+
+    index: int
+    item: Any
+    result: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool: # pylint: disable=invalid-name
+        """True when the call succeeded."""
+        return self.error is None
+
+    def get(self) -> Any:
+        """Return the result, or raise the exception the call raised."""
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def _call(func: Callable, index: int, item: Any, kwargs: dict) -> BatchResult:
+    try:
+        return BatchResult(index, item, func(item, **kwargs))
+    except Exception as err: # pylint: disable=broad-except
+        return BatchResult(index, item, error=err)
+
+
+def map_as_completed(func: Callable, items: Iterable[Any], max_workers: int,
+                     kwargs: dict) -> Iterator[BatchResult]:
+    """Run func(item, **kwargs) for every item on a thread pool.
+
+    At most 2 * max_workers calls are queued at once, so very long (or
+    lazy) inputs are consumed incrementally rather than all up front.
+
+    Yields:
+        A BatchResult per item, in completion order.
+    """
+
+    # imported here, like asyncio below, to keep 'import paywhirl' fast
+    # pylint: disable=import-outside-toplevel
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    window = max_workers * 2
+    inputs = enumerate(items)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < window:
+                try:
+                    index, item = next(inputs)
+                except StopIteration:
+                    exhausted = True
+                    break
+                # run in a copy of the caller's context so that tracing
+                # spans started by the calls get the caller's parent span
+                pending.add(executor.submit(contextvars.copy_context().run,
+                                            _call, func, index, item, kwargs))
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def map_ordered(func: Callable, items: Iterable[Any], max_workers: int,
+                kwargs: dict) -> List[BatchResult]:
+    """Like map_as_completed(), but return every result in input order."""
+
+    results = {}
+    for result in map_as_completed(func, items, max_workers, kwargs):
+        results[result.index] = result
+    return [results[index] for index in range(len(results))]
+
+
+async def _acall(func: Callable, index: int, item: Any, kwargs: dict) -> BatchResult:
+    try:
+        return BatchResult(index, item, await func(item, **kwargs))
+    except Exception as err: # pylint: disable=broad-except
+        return BatchResult(index, item, error=err)
+
+
+async def amap_as_completed(func: Callable, items: Iterable[Any],
+                            max_workers: int, kwargs: dict) -> AsyncIterator[BatchResult]:
+    """Async counterpart of map_as_completed() for AsyncPayWhirl."""
+
+    import asyncio # pylint: disable=import-outside-toplevel
+
+    window = max_workers * 2
+    inputs = enumerate(items)
+    pending = set()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < window:
+                try:
+                    index, item = next(inputs)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending.add(asyncio.ensure_future(_acall(func, index, item, kwargs)))
+            if not pending:
+                return
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+async def amap_ordered(func: Callable, items: Iterable[Any], max_workers: int,
+                       kwargs: dict) -> List[BatchResult]:
+    """Async counterpart of map_ordered() for AsyncPayWhirl."""
+
+    results = {}
+    async for result in amap_as_completed(func, items, max_workers, kwargs):
+        results[result.index] = result
+    return [results[index] for index in range(len(results))]
@@ -0,0 +1,320 @@
+"""Bulk operations
+===============
+
+BulkRunner applies many mutations concurrently, for example a price
+migration:
+
+```
+ops = [Operation('update_subscription', (sub_id, new_plan_id),
+                 key='migrate-2024-01/' + str(sub_id))
+       for sub_id in subscription_ids]
+runner = BulkRunner(pw, journal='migration.sqlite', max_workers=16)
+report = runner.run(ops)
+print(report)
+for outcome in report.failed:
+    print(outcome.operation, outcome.error)
+```
+
+Calls are made through the client, so its RateLimiter throttles them.
+
+Every operation has a key naming it in the journal. Operations that
+change anything must be given one: a later operation identical to an
+earlier one, such as a second charge of the same amount to the same
+customer, would otherwise share its key and be skipped as already done.
+Reads default to a key derived from their method and arguments.
+
+The journal, a sqlite file, records each operation before it is sent
+and again once it succeeded or failed. Running the same batch again with
+the same journal resumes it: succeeded operations are skipped, failed
+ones are sent again. An operation whose outcome is not known may have
+been applied; it is reported as 'unknown'. That is the case when the
+connection failed or timed out, or the process died while sending it,
+and, for UNSAFE endpoints (see paywhirl.endpoints), when the server
+answered with a 5xx status, as it may have failed after applying it.
+
+create_charge(), subscribe_customer(), create_invoice() and
+process_invoice() are sent with the operation key as their idempotency
+key (see paywhirl.idempotency), unless the operation passes its own
+idempotency_key. Every run of a batch therefore sends the same key for
+the same operation, and the server recognises repeated attempts, so
+resuming sends these again when their outcome is unknown. Other
+operations in that state are only sent again when retry_unknown is set.
+
+With dry_run, nothing is sent and the report shows what would be.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .batch import map_as_completed
+from .endpoints import ENDPOINTS, KEYED, SAFE, UNSAFE
+from .transport import HTTPError
+
+# outcome statuses
+DONE = 'done'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+UNKNOWN = 'unknown'
+PENDING = 'pending'
+
+# journal states
+_STARTED = 'started'
+
+
+def operation_key(method: str, args: Tuple[Any, ...], kwargs: Optional[Dict[str, Any]]) -> str:
+    """Derive a stable key from an endpoint method name and its arguments."""
+
+    data = json.dumps([method, list(args), kwargs or {}], sort_keys=True, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()[:32]
+
+
+class Operation(NamedTuple):
+    """One call of a client endpoint method.
+
+    Attributes:
+        method: the name of the endpoint method, e.g. 'mark_invoice_as_paid'
+        args: its positional arguments.
+        kwargs: its keyword arguments, if any.
+        key: a unique name for the operation, matching the same
+            operation of a re-run batch. Required unless the method is
+            a read, for which it defaults to a hash of the method and
+            arguments.
+    """
+
+    method: str
+    args: Tuple[Any, ...] = ()
+    kwargs: Optional[Dict[str, Any]] = None
+    key: Optional[str] = None
+
+    def with_key(self) -> 'Operation':
+        """Return the operation with its key filled in.
+
+        Raises:
+            ValueError: the operation has no key and changes something.
+        """
+
+        if self.key is not None:
+            return self
+        if ENDPOINTS[self.method].idempotency != SAFE:
+            raise ValueError(str.format(
+                '{0!r} needs a key: {1} changes data', self, self.method))
+        return self._replace(key=operation_key(self.method, self.args, self.kwargs))
+
+
+class Outcome(NamedTuple):
+    """What happened to one operation of a BulkRunner.run().
+
+    Attributes:
+        operation: the operation.
+        status: 'done', 'failed', 'skipped' (done by an earlier run),
+            'unknown' (it may have been applied: the connection failed,
+            the server answered an UNSAFE call with a 5xx status, or
+            an earlier run died while sending it) or 'pending' (would
+            be sent, in a dry run).
+        result: the value returned by the call, if it was made.
+        error: the exception raised by the call, if it failed.
+    """
+
+    operation: Operation
+    status: str
+    result: Any = None
+    error: Optional[BaseException] = None
+
+
+class BulkReport:
+    """The outcome of every operation of one BulkRunner.run().
+
+    Attributes:
+        outcomes: an Outcome per operation, in completion order.
+        elapsed: the duration of the run, in seconds.
+    """
+
+    outcomes: List[Outcome]
+    elapsed: float
+
+    def __init__(self) -> None:
+        self.outcomes = []
+        self.elapsed = 0.0
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of operations per status."""
+
+        counts = {}  # type: Dict[str, int]
+        for outcome in self.outcomes:
+            counts[outcome.status] = counts.get(outcome.status, 0) + 1
+        return counts
+
+    @property
+    def failed(self) -> List[Outcome]:
+        """The outcomes of the operations that failed."""
+
+        return [outcome for outcome in self.outcomes if outcome.status == FAILED]
+
+    @property
+    def ok(self) -> bool: # pylint: disable=invalid-name
+        """True when every operation is done, now or by an earlier run."""
+
+        return all(outcome.status in (DONE, SKIPPED) for outcome in self.outcomes)
+
+    def __str__(self) -> str:
+        counts = self.counts()
+        return str.format('{0} operations in {1:.1f}s: {2}', len(self.outcomes), self.elapsed,
+                          ', '.join(str.format('{0} {1}', count, status)
+                                    for status, count in sorted(counts.items())))
+
+
+class Journal:
+    """The persistent state of bulk operations, keyed by operation key."""
+
+    path: str
+
+    _SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS operations ('
+        ' key TEXT PRIMARY KEY, method TEXT NOT NULL, state TEXT NOT NULL,'
+        ' error TEXT, updated REAL NOT NULL)',
+    )
+
+    def __init__(self, path: str = ':memory:', busy_timeout: float = 5.0) -> None:
+        """Open (and create if needed) a journal.
+
+        Args:
+            path: the database file. Defaults to an in-memory journal,
+                which only protects a single run.
+            busy_timeout: seconds to wait for another process holding
+                the database lock. Defaults to 5.
+        """
+
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        for statement in self._SCHEMA:
+            self._conn.execute(statement)
+
+    def state(self, key: str) -> Optional[str]:
+        """Return 'started', 'done', 'failed', 'unknown' or None if never seen."""
+
+        row = self._conn.execute('SELECT state FROM operations WHERE key = ?',
+                                 (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def mark(self, operation: Operation, state: str, error: str = None) -> None:
+        """Record the state of an operation."""
+
+        self._conn.execute('INSERT OR REPLACE INTO operations VALUES (?, ?, ?, ?, ?)',
+                           (operation.key, operation.method, state, error, time.time()))
+
+    def close(self) -> None:
+        """Close the database."""
+
+        self._conn.close()
+
+
+class BulkRunner:
+    """Concurrent, resumable application of many operations."""
+
+    def __init__(self, client: Any, journal: Any = None, max_workers: int = 8) -> None:
+        """Create a runner.
+
+        Args:
+            client: the PayWhirl client making the calls. Give it a
+                pool_maxsize of at least max_workers.
+            journal: a Journal, or the path of its file. Defaults to an
+                in-memory journal; pass a file to be able to resume.
+            max_workers: the number of calls made at once.
+        """
+
+        if not isinstance(journal, Journal):
+            journal = Journal(journal) if journal is not None else Journal()
+        self._client = client
+        self._journal = journal
+        self._max_workers = max_workers
+
+    def run(self, operations: Iterable[Operation], dry_run: bool = False,
+            retry_unknown: bool = False) -> BulkReport:
+        """Apply every operation not applied yet.
+
+        Args:
+            operations: the operations of the batch.
+            dry_run: only report what would be sent.
+            retry_unknown: also send the operations without an
+                idempotency key whose outcome is unknown, which may
+                apply them twice.
+
+        Returns:
+            A BulkReport. Failing operations do not stop the batch.
+
+        Raises:
+            AttributeError: an operation names an unknown method.
+            ValueError: two operations have the same key, or an
+                operation which changes data has none.
+        """
+
+        started = time.perf_counter()
+        report = BulkReport()
+        pending = []  # type: List[Operation]
+        keys = set()
+        for operation in operations:
+            self._client._endpoint(operation.method) # pylint: disable=protected-access
+            operation = operation.with_key()
+            if operation.key in keys:
+                raise ValueError(str.format('duplicate operation {0!r}', operation))
+            keys.add(operation.key)
+
+            state = self._journal.state(operation.key)
+            if state == DONE:
+                report.outcomes.append(Outcome(operation, SKIPPED))
+            elif (state in (_STARTED, UNKNOWN) and not retry_unknown
+                  and ENDPOINTS[operation.method].idempotency != KEYED):
+                report.outcomes.append(Outcome(operation, UNKNOWN))
+            elif dry_run:
+                report.outcomes.append(Outcome(operation, PENDING))
+            else:
+                pending.append(operation)
+
+        errors = self._transport_errors()
+        for result in map_as_completed(self._call, self._started(pending),
+                                       self._max_workers, {}):
+            operation = result.item
+            if result.ok:
+                self._journal.mark(operation, DONE)
+                report.outcomes.append(Outcome(operation, DONE, result.result))
+            else:
+                status = UNKNOWN if self._maybe_applied(operation, result.error,
+                                                        errors) else FAILED
+                self._journal.mark(operation, status, repr(result.error))
+                report.outcomes.append(Outcome(operation, status, error=result.error))
+
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    @staticmethod
+    def _maybe_applied(operation: Operation, error: BaseException,
+                       errors: Tuple[type, ...]) -> bool:
+        # the request may have reached the server before the connection
+        # failed, and a 5xx may come from a server which applied it
+        # before failing
+        if isinstance(error, errors):
+            return True
+        return (isinstance(error, HTTPError)
+                and ENDPOINTS[operation.method].idempotency == UNSAFE
+                and getattr(error.response, 'status_code', 0) >= 500)
+
+    def _transport_errors(self) -> Tuple[type, ...]:
+        transport = getattr(self._client, '_transport', None)
+        return (ConnectionError, TimeoutError) + tuple(getattr(transport, 'errors', ()))
+
+    def _started(self, operations: List[Operation]) -> Iterator[Operation]:
+        # consumed by map_as_completed() on the calling thread just
+        # before each operation is submitted
+        for operation in operations:
+            self._journal.mark(operation, _STARTED)
+            yield operation
+
+    def _call(self, operation: Operation) -> Any:
+        kwargs = dict(operation.kwargs or {})
+        if ENDPOINTS[operation.method].idempotency == KEYED:
+            kwargs.setdefault('idempotency_key', operation.key)
+        return getattr(self._client, operation.method)(*operation.args, **kwargs)
@@ -0,0 +1,312 @@
+"""Response caching
+================
+
+Reference data such as plans, gateways, tax and shipping rules, promos,
+questions and the account itself rarely changes. A ResponseCache passed
+to a client keeps GET responses for those endpoints in memory:
+
+```
+cache = ResponseCache(ttl=300, maxsize=512, ttls={'account': 3600})
+pw = PayWhirl(api_key, api_secret, cache=cache)
+pw.get_plans({})        # fetched from the API
+pw.get_plans({})        # served from the cache
+pw.update_plan(plan)    # drops every cached 'plans' response
+print(cache.stats())
+```
+
+Responses are grouped by the list endpoint they belong to, as declared
+in paywhirl.endpoints (see CACHE_GROUPS): get_plan() and get_plans() are
+both in the 'plans' group, and per-group TTLs are configured with those
+names. Creating, updating or deleting a record through the same client
+invalidates its whole group.
+
+Customers, addresses, subscriptions and invoices change outside the
+client too (the dashboard, webhooks, other workers), so reading them is
+never cached. Writing them through is opt-in: once a record group is
+given a TTL in ttls, update_customer(), update_address(),
+update_subscription() and update_invoice_card() write the record they
+return through to the cache (see RECORD_GROUPS and WRITES), and a
+following get_customer(), get_address(), get_subscription() or
+get_invoice() of that record is served from it until it expires, saving
+a round trip in read-after-write code:
+
+```
+cache = ResponseCache(ttls={'customers': 5})
+pw = PayWhirl(api_key, api_secret, cache=cache)
+pw.update_customer({'id': 123, 'email': 'new@example.com'})
+pw.get_customer(123)    # served from the cache
+```
+
+Keep those TTLs short: changes made elsewhere are only seen once they
+expire. Deleting a record, or calling any other endpoint which changes
+records of a group (see INVALIDATED_BY), drops that group.
+
+Storage is delegated to a CacheBackend (see paywhirl.backends), which
+may be shared between processes. When an entry expires, only one caller
+refetches it while the others keep being served the previous value.
+Entries are keyed by the API base and key of the client that fetched
+them (see client_scope()), so clients of different accounts or
+environments sharing a backend never see each other's responses.
+Invalidating a group drops it for every account.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from .backends import CacheBackend, MemoryBackend
+from .codec import JSONCodec, get_codec
+from .endpoints import CACHE_GROUPS, INVALIDATED_BY, RECORD_GROUPS, WRITES
+
+# Prefix of every serialized entry. Bump it whenever the format changes,
+# so that processes running different versions ignore each other's data.
+FORMAT_STAMP = b'pw1:'
+
+HIT, STALE, WAIT, FETCH = 'hit', 'stale', 'wait', 'fetch'
+
+_RECORD_GROUP_NAMES = frozenset(RECORD_GROUPS.values())
+
+_ID_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+
+def route(path: str) -> str:
+    """Turn a request path into its route template.
+
+    Numeric path segments are replaced with '{id}', so that
+    '/invoice/123/process' becomes '/invoice/{id}/process'.
+    """
+
+    return _ID_SEGMENT.sub('/{id}', path)
+
+
+def client_scope(api_base: str, api_key: str) -> str:
+    """Return the cache_key() scope of a client of an account.
+
+    A hash of the API base and key, so that the key itself is never
+    written to a shared backend.
+    """
+
+    digest = hashlib.sha256((api_base + '\n' + api_key).encode('utf-8'))
+    return digest.hexdigest()[:32] + ':'
+
+
+def cache_key(path: str, params: Any, scope: str = '') -> str:
+    """Build the cache key of a GET request.
+
+    Args:
+        path: the request path.
+        params: the request params.
+        scope: the client_scope() of the client making the request.
+    """
+
+    if not params:
+        return scope + path
+    return scope + path + '?' + json.dumps(params, sort_keys=True, default=str)
+
+
+class ResponseCache:
+    """TTL bounded cache of API responses stored in a CacheBackend."""
+
+    ttl: float
+    ttls: Dict[str, float]
+    backend: CacheBackend
+    lease_timeout: float
+    poll_interval: float
+    codec: JSONCodec
+
+    def __init__(self, ttl: float = 300.0, maxsize: int = 1024, # pylint: disable=too-many-arguments
+                 ttls: Dict[str, float] = None, backend: CacheBackend = None,
+                 lease_timeout: float = 10.0, poll_interval: float = 0.05,
+                 json_codec: Union[str, JSONCodec] = None) -> None:
+        """Create a response cache.
+
+        Args:
+            ttl: seconds a response stays fresh. Defaults to 5 minutes.
+            maxsize: the number of responses kept by the default
+                in-memory LRU backend. Defaults to 1024.
+            ttls: per-group overrides of ttl, keyed by the names used in
+                CACHE_GROUPS, e.g. {'plans': 60, 'account': 3600}.
+                A TTL of 0 disables caching for that group. The record
+                groups of RECORD_GROUPS ('customers', 'addresses',
+                'subscriptions' and 'invoices') default to 0, and are
+                only written through once given a TTL here.
+            backend: where responses are stored. Defaults to a
+                MemoryBackend holding maxsize responses.
+            lease_timeout: the longest time one caller may spend
+                refreshing an entry before others stop waiting for it.
+                Defaults to 10 seconds.
+            poll_interval: how often callers waiting for someone else's
+                refresh check the backend again. Defaults to 50ms.
+            json_codec: the JSON backend used to serialize entries.
+                Defaults to the fastest one installed.
+        """
+
+        self.ttl = ttl
+        self.ttls = dict(ttls or {})
+        self.backend = backend if backend is not None else MemoryBackend(maxsize)
+        self.lease_timeout = lease_timeout
+        self.poll_interval = poll_interval
+        self.codec = get_codec(json_codec)
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'stale': 0, 'evictions': 0,
+                          'invalidations': 0, 'writes': 0}
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def group(self, path: str) -> Optional[str]:
+        """Return the cache group of a GET path, None if not cacheable."""
+
+        group = CACHE_GROUPS.get(route(path))
+        return group if self._enabled(group) else None
+
+    def _ttl(self, group: str) -> float:
+        default = 0 if group in _RECORD_GROUP_NAMES else self.ttl
+        return self.ttls.get(group, default)
+
+    def _enabled(self, group: Optional[str]) -> bool:
+        return group is not None and self._ttl(group) > 0
+
+    def _read(self, key: str) -> Tuple[Optional[float], Any]:
+        entry = self.backend.get(key)
+        if entry is None or not entry[1].startswith(FORMAT_STAMP):
+            return None, None
+        return entry[0], self.codec.loads(entry[1][len(FORMAT_STAMP):])
+
+    def _begin(self, key: str) -> Tuple[str, Any]:
+        """Decide what a caller looking up key should do next.
+
+        Returns one of ('hit', value), ('stale', value) when someone else
+        is already refreshing an expired entry, ('wait', None) when
+        someone else is fetching a missing entry, or ('fetch', None)
+        once the caller holds the refresh lease.
+        """
+
+        expires, value = self._read(key)
+        if expires is not None and expires > time.time():
+            self._count('hits')
+            return HIT, value
+        if self.backend.acquire(key, self.lease_timeout):
+            self._count('misses')
+            return FETCH, None
+        if expires is not None:
+            self._count('stale')
+            return STALE, value
+        return WAIT, None
+
+    def _store(self, key: str, group: str, value: Any) -> None:
+        data = FORMAT_STAMP + self.codec.dumps(value)
+        expires = time.time() + self._ttl(group)
+        evicted = self.backend.set(key, group, expires, data)
+        if evicted:
+            self._count('evictions', evicted)
+
+    def fetch(self, path: str, params: Any, send: Callable[[], Any],
+              scope: str = '') -> Any:
+        """Return the cached response of a GET request, calling send() on a miss.
+
+        Only one caller at a time refreshes a given entry. Others are
+        served the expired value meanwhile, or wait for the refresh if
+        there is nothing to serve. scope is the client_scope() of the
+        calling client.
+        """
+
+        group = self.group(path)
+        key = cache_key(path, params, scope)
+        deadline = time.monotonic() + self.lease_timeout
+        while True:
+            state, value = self._begin(key)
+            if state in (HIT, STALE):
+                return value
+            if state == WAIT and time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                continue
+            try:
+                value = send()
+                self._store(key, group, value)
+                return value
+            finally:
+                if state == FETCH:
+                    self.backend.release(key)
+
+    async def afetch(self, path: str, params: Any,
+                     send: Callable[[], Awaitable[Any]], scope: str = '') -> Any:
+        """Async counterpart of fetch() for AsyncPayWhirl."""
+
+        import asyncio # pylint: disable=import-outside-toplevel
+
+        group = self.group(path)
+        key = cache_key(path, params, scope)
+        deadline = time.monotonic() + self.lease_timeout
+        while True:
+            state, value = self._begin(key)
+            if state in (HIT, STALE):
+                return value
+            if state == WAIT and time.monotonic() < deadline:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            try:
+                value = await send()
+                self._store(key, group, value)
+                return value
+            finally:
+                if state == FETCH:
+                    self.backend.release(key)
+
+    def lookup(self, path: str, params: Any, scope: str = '') -> Tuple[bool, Any]:
+        """Return (True, record) when a GET of a single record can be
+        served from a fresh record written through, else (False, None)."""
+
+        group = RECORD_GROUPS.get(route(path))
+        if not self._enabled(group):
+            return False, None
+        expires, value = self._read(cache_key(path, params, scope))
+        if expires is None or expires <= time.time():
+            return False, None
+        self._count('hits')
+        return True, value
+
+    def write_through(self, method: str, path: str, response: Any,
+                      scope: str = '') -> None:
+        """Store the record returned by a mutating request, if it returns one.
+
+        A response which is not a record with an id drops the group of
+        the record instead, as the cached one may be stale now.
+        """
+
+        endpoint = WRITES.get((method, route(path)))
+        if endpoint is None or not self._enabled(endpoint.record_group):
+            return
+        record_id = response.get('id') if isinstance(response, dict) else None
+        if not isinstance(record_id, (int, str)) or not str(record_id).isdigit():
+            self.invalidate(endpoint.record_group)
+            return
+        self._store(scope + endpoint.format_path(record_id), endpoint.record_group,
+                    response)
+        self._count('writes')
+
+    def invalidate(self, group: str = None) -> None:
+        """Drop every cached response of a group, or everything."""
+
+        self._count('invalidations', self.backend.invalidate(group))
+
+    def invalidate_path(self, method: str, path: str) -> None:
+        """Drop the responses made stale by a mutating request to path."""
+
+        for group in INVALIDATED_BY.get((method, route(path)), ()):
+            self.invalidate(group)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit, miss, stale, eviction, invalidation and write counters.
+
+        Counters only cover this process; size is the backend's.
+        """
+
+        with self._lock:
+            stats = dict(self._counters)
+        stats['size'] = len(self.backend)
+        return stats
@@ -0,0 +1,107 @@
+"""JSON codecs
+===========
+
+Clients encode request bodies and decode response bodies through a
+JSONCodec. By default the fastest installed backend is used: orjson, then
+ujson, then the standard library json module. A specific one can be
+requested by name:
+
+```
+pw = PayWhirl(api_key, api_secret, json_codec='stdlib')
+```
+"""
+
+import json
+from typing import Any, Dict, Union
+
+
+class JSONCodec:
+    """Interface of a JSON backend."""
+
+    name = 'abstract'
+
+    def dumps(self, obj: Any) -> bytes:
+        """Serialize obj to UTF-8 encoded JSON."""
+        raise NotImplementedError
+
+    def loads(self, data: bytes) -> Any:
+        """Parse a JSON document."""
+        raise NotImplementedError
+
+
+class StdlibCodec(JSONCodec):
+    """The standard library json module."""
+
+    name = 'stdlib'
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """orjson, usually the fastest for both directions."""
+
+    name = 'orjson'
+
+    def __init__(self) -> None:
+        import orjson # pylint: disable=import-outside-toplevel,import-error
+        self._orjson = orjson
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._orjson.dumps(obj, option=self._options)
+
+    def loads(self, data: bytes) -> Any:
+        return self._orjson.loads(data)
+
+
+class UjsonCodec(JSONCodec):
+    """ujson."""
+
+    name = 'ujson'
+
+    def __init__(self) -> None:
+        import ujson # pylint: disable=import-outside-toplevel,import-error
+        self._ujson = ujson
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._ujson.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+    def loads(self, data: bytes) -> Any:
+        return self._ujson.loads(data)
+
+
+CODECS = {
+    'orjson': OrjsonCodec,
+    'ujson': UjsonCodec,
+    'stdlib': StdlibCodec,
+}  # type: Dict[str, type]
+
+_default = None
+
+
+def get_codec(codec: Union[None, str, JSONCodec] = None) -> JSONCodec:
+    """Resolve a codec name, instance or None into a JSONCodec.
+
+    None picks the first backend of CODECS that is installed.
+    """
+
+    global _default # pylint: disable=global-statement
+
+    if isinstance(codec, JSONCodec):
+        return codec
+    if codec is not None:
+        if codec not in CODECS:
+            raise ValueError(str.format('unknown JSON codec {0!r}', codec))
+        return CODECS[codec]()
+    if _default is None:
+        for factory in CODECS.values():
+            try:
+                _default = factory()
+                break
+            except ImportError:
+                continue
+    return _default
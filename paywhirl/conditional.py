@@ -0,0 +1,99 @@
+"""Conditional GET requests
+========================
+
+Polling a list endpoint re-downloads and re-parses the same body over and
+over while nothing changes. With a ConditionalCache, a client remembers
+the ETag and Last-Modified validators of every GET response and sends
+them back as If-None-Match / If-Modified-Since. When the server answers
+304 Not Modified, the previously parsed body is returned without reading
+or decoding anything:
+
+```
+pw = PayWhirl(api_key, api_secret, conditional=ConditionalCache())
+while True:
+    subscribers = pw.get_subscribers({'limit': 100})  # cheap when unchanged
+    time.sleep(30)
+```
+
+The body returned after a 304 is the very object returned by the earlier
+call, so treat responses of polled endpoints as read-only. A 304 answer
+to a request sent without validators has no body to return, and raises
+HTTPError instead. Validators are kept per client API base and key, so a
+ConditionalCache may be shared by clients of different accounts.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+# HTTPError message of a 304 answer to an unconditional request
+NOT_MODIFIED_ERROR = '304 Not Modified for url: {0}, but no validators were sent'
+
+
+class ConditionalCache:
+    """Thread-safe LRU store of response validators and parsed bodies."""
+
+    maxsize: int
+
+    def __init__(self, maxsize: int = 256) -> None:
+        """Create a validator store.
+
+        Args:
+            maxsize: the number of distinct GET requests (path and
+                params) remembered. Defaults to 256.
+        """
+
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # type: OrderedDict
+        self._lock = threading.Lock()
+        self._counters = {'not_modified': 0, 'modified': 0}
+
+    def prepare(self, key: str, headers: Optional[dict]) -> Tuple[Optional[dict], Any]:
+        """Add the validators known for key to a request's headers.
+
+        Returns:
+            The request headers to send, and the body to return if the
+            server answers 304 Not Modified.
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return headers, None
+            self._entries.move_to_end(key)
+        etag, last_modified, body = entry
+        headers = dict(headers or {})
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers, body
+
+    def not_modified(self) -> None:
+        """Count a 304 response."""
+
+        with self._lock:
+            self._counters['not_modified'] += 1
+
+    def remember(self, key: str, headers: Mapping[str, str], body: Any) -> None:
+        """Store the validators and body of a 200 response, if it has any."""
+
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        with self._lock:
+            self._counters['modified'] += 1
+            if not etag and not last_modified:
+                self._entries.pop(key, None)
+                return
+            self._entries[key] = (etag, last_modified, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        """Return how many responses were (not) modified."""
+
+        with self._lock:
+            stats = dict(self._counters)
+            stats['size'] = len(self._entries)
+            return stats
@@ -0,0 +1,2495 @@
+# Generated from paywhirl/endpoints.py by paywhirl/methods.py, do not edit.
+# Regenerate with: python -m paywhirl.methods
+"""Endpoint methods of PayWhirl (EndpointMethods) and AsyncPayWhirl
+(AsyncEndpointMethods), see paywhirl.methods."""
+# pylint: disable=line-too-long,too-many-lines,too-many-public-methods
+# pylint: disable=too-many-arguments,no-member
+
+from typing import Any, AsyncIterator, Iterator
+
+from .endpoints import ENDPOINTS
+from .metrics import current_endpoint
+
+_set = current_endpoint.set
+_reset = current_endpoint.reset
+
+_path_get_customer = ENDPOINTS['get_customer'].format_path
+_path_get_addresses = ENDPOINTS['get_addresses'].format_path
+_path_get_address = ENDPOINTS['get_address'].format_path
+_path_update_address = ENDPOINTS['update_address'].format_path
+_path_delete_address = ENDPOINTS['delete_address'].format_path
+_path_get_profile = ENDPOINTS['get_profile'].format_path
+_path_get_plan = ENDPOINTS['get_plan'].format_path
+_path_get_subscriptions = ENDPOINTS['get_subscriptions'].format_path
+_path_get_subscription = ENDPOINTS['get_subscription'].format_path
+_path_get_invoice = ENDPOINTS['get_invoice'].format_path
+_path_update_invoice_next_payment_attempt = ENDPOINTS['update_invoice_next_payment_attempt'].format_path
+_path_get_invoices = ENDPOINTS['get_invoices'].format_path
+_convert_get_invoices_all_invoices = ENDPOINTS['get_invoices'].params[1].convert
+_path_stream_invoices = ENDPOINTS['stream_invoices'].format_path
+_convert_stream_invoices_all_invoices = ENDPOINTS['stream_invoices'].params[1].convert
+_path_process_invoice = ENDPOINTS['process_invoice'].format_path
+_path_mark_invoice_as_paid = ENDPOINTS['mark_invoice_as_paid'].format_path
+_path_add_promo_code_to_invoice = ENDPOINTS['add_promo_code_to_invoice'].format_path
+_path_remove_promo_code_from_invoice = ENDPOINTS['remove_promo_code_from_invoice'].format_path
+_path_update_invoice_card = ENDPOINTS['update_invoice_card'].format_path
+_path_update_invoice_items = ENDPOINTS['update_invoice_items'].format_path
+_path_get_gateway = ENDPOINTS['get_gateway'].format_path
+_path_get_charge = ENDPOINTS['get_charge'].format_path
+_path_refund_charge = ENDPOINTS['refund_charge'].format_path
+_path_get_cards = ENDPOINTS['get_cards'].format_path
+_path_get_card = ENDPOINTS['get_card'].format_path
+_path_get_promo = ENDPOINTS['get_promo'].format_path
+_path_get_email_template = ENDPOINTS['get_email_template'].format_path
+_path_get_shipping_rule = ENDPOINTS['get_shipping_rule'].format_path
+_path_get_tax_rule = ENDPOINTS['get_tax_rule'].format_path
+
+
+class EndpointMethods:
+    """The endpoint methods of PayWhirl."""
+
+    def get_customers(self, data: dict) -> Any:
+        """Get a list of customers associated with your account.
+
+        Args:
+            data:
+                {
+                    'limit': (int),
+                    'order_key': (str),
+                    'order_direction': (str),
+                    'before_id': (int),
+                    'after_id': (int),
+                    'keyword': (str)
+                }
+
+                'limit' defaults to 100. 'order_key' defaults to 'id'.
+                'order_direction' options are 'asc' and 'desc'
+                for ascend and descend, respectively.
+                'before_id' returns all customers less than the
+                specified id, and 'after_id' returns
+                all customers greater than the specified id.
+                'keyword' will filter the results by the chosen string.
+
+        Returns:
+            A list of customer dicts filtered by your arguments,
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('get_customers')
+        try:
+            params = data
+            return self._request('get', '/customers', params)
+        finally:
+            _reset(token)
+
+    def stream_customers(self, data: dict = None) -> Iterator[Any]:
+        """Like get_customers(), but parse the response as it arrives.
+
+        Meant for very large pages: customers are yielded as soon as
+        they are received, and only one at a time is held in memory.
+        The request is made when iteration starts.
+
+        Args:
+            data: the same filters accepted by get_customers()
+
+        Returns:
+            A generator yielding one customer dict at a time. It raises
+            ValueError if the response is not a list.
+        """
+
+        params = data
+        return self._stream('/customers', params, 'stream_customers')
+
+    def get_customer(self, customer_id: int) -> Any:
+        """Get a single customer.
+
+        Args:
+            customer_id: the id number obtained from paywhirl's servers.
+                (use the get_customers() method to find your IDs)
+
+        Returns:
+            A dictionary with complete customer data
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('get_customer')
+        try:
+            params = None
+            return self._request('get', _path_get_customer(customer_id), params)
+        finally:
+            _reset(token)
+
+    def get_addresses(self, customer_id: int) -> Any:
+        """Get all addresses associated with a single customer
+
+        Args:
+            customer_id: the id number obtained from paywhirl's servers.
+                (use the get_customers() method to find your IDs)
+
+        Returns:
+            A dictionary with a list of addresses associated with the
+            customer
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('get_addresses')
+        try:
+            params = None
+            return self._request('get', _path_get_addresses(customer_id), params)
+        finally:
+            _reset(token)
+
+    def get_address(self, address_id: int) -> Any:
+        """Get all addresses associated with a single customer
+
+        Args:
+            address_id: the id number obtained from paywhirl's servers.
+                (use the get_addresses() method to find your IDs)
+
+        Returns:
+            An address associated with the given id
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('get_address')
+        try:
+            params = None
+            return self._request('get', _path_get_address(address_id), params)
+        finally:
+            _reset(token)
+
+    def create_address(self, data: dict) -> Any:
+        """Create a new address for a customer
+
+        Args:
+            data:
+                {
+                    'customer_id': (int),
+                    'first_name': (str),
+                    'last_name': (str),
+                    'address': (str),
+                    'city': (str),
+                    'state': (str),
+                    'zip': (str),
+                    'country': (str),
+                    'phone': (str),
+                }
+
+        Returns:
+            The new address or an error message
+        """
+
+        token = _set('create_address')
+        try:
+            params = data
+            return self._request('post', '/customer/address', params)
+        finally:
+            _reset(token)
+
+    def update_address(self, address_id: int, data: dict) -> Any:
+        """Update existing address of a customer
+
+        Args:
+            address_id: id of the address to update
+            data:
+                {
+                    'first_name': (str),
+                    'last_name': (str),
+                    'address': (str),
+                    'city': (str),
+                    'state': (str),
+                    'zip': (str),
+                    'country': (str),
+                    'phone': (str),
+                }
+
+        Returns:
+            The updated address or an error message
+        """
+
+        token = _set('update_address')
+        try:
+            params = data
+            return self._request('patch', _path_update_address(address_id), params)
+        finally:
+            _reset(token)
+
+    def delete_address(self, address_id: int) -> Any:
+        """Delete address of a customer
+
+        Args:
+            address_id: id of the address to delete
+
+        Returns:
+            Dictionary with status 'success' or 'failure'.
+        """
+
+        token = _set('delete_address')
+        try:
+            params = None
+            return self._request('delete', _path_delete_address(address_id), params)
+        finally:
+            _reset(token)
+
+    def get_profile(self, customer_id: int) -> Any:
+        """Get a full profile for a given customer. This includes
+            the customer, the addresses, and the answers to profile
+            questions.
+
+        Args:
+            customer_id: the id number obtained from paywhirl's servers.
+                (use the get_addresses() method to find your IDs)
+
+        Returns:
+            A dictionary associated with the given id that includes
+            customer, addresses, and profile answers
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('get_profile')
+        try:
+            params = None
+            return self._request('get', _path_get_profile(customer_id), params)
+        finally:
+            _reset(token)
+
+    def auth_customer(self, email: str, password: str) -> Any:
+        """Authenticate a customer with supplied data.
+
+        Args:
+            email: customer's email address
+            password: plain-text or bcrypt hashed password
+
+        Returns:
+            Dictionary with status 'success' or 'failure'.
+        """
+
+        token = _set('auth_customer')
+        try:
+            params = {'email': email, 'password': password}
+            return self._request('post', '/auth/customer', params)
+        finally:
+            _reset(token)
+
+    def create_customer(self, data: dict) -> Any:
+        """Create a new customer with supplied data.
+
+        Args:
+            data:
+                {
+                    'first_name': (str),
+                    'last_name': (str),
+                    'email': (str),
+                    'password': (str),
+                    'currency': (str)
+                }
+
+            Only the required key: value pairs are listed above,
+            more information about additional options can be found
+            on the docs site located in the header of this file.
+
+        Returns:
+            A response containing either the created customer dictionary
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('create_customer')
+        try:
+            params = data
+            return self._request('post', '/create/customer', params)
+        finally:
+            _reset(token)
+
+    def update_customer(self, data: dict) -> Any:
+        """Update an existing customer (selected by id) with new info.
+
+        Args:
+            data:
+                {
+                    'id': (int),
+                    ...
+                }
+
+            Any element existing in a current customer object should
+            be a viable key-value pair to pass in for modification.
+
+        Returns:
+            A dict containing either the updated customer
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('update_customer')
+        try:
+            params = data
+            return self._request('post', '/update/customer', params)
+        finally:
+            _reset(token)
+
+    def delete_customer(self, customer_id: int, forget: int = None) -> Any:
+        """Delete an existing customer by its ID.
+
+        Args:
+            customer_id: this can be found via the get_customers() method.
+            forget: send 1 to make this customer data obfuscated besides soft-deleted.
+
+        Returns:
+            A dictionary with {'status: 'success' or 'fail'}
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('delete_customer')
+        try:
+            params = {'id': customer_id}
+            if forget is not None:
+                params['forget'] = forget
+            return self._request('post', '/delete/customer', params)
+        finally:
+            _reset(token)
+
+    def get_questions(self, return_list_size: int = 100) -> Any:
+        """Retrieve a list of all questions associated with your
+           account.
+
+        Args:
+            return_list_size: on a successful query, this will
+                specify the number of elements in the returned list.
+                Default value is 100.
+
+        Returns:
+            A list containing answer dicts,
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('get_questions')
+        try:
+            params = {'limit': return_list_size}
+            return self._request('get', '/questions', params)
+        finally:
+            _reset(token)
+
+    def update_answer(self, data: dict) -> Any:
+        """Update an existing answer with new info.
+
+        Args:
+            data:
+                {
+                    'customer_id': (int),
+                    'question_name': (str),
+                    'answer': (str),
+                    'address_id': (int)
+                }
+
+        Returns:
+            A dict containing either the updated answer,
+            a list of answers,
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('update_answer')
+        try:
+            params = data
+            return self._request('post', '/update/answer', params)
+        finally:
+            _reset(token)
+
+    def get_answers(self, customer_id: int) -> Any:
+        """Get a list of answers associated with a customer.
+
+        Args:
+            customer_id: the 'id' value from a customer dict.
+                you can find this via the get_customers() method.
+
+        Returns:
+            A list containing answer dictionaries,
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('get_answers')
+        try:
+            params = {'customer_id': customer_id}
+            return self._request('get', '/answers', params)
+        finally:
+            _reset(token)
+
+    def get_plans(self, data: dict) -> Any:
+        """Get a list of plans associated with your account.
+
+        Args:
+            data:
+            {
+                'limit': (int),
+                'order_key': (str),
+                'order_direction': (str),
+                'before_id': (int),
+                'after_id': (int)
+            }
+
+            'limit' defaults to 100. 'order_key' defaults to 'id'.
+            'order_direction' can be 'asc' or 'desc'. Defaults to
+            descending. 'before_id' and 'after_id' will return plans
+            with 'id's less than or greater than the selected 'id'
+            number, respectively.
+
+        Returns:
+            A list containing plan dictionaries,
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('get_plans')
+        try:
+            params = data
+            return self._request('get', '/plans', params)
+        finally:
+            _reset(token)
+
+    def get_plan(self, plan_id: int) -> Any:
+        """Get a single plan using the plan's ID
+
+        Args:
+            plan_id: the id number obtained from paywhirl's servers.
+                (use the get_plans() method to find your IDs)
+        Returns:
+            A dictionary with data for a given plan
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('get_plan')
+        try:
+            params = None
+            return self._request('get', _path_get_plan(plan_id), params)
+        finally:
+            _reset(token)
+
+    def create_plan(self, data: dict) -> Any:
+        """Create a plan to set rules for how a customer will be billed.
+
+        Args:
+            data: A dictionary containing plan rules.
+            See the docs linked in the header for more info.
+
+        Returns:
+            A dictionary containing the created plan
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('create_plan')
+        try:
+            params = data
+            return self._request('post', '/create/plan', params)
+        finally:
+            _reset(token)
+
+    def update_plan(self, data: dict) -> Any:
+        """Update an existing plan selected by a plan's 'id' member.
+
+        Args:
+            data: A dictionary containing plan rules. the 'id' field
+                is required.
+            See the docs linked in the header for more info.
+
+        Returns:
+            A dictionary containing the updated plan
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('update_plan')
+        try:
+            params = data
+            return self._request('post', '/update/plan', params)
+        finally:
+            _reset(token)
+
+    def get_subscriptions(self, customer_id: int, status: str = 'active') -> Any:
+        """Retrieve a list of all subscriptions for a given customer.
+
+        Args:
+            customer_id: This can be found using the get_customers()
+                method.
+            status: Any of 'active', 'all' or 'canceled'
+
+        Returns:
+            A list containing plan dictionaries
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('get_subscriptions')
+        try:
+            params = {'status': status}
+            return self._request('get', _path_get_subscriptions(customer_id), params)
+        finally:
+            _reset(token)
+
+    def get_subscription(self, subscription_id: int) -> Any:
+        """Retrieve a single subscription by passing in an ID.
+
+        Args:
+            subscription_id: These can be found by using the
+                get_subscriptions() method.
+
+        Returns:
+            A single dict containing subscription information
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('get_subscription')
+        try:
+            params = None
+            return self._request('get', _path_get_subscription(subscription_id), params)
+        finally:
+            _reset(token)
+
+    def subscribe_customer(self, data: dict, idempotency_key: str = None) -> Any:
+        """Subscribe a customer to a given plan.
+
+        Args:
+            data:
+                {
+                    'customer_id': (int),
+                    'plan_id': (int),
+                    'quantity': (int),
+                    'promo_id': (int),
+                    'trial_end': (int)
+                }
+            customer_id: The existing customer. (These can be found
+                with the get_customers() method).
+
+            plan_id: The plan to subscribe to. (These can be found
+                with the get_plans() method).
+
+            trial_end(optional): A UNIX timestamp indicating when a
+                trial period should end. The docs linked in the header
+                have extra information on how to generate these.
+                Defaults to no trial.
+
+            promo_id(optional): An existing promo code ID number.
+                (These can be found with the get_promos() method).
+
+            quantity(optional): Number of subscriptions to subscribe to.
+                This defaults to 1.
+
+            idempotency_key(optional): A unique string identifying this
+                subscription, e.g. derived from your own order id.
+                Defaults to a random key, which still makes the call
+                safe to retry but can not be recognised when re-run.
+
+        Returns:
+            A dictionary containing information about the subscription
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('subscribe_customer')
+        try:
+            params = data
+            return self._idempotent_post('/subscribe/customer', params, idempotency_key)
+        finally:
+            _reset(token)
+
+    def update_subscription(self, subscription_id: int, plan_id: int, quantity: int = None, address_id: int = None, installments_left: int = None, trial_end: int = None, card_id: int = None) -> Any:
+        """Change a customer's subscription to a different plan.
+
+        Args:
+            subscription_id: The current subscription id.
+            plan_id: The new plan for the subscription.
+
+        Returns:
+            A dictionary containing information about the subscription
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('update_subscription')
+        try:
+            params = {'subscription_id': subscription_id, 'plan_id': plan_id}
+            if quantity is not None:
+                params['quantity'] = quantity
+            if address_id is not None:
+                params['address_id'] = address_id
+            if installments_left is not None:
+                params['installments_left'] = installments_left
+            if trial_end is not None:
+                params['trial_end'] = trial_end
+            if card_id is not None:
+                params['card_id'] = card_id
+            return self._request('post', '/update/subscription', params)
+        finally:
+            _reset(token)
+
+    def unsubscribe_customer(self, subscription_id: int) -> Any:
+        """Cancel a customer's existing subscription.
+
+        Args:
+            subscription_id: You can find these by using the
+                get_subscriptions() method for a given customer.
+
+        Returns:
+            A dictionary with {'status: 'success' or 'fail'}
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('unsubscribe_customer')
+        try:
+            params = {'subscription_id': subscription_id}
+            return self._request('post', '/unsubscribe/customer', params)
+        finally:
+            _reset(token)
+
+    def get_subscribers(self, data: dict) -> Any:
+        """Get a list of all active subscribers.
+
+        Args:
+            data:
+            {
+                'limit': (int),
+                'order': (str),
+                'keyword': (str),
+                'starting_after': (int),
+                'starting_before': (int)
+            }
+
+            'limit' defaults to 20.
+            'order' can be 'asc', 'desc', or 'rand'.
+            'starting_after' will return subscribers with
+            subscription IDs greater than 'starting_after'.
+            'starting_before' will return subscribers with
+            subscription IDs greater than 'starting_before'.
+            'keyword' will filter the results by that word.
+
+        Returns:
+            A list containing subscriber dictionaries,
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('get_subscribers')
+        try:
+            params = data
+            return self._request('get', '/subscribers', params)
+        finally:
+            _reset(token)
+
+    def stream_subscribers(self, data: dict = None) -> Iterator[Any]:
+        """Like get_subscribers(), but parse the response as it arrives.
+
+        See stream_customers().
+
+        Args:
+            data: the same filters accepted by get_subscribers()
+
+        Returns:
+            A generator yielding one subscriber dict at a time.
+        """
+
+        params = data
+        return self._stream('/subscribers', params, 'stream_subscribers')
+
+    def get_invoice(self, invoice_id: int) -> Any:
+        """Get the data for a single invoice when given an ID number.
+
+        Args:
+            invoice_id: Pass in a known invoice ID or use get_invoices()
+                to get a collection of them from a single customer.
+
+        Returns:
+            A dictionary containing information about the selected
+            invoice, or an error message indicating what went wrong.
+        """
+
+        token = _set('get_invoice')
+        try:
+            params = None
+            return self._request('get', _path_get_invoice(invoice_id), params)
+        finally:
+            _reset(token)
+
+    def update_invoice_next_payment_attempt(self, invoice_id: int, next_payment_attempt_timestamp: int, to_all: int = 0) -> Any:
+        """Process an upcoming invoice by invoice id
+
+        Args:
+            invoice_id: Pass in a known invoice ID or use get_invoices()
+                to get a collection of them from a single customer.
+            next_payment_attempt_timestamp: UNIX timestamp of the scheduled date of processing. Must be in the future.
+            See api.paywhirl.com documentation for details
+        Returns:
+            Success or Fail
+        """
+
+        token = _set('update_invoice_next_payment_attempt')
+        try:
+            params = {'next_payment_attempt': next_payment_attempt_timestamp, 'all': to_all}
+            return self._request('post', _path_update_invoice_next_payment_attempt(invoice_id), params)
+        finally:
+            _reset(token)
+
+    def get_invoices(self, customer_id: int, all_invoices: bool = False) -> Any:
+        """Get a list of upcoming invoices for a specified customer.
+
+        Args:
+            customer_id: These can be found using the get_customers()
+                method.
+
+        Returns:
+            A dictionary or list of dictionaries containing invoice
+            data, or an error message indicating what went wrong.
+        """
+
+        token = _set('get_invoices')
+        try:
+            params = {'all': _convert_get_invoices_all_invoices(all_invoices)}
+            return self._request('get', _path_get_invoices(customer_id), params)
+        finally:
+            _reset(token)
+
+    def stream_invoices(self, customer_id: int, all_invoices: bool = False) -> Iterator[Any]:
+        """Like get_invoices(), but parse the response as it arrives.
+
+        See stream_customers().
+
+        Args:
+            customer_id: These can be found using the get_customers()
+                method.
+
+        Returns:
+            A generator yielding one invoice dict at a time.
+        """
+
+        params = {'all': _convert_stream_invoices_all_invoices(all_invoices)}
+        return self._stream(_path_stream_invoices(customer_id), params, 'stream_invoices')
+
+    def process_invoice(self, invoice_id: int, data: dict, idempotency_key: str = None) -> Any:
+        """Process an upcoming invoice by invoice id
+
+        Args:
+            invoice_id: Pass in a known invoice ID or use get_invoices()
+                to get a collection of them from a single customer.
+            data: a dictionary with additional processing params
+            See api.paywhirl.com documentation for details
+            idempotency_key: a unique string identifying this attempt.
+                Defaults to a random key, see subscribe_customer().
+        Returns:
+            Success or Fail
+        """
+
+        token = _set('process_invoice')
+        try:
+            params = data
+            return self._idempotent_post(_path_process_invoice(invoice_id), params, idempotency_key)
+        finally:
+            _reset(token)
+
+    def mark_invoice_as_paid(self, invoice_id: int) -> Any:
+        """Mark an upcoming invoice as paid by invoice id
+
+        Args:
+            invoice_id: Pass in a known invoice ID or use get_invoices()
+                to get a collection of them from a single customer.
+        Returns:
+            Success or Fail
+        """
+
+        token = _set('mark_invoice_as_paid')
+        try:
+            params = None
+            return self._request('post', _path_mark_invoice_as_paid(invoice_id), params)
+        finally:
+            _reset(token)
+
+    def add_promo_code_to_invoice(self, invoice_id: int, promo_code: str) -> Any:
+        """Add a promo code to an upcoming invoice
+
+        Args:
+            invoice_id: Pass in a known invoice ID or use get_invoices()
+                to get a collection of them from a single customer.
+            promo_code: The promo code to apply.
+        Returns:
+            Success or Fail
+        """
+
+        token = _set('add_promo_code_to_invoice')
+        try:
+            params = {'promo_code': promo_code}
+            return self._request('post', _path_add_promo_code_to_invoice(invoice_id), params)
+        finally:
+            _reset(token)
+
+    def remove_promo_code_from_invoice(self, invoice_id: int) -> Any:
+        """Remove promo code from an upcoming invoice
+
+        Args:
+            invoice_id: Pass in a known invoice ID or use get_invoices()
+                to get a collection of them from a single customer.
+        Returns:
+            Success or Fail
+        """
+
+        token = _set('remove_promo_code_from_invoice')
+        try:
+            params = None
+            return self._request('post', _path_remove_promo_code_from_invoice(invoice_id), params)
+        finally:
+            _reset(token)
+
+    def update_invoice_card(self, invoice_id: int, card_id: int) -> Any:
+        """Change the card associated with a given invoice
+
+        Args:
+            invoice_id: Pass in a known invoice ID or use get_invoices()
+                to get a collection of them from a single customer.
+            card_id: Pass in a known card ID to set active card.
+        Returns:
+            Success or Fail
+        """
+
+        token = _set('update_invoice_card')
+        try:
+            params = {'card_id': card_id}
+            return self._request('post', _path_update_invoice_card(invoice_id), params)
+        finally:
+            _reset(token)
+
+    def update_invoice_items(self, invoice_id: int, line_items: dict) -> Any:
+        """Change the number of line items in a give invoice
+
+        Args:
+            invoice_id: Pass in a known invoice ID or use get_invoices()
+                to get a collection of them from a single customer.
+            line_items: Pass in a dictionary of item ids and the updated quantity
+                example:{'1111': 4, '1112', 5}
+        Returns:
+            Success or Fail, and number of items changed
+        """
+
+        token = _set('update_invoice_items')
+        try:
+            params = line_items
+            return self._request('post', _path_update_invoice_items(invoice_id), params)
+        finally:
+            _reset(token)
+
+    def create_invoice(self, data: dict, idempotency_key: str = None) -> Any:
+        """Create a new invoice
+
+        Args:
+            data: a dictionary describing the invoice and the items
+            See api.paywhirl.com documentation for details
+            idempotency_key: a unique string identifying this invoice.
+                Defaults to a random key, see subscribe_customer().
+        Returns:
+            Success or Fail and invoice_id
+        """
+
+        token = _set('create_invoice')
+        try:
+            params = data
+            return self._idempotent_post('/invoices', params, idempotency_key)
+        finally:
+            _reset(token)
+
+    def delete_invoice(self, invoice_id: int) -> Any:
+        """Delete an existing invoice by its ID number.
+
+        Args:
+            invoice_id: this can be found via the get_invoices() method.
+
+        Returns:
+            A dictionary with {'status: 'success' or 'fail'}
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('delete_invoice')
+        try:
+            params = {'id': invoice_id}
+            return self._request('post', '/delete/invoice', params)
+        finally:
+            _reset(token)
+
+    def get_gateways(self) -> Any:
+        """Returns a list of your payment gateways.
+
+        Returns:
+            A dictionary or list of dictionaries containing gateway
+            data, or an error message indicating what went wrong.
+        """
+
+        token = _set('get_gateways')
+        try:
+            params = None
+            return self._request('get', '/gateways', params)
+        finally:
+            _reset(token)
+
+    def get_gateway(self, gateway_id: int) -> Any:
+        """Get a gateway specified by its ID number.
+
+        Args:
+            gateway_id: this can be found using get_gateways().
+
+        Returns:
+            A dictionary or list of dictionaries containing gateway
+            data, or an error message indicating what went wrong.
+        """
+
+        token = _set('get_gateway')
+        try:
+            params = None
+            return self._request('get', _path_get_gateway(gateway_id), params)
+        finally:
+            _reset(token)
+
+    def create_charge(self, data: dict, idempotency_key: str = None) -> Any:
+        """Attempt to a customer and return an invoice.
+
+        Args:
+            dict:
+                See docs linked in the header for param options.
+            idempotency_key: a unique string identifying this charge.
+                Defaults to a random key, see subscribe_customer().
+
+        Returns:
+            A dictionary containing an invoice, or an error message
+            indicating what went wrong.
+        """
+
+        token = _set('create_charge')
+        try:
+            params = data
+            return self._idempotent_post('/create/charge', params, idempotency_key)
+        finally:
+            _reset(token)
+
+    def get_charge(self, charge_id: int) -> Any:
+        """Get a single charge using the charge ID.
+
+        Args:
+            charge_id: these can be found in each invoice.
+
+        Returns:
+            A dictionary containing charge information, or an error
+            message indicating what went wrong.
+        """
+
+        token = _set('get_charge')
+        try:
+            params = None
+            return self._request('get', _path_get_charge(charge_id), params)
+        finally:
+            _reset(token)
+
+    def refund_charge(self, charge_id: int, data: dict) -> Any:
+        """Refund a charge by its ID.
+
+        Args:
+            charge_id: ID of the charge
+            data: dict with refund_amount and mark_only params.
+            See API docs for more info
+
+        Returns:
+            A dictionary containing charge information, or an error
+            message indicating what went wrong.
+        """
+
+        token = _set('refund_charge')
+        try:
+            params = data
+            return self._request('post', _path_refund_charge(charge_id), params)
+        finally:
+            _reset(token)
+
+    def get_cards(self, customer_id: int) -> Any:
+        """Get a list of cards associated with a customer.
+
+        Args:
+            customer_id: these can be obtained via get_customers()
+
+        Returns:
+            A list of dicts containing card information, or an error
+            message indicating what went wrong.
+        """
+
+        token = _set('get_cards')
+        try:
+            params = None
+            return self._request('get', _path_get_cards(customer_id), params)
+        finally:
+            _reset(token)
+
+    def get_card(self, card_id: int) -> Any:
+        """Get a single card by ID.
+
+        Args:
+            customer_id: these can be via get_customers()
+
+        Returns:
+            A list of dicts containing card information, or an error
+            message indicating what went wrong.
+        """
+
+        token = _set('get_card')
+        try:
+            params = None
+            return self._request('get', _path_get_card(card_id), params)
+        finally:
+            _reset(token)
+
+    def create_card(self, data: dict) -> Any:
+        """Create a payment method and add it to an existing customer.
+
+        Args:
+            data: See docs linked in the header for param options.
+
+        Returns:
+            A dict containing card information, or an error
+            message indicating what went wrong.
+        """
+
+        token = _set('create_card')
+        try:
+            params = data
+            return self._request('post', '/create/card', params)
+        finally:
+            _reset(token)
+
+    def delete_card(self, card_id: int) -> Any:
+        """Delete an existing card by its ID number.
+
+        Args:
+            card_id: this can be found via the get_cards() method.
+
+        Returns:
+            A dictionary with {'status: 'success' or 'fail'}
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('delete_card')
+        try:
+            params = {'id': card_id}
+            return self._request('post', '/delete/card', params)
+        finally:
+            _reset(token)
+
+    def get_promos(self) -> Any:
+        """Return a list of all promos on file.
+        """
+
+        token = _set('get_promos')
+        try:
+            params = None
+            return self._request('get', '/promo', params)
+        finally:
+            _reset(token)
+
+    def get_promo(self, promo_id: int) -> Any:
+        """Get a single promo by ID.
+
+        Args:
+            promo_id: these can be obtained via get_customers()
+
+        Returns:
+            A dict containing promo information, or an error
+            message indicating what went wrong.
+        """
+
+        token = _set('get_promo')
+        try:
+            params = None
+            return self._request('get', _path_get_promo(promo_id), params)
+        finally:
+            _reset(token)
+
+    def create_promo(self, data: dict) -> Any:
+        """Create a promo code to use with subscriptions.
+
+        Args:
+            data: See docs linked in the header for param options.
+
+        Returns:
+            A dict containing promo information, or an error
+            message indicating what went wrong.
+        """
+
+        token = _set('create_promo')
+        try:
+            params = data
+            return self._request('post', '/create/promo', params)
+        finally:
+            _reset(token)
+
+    def delete_promo(self, promo_id: int) -> Any:
+        """Delete an existing promo by its ID number.
+
+        Args:
+            promo_id: this can be found via the get_promos() method.
+
+        Returns:
+            A dictionary with {'status: 'success' or 'fail'}
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('delete_promo')
+        try:
+            params = {'id': promo_id}
+            return self._request('post', '/delete/promo', params)
+        finally:
+            _reset(token)
+
+    def get_email_template(self, template_id: int) -> Any:
+        """Get the data for an email template when given an ID number.
+
+        Args:
+            template_id: Pass in a known template ID.
+            You can find these on the paywhirl app template page.
+
+        Returns:
+            A dictionary containing information about the selected
+            template, or an error message indicating what went wrong.
+        """
+
+        token = _set('get_email_template')
+        try:
+            params = None
+            return self._request('get', _path_get_email_template(template_id), params)
+        finally:
+            _reset(token)
+
+    def send_email(self, data: dict) -> Any:
+        """Send a system generated email based on one of your pre-
+           defined templates on your paywhirl account page
+
+        Args:
+          see api.paywhirl.com, the list depends on what
+          email templates you have available
+
+        Returns:
+          either a string with "status" => "success" or an error message indicating
+          the need for another parameter
+        """
+
+        token = _set('send_email')
+        try:
+            params = data
+            return self._request('post', '/send-email', params)
+        finally:
+            _reset(token)
+
+    def get_account(self) -> Any:
+        """Get a dictionary containing your account information.
+        """
+
+        token = _set('get_account')
+        try:
+            params = None
+            return self._request('get', '/account', params)
+        finally:
+            _reset(token)
+
+    def get_stats(self) -> Any:
+        """Get invoice and revenue statistics about your account.
+        """
+
+        token = _set('get_stats')
+        try:
+            params = None
+            return self._request('get', '/stats', params)
+        finally:
+            _reset(token)
+
+    def get_shipping_rules(self) -> Any:
+        """Get a list of shipping rules in dict format.
+        """
+
+        token = _set('get_shipping_rules')
+        try:
+            params = None
+            return self._request('get', '/shipping/', params)
+        finally:
+            _reset(token)
+
+    def get_shipping_rule(self, shipping_rule_id: int) -> Any:
+        """Get the data for a shipping rule when given an ID number.
+
+        Args:
+            shipping_rule_id: Pass in a known template ID.
+            You can find these using the get_shipping_rules() method.
+
+        Returns:
+            A dictionary containing information about the selected
+            rule, or an error message indicating what went wrong.
+        """
+
+        token = _set('get_shipping_rule')
+        try:
+            params = None
+            return self._request('get', _path_get_shipping_rule(shipping_rule_id), params)
+        finally:
+            _reset(token)
+
+    def get_tax_rules(self) -> Any:
+        """Get a list of all tax rules created by your account.
+        """
+
+        token = _set('get_tax_rules')
+        try:
+            params = None
+            return self._request('get', '/tax', params)
+        finally:
+            _reset(token)
+
+    def get_tax_rule(self, rule_id: int) -> Any:
+        """Get the data for a tax rule when given an ID number.
+
+        Args:
+            rule_id: Pass in a known tax rule ID.
+            You can find these using the get_tax_rules() method.
+
+        Returns:
+            A dictionary containing information about the selected
+            rule, or an error message indicating what went wrong.
+        """
+
+        token = _set('get_tax_rule')
+        try:
+            params = None
+            return self._request('get', _path_get_tax_rule(rule_id), params)
+        finally:
+            _reset(token)
+
+    def get_multi_auth_token(self, data: dict) -> Any:
+        """Get a MultiAuth token to use to automatically
+                login a customer to a widget.
+
+        Args:
+            data: See docs linked in the header for param options.
+
+        Returns:
+            A dict containing a multiauth token, or an error
+            message indicating what went wrong.
+        """
+
+        token = _set('get_multi_auth_token')
+        try:
+            params = data
+            return self._request('post', '/multiauth', params)
+        finally:
+            _reset(token)
+
+
+class AsyncEndpointMethods:
+    """The endpoint methods of AsyncPayWhirl."""
+
+    async def get_customers(self, data: dict) -> Any:
+        """Get a list of customers associated with your account.
+
+        Args:
+            data:
+                {
+                    'limit': (int),
+                    'order_key': (str),
+                    'order_direction': (str),
+                    'before_id': (int),
+                    'after_id': (int),
+                    'keyword': (str)
+                }
+
+                'limit' defaults to 100. 'order_key' defaults to 'id'.
+                'order_direction' options are 'asc' and 'desc'
+                for ascend and descend, respectively.
+                'before_id' returns all customers less than the
+                specified id, and 'after_id' returns
+                all customers greater than the specified id.
+                'keyword' will filter the results by the chosen string.
+
+        Returns:
+            A list of customer dicts filtered by your arguments,
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('get_customers')
+        try:
+            params = data
+            return await self._request('get', '/customers', params)
+        finally:
+            _reset(token)
+
+    def stream_customers(self, data: dict = None) -> AsyncIterator[Any]:
+        """Like get_customers(), but parse the response as it arrives.
+
+        Meant for very large pages: customers are yielded as soon as
+        they are received, and only one at a time is held in memory.
+        The request is made when iteration starts.
+
+        Args:
+            data: the same filters accepted by get_customers()
+
+        Returns:
+            A generator yielding one customer dict at a time. It raises
+            ValueError if the response is not a list.
+        """
+
+        params = data
+        return self._stream('/customers', params, 'stream_customers')
+
+    async def get_customer(self, customer_id: int) -> Any:
+        """Get a single customer.
+
+        Args:
+            customer_id: the id number obtained from paywhirl's servers.
+                (use the get_customers() method to find your IDs)
+
+        Returns:
+            A dictionary with complete customer data
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('get_customer')
+        try:
+            params = None
+            return await self._request('get', _path_get_customer(customer_id), params)
+        finally:
+            _reset(token)
+
+    async def get_addresses(self, customer_id: int) -> Any:
+        """Get all addresses associated with a single customer
+
+        Args:
+            customer_id: the id number obtained from paywhirl's servers.
+                (use the get_customers() method to find your IDs)
+
+        Returns:
+            A dictionary with a list of addresses associated with the
+            customer
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('get_addresses')
+        try:
+            params = None
+            return await self._request('get', _path_get_addresses(customer_id), params)
+        finally:
+            _reset(token)
+
+    async def get_address(self, address_id: int) -> Any:
+        """Get all addresses associated with a single customer
+
+        Args:
+            address_id: the id number obtained from paywhirl's servers.
+                (use the get_addresses() method to find your IDs)
+
+        Returns:
+            An address associated with the given id
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('get_address')
+        try:
+            params = None
+            return await self._request('get', _path_get_address(address_id), params)
+        finally:
+            _reset(token)
+
+    async def create_address(self, data: dict) -> Any:
+        """Create a new address for a customer
+
+        Args:
+            data:
+                {
+                    'customer_id': (int),
+                    'first_name': (str),
+                    'last_name': (str),
+                    'address': (str),
+                    'city': (str),
+                    'state': (str),
+                    'zip': (str),
+                    'country': (str),
+                    'phone': (str),
+                }
+
+        Returns:
+            The new address or an error message
+        """
+
+        token = _set('create_address')
+        try:
+            params = data
+            return await self._request('post', '/customer/address', params)
+        finally:
+            _reset(token)
+
+    async def update_address(self, address_id: int, data: dict) -> Any:
+        """Update existing address of a customer
+
+        Args:
+            address_id: id of the address to update
+            data:
+                {
+                    'first_name': (str),
+                    'last_name': (str),
+                    'address': (str),
+                    'city': (str),
+                    'state': (str),
+                    'zip': (str),
+                    'country': (str),
+                    'phone': (str),
+                }
+
+        Returns:
+            The updated address or an error message
+        """
+
+        token = _set('update_address')
+        try:
+            params = data
+            return await self._request('patch', _path_update_address(address_id), params)
+        finally:
+            _reset(token)
+
+    async def delete_address(self, address_id: int) -> Any:
+        """Delete address of a customer
+
+        Args:
+            address_id: id of the address to delete
+
+        Returns:
+            Dictionary with status 'success' or 'failure'.
+        """
+
+        token = _set('delete_address')
+        try:
+            params = None
+            return await self._request('delete', _path_delete_address(address_id), params)
+        finally:
+            _reset(token)
+
+    async def get_profile(self, customer_id: int) -> Any:
+        """Get a full profile for a given customer. This includes
+            the customer, the addresses, and the answers to profile
+            questions.
+
+        Args:
+            customer_id: the id number obtained from paywhirl's servers.
+                (use the get_addresses() method to find your IDs)
+
+        Returns:
+            A dictionary associated with the given id that includes
+            customer, addresses, and profile answers
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('get_profile')
+        try:
+            params = None
+            return await self._request('get', _path_get_profile(customer_id), params)
+        finally:
+            _reset(token)
+
+    async def auth_customer(self, email: str, password: str) -> Any:
+        """Authenticate a customer with supplied data.
+
+        Args:
+            email: customer's email address
+            password: plain-text or bcrypt hashed password
+
+        Returns:
+            Dictionary with status 'success' or 'failure'.
+        """
+
+        token = _set('auth_customer')
+        try:
+            params = {'email': email, 'password': password}
+            return await self._request('post', '/auth/customer', params)
+        finally:
+            _reset(token)
+
+    async def create_customer(self, data: dict) -> Any:
+        """Create a new customer with supplied data.
+
+        Args:
+            data:
+                {
+                    'first_name': (str),
+                    'last_name': (str),
+                    'email': (str),
+                    'password': (str),
+                    'currency': (str)
+                }
+
+            Only the required key: value pairs are listed above,
+            more information about additional options can be found
+            on the docs site located in the header of this file.
+
+        Returns:
+            A response containing either the created customer dictionary
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('create_customer')
+        try:
+            params = data
+            return await self._request('post', '/create/customer', params)
+        finally:
+            _reset(token)
+
+    async def update_customer(self, data: dict) -> Any:
+        """Update an existing customer (selected by id) with new info.
+
+        Args:
+            data:
+                {
+                    'id': (int),
+                    ...
+                }
+
+            Any element existing in a current customer object should
+            be a viable key-value pair to pass in for modification.
+
+        Returns:
+            A dict containing either the updated customer
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('update_customer')
+        try:
+            params = data
+            return await self._request('post', '/update/customer', params)
+        finally:
+            _reset(token)
+
+    async def delete_customer(self, customer_id: int, forget: int = None) -> Any:
+        """Delete an existing customer by its ID.
+
+        Args:
+            customer_id: this can be found via the get_customers() method.
+            forget: send 1 to make this customer data obfuscated besides soft-deleted.
+
+        Returns:
+            A dictionary with {'status: 'success' or 'fail'}
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('delete_customer')
+        try:
+            params = {'id': customer_id}
+            if forget is not None:
+                params['forget'] = forget
+            return await self._request('post', '/delete/customer', params)
+        finally:
+            _reset(token)
+
+    async def get_questions(self, return_list_size: int = 100) -> Any:
+        """Retrieve a list of all questions associated with your
+           account.
+
+        Args:
+            return_list_size: on a successful query, this will
+                specify the number of elements in the returned list.
+                Default value is 100.
+
+        Returns:
+            A list containing answer dicts,
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('get_questions')
+        try:
+            params = {'limit': return_list_size}
+            return await self._request('get', '/questions', params)
+        finally:
+            _reset(token)
+
+    async def update_answer(self, data: dict) -> Any:
+        """Update an existing answer with new info.
+
+        Args:
+            data:
+                {
+                    'customer_id': (int),
+                    'question_name': (str),
+                    'answer': (str),
+                    'address_id': (int)
+                }
+
+        Returns:
+            A dict containing either the updated answer,
+            a list of answers,
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('update_answer')
+        try:
+            params = data
+            return await self._request('post', '/update/answer', params)
+        finally:
+            _reset(token)
+
+    async def get_answers(self, customer_id: int) -> Any:
+        """Get a list of answers associated with a customer.
+
+        Args:
+            customer_id: the 'id' value from a customer dict.
+                you can find this via the get_customers() method.
+
+        Returns:
+            A list containing answer dictionaries,
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('get_answers')
+        try:
+            params = {'customer_id': customer_id}
+            return await self._request('get', '/answers', params)
+        finally:
+            _reset(token)
+
+    async def get_plans(self, data: dict) -> Any:
+        """Get a list of plans associated with your account.
+
+        Args:
+            data:
+            {
+                'limit': (int),
+                'order_key': (str),
+                'order_direction': (str),
+                'before_id': (int),
+                'after_id': (int)
+            }
+
+            'limit' defaults to 100. 'order_key' defaults to 'id'.
+            'order_direction' can be 'asc' or 'desc'. Defaults to
+            descending. 'before_id' and 'after_id' will return plans
+            with 'id's less than or greater than the selected 'id'
+            number, respectively.
+
+        Returns:
+            A list containing plan dictionaries,
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('get_plans')
+        try:
+            params = data
+            return await self._request('get', '/plans', params)
+        finally:
+            _reset(token)
+
+    async def get_plan(self, plan_id: int) -> Any:
+        """Get a single plan using the plan's ID
+
+        Args:
+            plan_id: the id number obtained from paywhirl's servers.
+                (use the get_plans() method to find your IDs)
+        Returns:
+            A dictionary with data for a given plan
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('get_plan')
+        try:
+            params = None
+            return await self._request('get', _path_get_plan(plan_id), params)
+        finally:
+            _reset(token)
+
+    async def create_plan(self, data: dict) -> Any:
+        """Create a plan to set rules for how a customer will be billed.
+
+        Args:
+            data: A dictionary containing plan rules.
+            See the docs linked in the header for more info.
+
+        Returns:
+            A dictionary containing the created plan
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('create_plan')
+        try:
+            params = data
+            return await self._request('post', '/create/plan', params)
+        finally:
+            _reset(token)
+
+    async def update_plan(self, data: dict) -> Any:
+        """Update an existing plan selected by a plan's 'id' member.
+
+        Args:
+            data: A dictionary containing plan rules. the 'id' field
+                is required.
+            See the docs linked in the header for more info.
+
+        Returns:
+            A dictionary containing the updated plan
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('update_plan')
+        try:
+            params = data
+            return await self._request('post', '/update/plan', params)
+        finally:
+            _reset(token)
+
+    async def get_subscriptions(self, customer_id: int, status: str = 'active') -> Any:
+        """Retrieve a list of all subscriptions for a given customer.
+
+        Args:
+            customer_id: This can be found using the get_customers()
+                method.
+            status: Any of 'active', 'all' or 'canceled'
+
+        Returns:
+            A list containing plan dictionaries
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('get_subscriptions')
+        try:
+            params = {'status': status}
+            return await self._request('get', _path_get_subscriptions(customer_id), params)
+        finally:
+            _reset(token)
+
+    async def get_subscription(self, subscription_id: int) -> Any:
+        """Retrieve a single subscription by passing in an ID.
+
+        Args:
+            subscription_id: These can be found by using the
+                get_subscriptions() method.
+
+        Returns:
+            A single dict containing subscription information
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('get_subscription')
+        try:
+            params = None
+            return await self._request('get', _path_get_subscription(subscription_id), params)
+        finally:
+            _reset(token)
+
+    async def subscribe_customer(self, data: dict, idempotency_key: str = None) -> Any:
+        """Subscribe a customer to a given plan.
+
+        Args:
+            data:
+                {
+                    'customer_id': (int),
+                    'plan_id': (int),
+                    'quantity': (int),
+                    'promo_id': (int),
+                    'trial_end': (int)
+                }
+            customer_id: The existing customer. (These can be found
+                with the get_customers() method).
+
+            plan_id: The plan to subscribe to. (These can be found
+                with the get_plans() method).
+
+            trial_end(optional): A UNIX timestamp indicating when a
+                trial period should end. The docs linked in the header
+                have extra information on how to generate these.
+                Defaults to no trial.
+
+            promo_id(optional): An existing promo code ID number.
+                (These can be found with the get_promos() method).
+
+            quantity(optional): Number of subscriptions to subscribe to.
+                This defaults to 1.
+
+            idempotency_key(optional): A unique string identifying this
+                subscription, e.g. derived from your own order id.
+                Defaults to a random key, which still makes the call
+                safe to retry but can not be recognised when re-run.
+
+        Returns:
+            A dictionary containing information about the subscription
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('subscribe_customer')
+        try:
+            params = data
+            return await self._idempotent_post('/subscribe/customer', params, idempotency_key)
+        finally:
+            _reset(token)
+
+    async def update_subscription(self, subscription_id: int, plan_id: int, quantity: int = None, address_id: int = None, installments_left: int = None, trial_end: int = None, card_id: int = None) -> Any:
+        """Change a customer's subscription to a different plan.
+
+        Args:
+            subscription_id: The current subscription id.
+            plan_id: The new plan for the subscription.
+
+        Returns:
+            A dictionary containing information about the subscription
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('update_subscription')
+        try:
+            params = {'subscription_id': subscription_id, 'plan_id': plan_id}
+            if quantity is not None:
+                params['quantity'] = quantity
+            if address_id is not None:
+                params['address_id'] = address_id
+            if installments_left is not None:
+                params['installments_left'] = installments_left
+            if trial_end is not None:
+                params['trial_end'] = trial_end
+            if card_id is not None:
+                params['card_id'] = card_id
+            return await self._request('post', '/update/subscription', params)
+        finally:
+            _reset(token)
+
+    async def unsubscribe_customer(self, subscription_id: int) -> Any:
+        """Cancel a customer's existing subscription.
+
+        Args:
+            subscription_id: You can find these by using the
+                get_subscriptions() method for a given customer.
+
+        Returns:
+            A dictionary with {'status: 'success' or 'fail'}
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('unsubscribe_customer')
+        try:
+            params = {'subscription_id': subscription_id}
+            return await self._request('post', '/unsubscribe/customer', params)
+        finally:
+            _reset(token)
+
+    async def get_subscribers(self, data: dict) -> Any:
+        """Get a list of all active subscribers.
+
+        Args:
+            data:
+            {
+                'limit': (int),
+                'order': (str),
+                'keyword': (str),
+                'starting_after': (int),
+                'starting_before': (int)
+            }
+
+            'limit' defaults to 20.
+            'order' can be 'asc', 'desc', or 'rand'.
+            'starting_after' will return subscribers with
+            subscription IDs greater than 'starting_after'.
+            'starting_before' will return subscribers with
+            subscription IDs greater than 'starting_before'.
+            'keyword' will filter the results by that word.
+
+        Returns:
+            A list containing subscriber dictionaries,
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('get_subscribers')
+        try:
+            params = data
+            return await self._request('get', '/subscribers', params)
+        finally:
+            _reset(token)
+
+    def stream_subscribers(self, data: dict = None) -> AsyncIterator[Any]:
+        """Like get_subscribers(), but parse the response as it arrives.
+
+        See stream_customers().
+
+        Args:
+            data: the same filters accepted by get_subscribers()
+
+        Returns:
+            A generator yielding one subscriber dict at a time.
+        """
+
+        params = data
+        return self._stream('/subscribers', params, 'stream_subscribers')
+
+    async def get_invoice(self, invoice_id: int) -> Any:
+        """Get the data for a single invoice when given an ID number.
+
+        Args:
+            invoice_id: Pass in a known invoice ID or use get_invoices()
+                to get a collection of them from a single customer.
+
+        Returns:
+            A dictionary containing information about the selected
+            invoice, or an error message indicating what went wrong.
+        """
+
+        token = _set('get_invoice')
+        try:
+            params = None
+            return await self._request('get', _path_get_invoice(invoice_id), params)
+        finally:
+            _reset(token)
+
+    async def update_invoice_next_payment_attempt(self, invoice_id: int, next_payment_attempt_timestamp: int, to_all: int = 0) -> Any:
+        """Process an upcoming invoice by invoice id
+
+        Args:
+            invoice_id: Pass in a known invoice ID or use get_invoices()
+                to get a collection of them from a single customer.
+            next_payment_attempt_timestamp: UNIX timestamp of the scheduled date of processing. Must be in the future.
+            See api.paywhirl.com documentation for details
+        Returns:
+            Success or Fail
+        """
+
+        token = _set('update_invoice_next_payment_attempt')
+        try:
+            params = {'next_payment_attempt': next_payment_attempt_timestamp, 'all': to_all}
+            return await self._request('post', _path_update_invoice_next_payment_attempt(invoice_id), params)
+        finally:
+            _reset(token)
+
+    async def get_invoices(self, customer_id: int, all_invoices: bool = False) -> Any:
+        """Get a list of upcoming invoices for a specified customer.
+
+        Args:
+            customer_id: These can be found using the get_customers()
+                method.
+
+        Returns:
+            A dictionary or list of dictionaries containing invoice
+            data, or an error message indicating what went wrong.
+        """
+
+        token = _set('get_invoices')
+        try:
+            params = {'all': _convert_get_invoices_all_invoices(all_invoices)}
+            return await self._request('get', _path_get_invoices(customer_id), params)
+        finally:
+            _reset(token)
+
+    def stream_invoices(self, customer_id: int, all_invoices: bool = False) -> AsyncIterator[Any]:
+        """Like get_invoices(), but parse the response as it arrives.
+
+        See stream_customers().
+
+        Args:
+            customer_id: These can be found using the get_customers()
+                method.
+
+        Returns:
+            A generator yielding one invoice dict at a time.
+        """
+
+        params = {'all': _convert_stream_invoices_all_invoices(all_invoices)}
+        return self._stream(_path_stream_invoices(customer_id), params, 'stream_invoices')
+
+    async def process_invoice(self, invoice_id: int, data: dict, idempotency_key: str = None) -> Any:
+        """Process an upcoming invoice by invoice id
+
+        Args:
+            invoice_id: Pass in a known invoice ID or use get_invoices()
+                to get a collection of them from a single customer.
+            data: a dictionary with additional processing params
+            See api.paywhirl.com documentation for details
+            idempotency_key: a unique string identifying this attempt.
+                Defaults to a random key, see subscribe_customer().
+        Returns:
+            Success or Fail
+        """
+
+        token = _set('process_invoice')
+        try:
+            params = data
+            return await self._idempotent_post(_path_process_invoice(invoice_id), params, idempotency_key)
+        finally:
+            _reset(token)
+
+    async def mark_invoice_as_paid(self, invoice_id: int) -> Any:
+        """Mark an upcoming invoice as paid by invoice id
+
+        Args:
+            invoice_id: Pass in a known invoice ID or use get_invoices()
+                to get a collection of them from a single customer.
+        Returns:
+            Success or Fail
+        """
+
+        token = _set('mark_invoice_as_paid')
+        try:
+            params = None
+            return await self._request('post', _path_mark_invoice_as_paid(invoice_id), params)
+        finally:
+            _reset(token)
+
+    async def add_promo_code_to_invoice(self, invoice_id: int, promo_code: str) -> Any:
+        """Add a promo code to an upcoming invoice
+
+        Args:
+            invoice_id: Pass in a known invoice ID or use get_invoices()
+                to get a collection of them from a single customer.
+            promo_code: The promo code to apply.
+        Returns:
+            Success or Fail
+        """
+
+        token = _set('add_promo_code_to_invoice')
+        try:
+            params = {'promo_code': promo_code}
+            return await self._request('post', _path_add_promo_code_to_invoice(invoice_id), params)
+        finally:
+            _reset(token)
+
+    async def remove_promo_code_from_invoice(self, invoice_id: int) -> Any:
+        """Remove promo code from an upcoming invoice
+
+        Args:
+            invoice_id: Pass in a known invoice ID or use get_invoices()
+                to get a collection of them from a single customer.
+        Returns:
+            Success or Fail
+        """
+
+        token = _set('remove_promo_code_from_invoice')
+        try:
+            params = None
+            return await self._request('post', _path_remove_promo_code_from_invoice(invoice_id), params)
+        finally:
+            _reset(token)
+
+    async def update_invoice_card(self, invoice_id: int, card_id: int) -> Any:
+        """Change the card associated with a given invoice
+
+        Args:
+            invoice_id: Pass in a known invoice ID or use get_invoices()
+                to get a collection of them from a single customer.
+            card_id: Pass in a known card ID to set active card.
+        Returns:
+            Success or Fail
+        """
+
+        token = _set('update_invoice_card')
+        try:
+            params = {'card_id': card_id}
+            return await self._request('post', _path_update_invoice_card(invoice_id), params)
+        finally:
+            _reset(token)
+
+    async def update_invoice_items(self, invoice_id: int, line_items: dict) -> Any:
+        """Change the number of line items in a give invoice
+
+        Args:
+            invoice_id: Pass in a known invoice ID or use get_invoices()
+                to get a collection of them from a single customer.
+            line_items: Pass in a dictionary of item ids and the updated quantity
+                example:{'1111': 4, '1112', 5}
+        Returns:
+            Success or Fail, and number of items changed
+        """
+
+        token = _set('update_invoice_items')
+        try:
+            params = line_items
+            return await self._request('post', _path_update_invoice_items(invoice_id), params)
+        finally:
+            _reset(token)
+
+    async def create_invoice(self, data: dict, idempotency_key: str = None) -> Any:
+        """Create a new invoice
+
+        Args:
+            data: a dictionary describing the invoice and the items
+            See api.paywhirl.com documentation for details
+            idempotency_key: a unique string identifying this invoice.
+                Defaults to a random key, see subscribe_customer().
+        Returns:
+            Success or Fail and invoice_id
+        """
+
+        token = _set('create_invoice')
+        try:
+            params = data
+            return await self._idempotent_post('/invoices', params, idempotency_key)
+        finally:
+            _reset(token)
+
+    async def delete_invoice(self, invoice_id: int) -> Any:
+        """Delete an existing invoice by its ID number.
+
+        Args:
+            invoice_id: this can be found via the get_invoices() method.
+
+        Returns:
+            A dictionary with {'status: 'success' or 'fail'}
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('delete_invoice')
+        try:
+            params = {'id': invoice_id}
+            return await self._request('post', '/delete/invoice', params)
+        finally:
+            _reset(token)
+
+    async def get_gateways(self) -> Any:
+        """Returns a list of your payment gateways.
+
+        Returns:
+            A dictionary or list of dictionaries containing gateway
+            data, or an error message indicating what went wrong.
+        """
+
+        token = _set('get_gateways')
+        try:
+            params = None
+            return await self._request('get', '/gateways', params)
+        finally:
+            _reset(token)
+
+    async def get_gateway(self, gateway_id: int) -> Any:
+        """Get a gateway specified by its ID number.
+
+        Args:
+            gateway_id: this can be found using get_gateways().
+
+        Returns:
+            A dictionary or list of dictionaries containing gateway
+            data, or an error message indicating what went wrong.
+        """
+
+        token = _set('get_gateway')
+        try:
+            params = None
+            return await self._request('get', _path_get_gateway(gateway_id), params)
+        finally:
+            _reset(token)
+
+    async def create_charge(self, data: dict, idempotency_key: str = None) -> Any:
+        """Attempt to a customer and return an invoice.
+
+        Args:
+            dict:
+                See docs linked in the header for param options.
+            idempotency_key: a unique string identifying this charge.
+                Defaults to a random key, see subscribe_customer().
+
+        Returns:
+            A dictionary containing an invoice, or an error message
+            indicating what went wrong.
+        """
+
+        token = _set('create_charge')
+        try:
+            params = data
+            return await self._idempotent_post('/create/charge', params, idempotency_key)
+        finally:
+            _reset(token)
+
+    async def get_charge(self, charge_id: int) -> Any:
+        """Get a single charge using the charge ID.
+
+        Args:
+            charge_id: these can be found in each invoice.
+
+        Returns:
+            A dictionary containing charge information, or an error
+            message indicating what went wrong.
+        """
+
+        token = _set('get_charge')
+        try:
+            params = None
+            return await self._request('get', _path_get_charge(charge_id), params)
+        finally:
+            _reset(token)
+
+    async def refund_charge(self, charge_id: int, data: dict) -> Any:
+        """Refund a charge by its ID.
+
+        Args:
+            charge_id: ID of the charge
+            data: dict with refund_amount and mark_only params.
+            See API docs for more info
+
+        Returns:
+            A dictionary containing charge information, or an error
+            message indicating what went wrong.
+        """
+
+        token = _set('refund_charge')
+        try:
+            params = data
+            return await self._request('post', _path_refund_charge(charge_id), params)
+        finally:
+            _reset(token)
+
+    async def get_cards(self, customer_id: int) -> Any:
+        """Get a list of cards associated with a customer.
+
+        Args:
+            customer_id: these can be obtained via get_customers()
+
+        Returns:
+            A list of dicts containing card information, or an error
+            message indicating what went wrong.
+        """
+
+        token = _set('get_cards')
+        try:
+            params = None
+            return await self._request('get', _path_get_cards(customer_id), params)
+        finally:
+            _reset(token)
+
+    async def get_card(self, card_id: int) -> Any:
+        """Get a single card by ID.
+
+        Args:
+            customer_id: these can be via get_customers()
+
+        Returns:
+            A list of dicts containing card information, or an error
+            message indicating what went wrong.
+        """
+
+        token = _set('get_card')
+        try:
+            params = None
+            return await self._request('get', _path_get_card(card_id), params)
+        finally:
+            _reset(token)
+
+    async def create_card(self, data: dict) -> Any:
+        """Create a payment method and add it to an existing customer.
+
+        Args:
+            data: See docs linked in the header for param options.
+
+        Returns:
+            A dict containing card information, or an error
+            message indicating what went wrong.
+        """
+
+        token = _set('create_card')
+        try:
+            params = data
+            return await self._request('post', '/create/card', params)
+        finally:
+            _reset(token)
+
+    async def delete_card(self, card_id: int) -> Any:
+        """Delete an existing card by its ID number.
+
+        Args:
+            card_id: this can be found via the get_cards() method.
+
+        Returns:
+            A dictionary with {'status: 'success' or 'fail'}
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('delete_card')
+        try:
+            params = {'id': card_id}
+            return await self._request('post', '/delete/card', params)
+        finally:
+            _reset(token)
+
+    async def get_promos(self) -> Any:
+        """Return a list of all promos on file.
+        """
+
+        token = _set('get_promos')
+        try:
+            params = None
+            return await self._request('get', '/promo', params)
+        finally:
+            _reset(token)
+
+    async def get_promo(self, promo_id: int) -> Any:
+        """Get a single promo by ID.
+
+        Args:
+            promo_id: these can be obtained via get_customers()
+
+        Returns:
+            A dict containing promo information, or an error
+            message indicating what went wrong.
+        """
+
+        token = _set('get_promo')
+        try:
+            params = None
+            return await self._request('get', _path_get_promo(promo_id), params)
+        finally:
+            _reset(token)
+
+    async def create_promo(self, data: dict) -> Any:
+        """Create a promo code to use with subscriptions.
+
+        Args:
+            data: See docs linked in the header for param options.
+
+        Returns:
+            A dict containing promo information, or an error
+            message indicating what went wrong.
+        """
+
+        token = _set('create_promo')
+        try:
+            params = data
+            return await self._request('post', '/create/promo', params)
+        finally:
+            _reset(token)
+
+    async def delete_promo(self, promo_id: int) -> Any:
+        """Delete an existing promo by its ID number.
+
+        Args:
+            promo_id: this can be found via the get_promos() method.
+
+        Returns:
+            A dictionary with {'status: 'success' or 'fail'}
+            or an error message indicating what went wrong.
+        """
+
+        token = _set('delete_promo')
+        try:
+            params = {'id': promo_id}
+            return await self._request('post', '/delete/promo', params)
+        finally:
+            _reset(token)
+
+    async def get_email_template(self, template_id: int) -> Any:
+        """Get the data for an email template when given an ID number.
+
+        Args:
+            template_id: Pass in a known template ID.
+            You can find these on the paywhirl app template page.
+
+        Returns:
+            A dictionary containing information about the selected
+            template, or an error message indicating what went wrong.
+        """
+
+        token = _set('get_email_template')
+        try:
+            params = None
+            return await self._request('get', _path_get_email_template(template_id), params)
+        finally:
+            _reset(token)
+
+    async def send_email(self, data: dict) -> Any:
+        """Send a system generated email based on one of your pre-
+           defined templates on your paywhirl account page
+
+        Args:
+          see api.paywhirl.com, the list depends on what
+          email templates you have available
+
+        Returns:
+          either a string with "status" => "success" or an error message indicating
+          the need for another parameter
+        """
+
+        token = _set('send_email')
+        try:
+            params = data
+            return await self._request('post', '/send-email', params)
+        finally:
+            _reset(token)
+
+    async def get_account(self) -> Any:
+        """Get a dictionary containing your account information.
+        """
+
+        token = _set('get_account')
+        try:
+            params = None
+            return await self._request('get', '/account', params)
+        finally:
+            _reset(token)
+
+    async def get_stats(self) -> Any:
+        """Get invoice and revenue statistics about your account.
+        """
+
+        token = _set('get_stats')
+        try:
+            params = None
+            return await self._request('get', '/stats', params)
+        finally:
+            _reset(token)
+
+    async def get_shipping_rules(self) -> Any:
+        """Get a list of shipping rules in dict format.
+        """
+
+        token = _set('get_shipping_rules')
+        try:
+            params = None
+            return await self._request('get', '/shipping/', params)
+        finally:
+            _reset(token)
+
+    async def get_shipping_rule(self, shipping_rule_id: int) -> Any:
+        """Get the data for a shipping rule when given an ID number.
+
+        Args:
+            shipping_rule_id: Pass in a known template ID.
+            You can find these using the get_shipping_rules() method.
+
+        Returns:
+            A dictionary containing information about the selected
+            rule, or an error message indicating what went wrong.
+        """
+
+        token = _set('get_shipping_rule')
+        try:
+            params = None
+            return await self._request('get', _path_get_shipping_rule(shipping_rule_id), params)
+        finally:
+            _reset(token)
+
+    async def get_tax_rules(self) -> Any:
+        """Get a list of all tax rules created by your account.
+        """
+
+        token = _set('get_tax_rules')
+        try:
+            params = None
+            return await self._request('get', '/tax', params)
+        finally:
+            _reset(token)
+
+    async def get_tax_rule(self, rule_id: int) -> Any:
+        """Get the data for a tax rule when given an ID number.
+
+        Args:
+            rule_id: Pass in a known tax rule ID.
+            You can find these using the get_tax_rules() method.
+
+        Returns:
+            A dictionary containing information about the selected
+            rule, or an error message indicating what went wrong.
+        """
+
+        token = _set('get_tax_rule')
+        try:
+            params = None
+            return await self._request('get', _path_get_tax_rule(rule_id), params)
+        finally:
+            _reset(token)
+
+    async def get_multi_auth_token(self, data: dict) -> Any:
+        """Get a MultiAuth token to use to automatically
+                login a customer to a widget.
+
+        Args:
+            data: See docs linked in the header for param options.
+
+        Returns:
+            A dict containing a multiauth token, or an error
+            message indicating what went wrong.
+        """
+
+        token = _set('get_multi_auth_token')
+        try:
+            params = data
+            return await self._request('post', '/multiauth', params)
+        finally:
+            _reset(token)
@@ -0,0 +1,1044 @@
+"""Endpoint registry
+=================
+
+Every API endpoint is declared once in ENDPOINTS: its method name, HTTP
+verb, path template, arguments, cache group, idempotency class and model.
+The endpoint methods of PayWhirl and AsyncPayWhirl are generated from
+these declarations (see paywhirl.methods; regenerate them with
+python -m paywhirl.methods after a change), and so are the route tables
+used by caching (CACHE_GROUPS, RECORD_GROUPS, WRITES, INVALIDATED_BY)
+and typed models (ROUTE_MODELS). Adding an endpoint means adding an entry here:
+
+```
+Endpoint(
+    'get_coupon', 'get', '/coupon/{coupon_id}', (Param('coupon_id', int),),
+    cache_group='promos',
+    doc=\"\"\"Get a single coupon by ID.\"\"\"),
+```
+
+Arguments named in the path template are formatted into the path.
+A BODY argument is sent as the whole query string (GET) or JSON body;
+other arguments become one key of it each. Optional arguments defaulting
+to None are left out when not given.
+"""
+
+import re
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple, Type
+
+from .models import Address, Card, Customer, Invoice, Model, Plan, Subscription
+
+# argument kinds
+FIELD = 'field'
+BODY = 'body'
+PATH = 'path'
+
+# idempotency classes
+SAFE = 'safe'        # reads, any attempt can be repeated
+KEYED = 'keyed'      # sends an Idempotency-Key, so retries are recognised
+UNSAFE = 'unsafe'    # repeating it may apply it twice
+
+
+class _Required:
+    """The default of a Param without one."""
+
+    def __repr__(self) -> str:
+        return 'REQUIRED'
+
+
+REQUIRED = _Required()
+
+_FIELD_NAME = re.compile(r'\{(\w+)\}')
+
+
+class Param(NamedTuple):
+    """One argument of an endpoint method.
+
+    Attributes:
+        name: the argument name.
+        type: its type annotation.
+        default: its default value, REQUIRED for none.
+        key: the key it is sent as, defaults to name. Only for FIELDs.
+        kind: FIELD or BODY. Arguments named in the path template are
+            PATH arguments whatever their kind.
+        convert: applied to the value before it is sent.
+    """
+
+    name: str
+    type: Any = Any
+    default: Any = REQUIRED
+    key: Optional[str] = None
+    kind: str = FIELD
+    convert: Optional[Callable[[Any], Any]] = None
+
+
+class Endpoint: # pylint: disable=too-many-instance-attributes,too-few-public-methods
+    """The declaration of one endpoint method.
+
+    Attributes:
+        name: the client method name, e.g. 'get_customer'
+        verb: the lower case HTTP method.
+        path: the path template, e.g. '/customer/{customer_id}'
+        route: the path with every field replaced by '{id}', as
+            returned by paywhirl.cache.route()
+        format_path: builds the path from the PATH arguments, in order.
+        params: the arguments of the method.
+        cache_group: the ResponseCache group of a cacheable GET.
+        record_group: the ResponseCache group of a GET returning a
+            single record that mutating calls write through to the
+            cache. Unlike cache_group, its responses are not cached.
+        writes: the name of the GET endpoint of the record a mutating
+            call returns, which is then written through to the cache.
+        invalidates: the cache groups a mutating call makes stale.
+        idempotency: SAFE, KEYED or UNSAFE. KEYED methods take an
+            idempotency_key argument and always send a key.
+        model: the paywhirl.models class of the returned records.
+        stream: the method returns a generator parsing a list response
+            as it arrives instead of the decoded response.
+        doc: the method docstring.
+    """
+
+    __slots__ = ('name', 'verb', 'path', 'route', 'format_path', 'params', 'cache_group',
+                 'record_group', 'writes', 'invalidates', 'idempotency', 'model', 'stream',
+                 'doc')
+
+    def __init__( # pylint: disable=too-many-arguments
+            self,
+            name: str,
+            verb: str,
+            path: str,
+            params: Tuple[Param, ...] = (),
+            cache_group: str = None,
+            record_group: str = None,
+            writes: str = None,
+            invalidates: Tuple[str, ...] = (),
+            idempotency: str = None,
+            model: Type[Model] = None,
+            stream: bool = False,
+            doc: str = '') -> None:
+        fields = _FIELD_NAME.findall(path)
+        names = [param.name for param in params]
+        if any(field not in names for field in fields):
+            raise ValueError(str.format('{0}: {1} has a field without an argument', name, path))
+        params = tuple(param._replace(kind=PATH) if param.name in fields else param
+                       for param in params)
+        kinds = set(param.kind for param in params)
+        if BODY in kinds and FIELD in kinds:
+            raise ValueError(str.format('{0}: BODY can not be combined with FIELDs', name))
+        if idempotency is None:
+            idempotency = SAFE if verb == 'get' else UNSAFE
+        if idempotency == KEYED and verb != 'post':
+            raise ValueError(str.format('{0}: only POST endpoints can be KEYED', name))
+
+        self.name = name
+        self.verb = verb
+        self.path = path
+        self.route = _FIELD_NAME.sub('{id}', path)
+        # precompiled: building a path costs one str.format call
+        self.format_path = _FIELD_NAME.sub(
+            lambda match: '{' + str(fields.index(match.group(1))) + '}', path).format
+        self.params = params
+        self.cache_group = cache_group
+        self.record_group = record_group
+        self.writes = writes
+        self.invalidates = invalidates
+        self.idempotency = idempotency
+        self.model = model
+        self.stream = stream
+        self.doc = doc
+
+    def __repr__(self) -> str:
+        return str.format('<Endpoint {0} {1} {2}>', self.name, self.verb.upper(), self.path)
+
+
+def _flag(value: Any) -> str:
+    return '1' if value else ''
+
+
+DATA = Param('data', dict, kind=BODY)
+OPTIONAL_DATA = Param('data', dict, None, kind=BODY)
+ALL_INVOICES = Param('all_invoices', bool, False, key='all', convert=_flag)
+
+_ENDPOINTS = (
+    # customers
+    Endpoint(
+        'get_customers', 'get', '/customers', (DATA,), model=Customer,
+        doc="""Get a list of customers associated with your account.
+
+        Args:
+            data:
+                {
+                    'limit': (int),
+                    'order_key': (str),
+                    'order_direction': (str),
+                    'before_id': (int),
+                    'after_id': (int),
+                    'keyword': (str)
+                }
+
+                'limit' defaults to 100. 'order_key' defaults to 'id'.
+                'order_direction' options are 'asc' and 'desc'
+                for ascend and descend, respectively.
+                'before_id' returns all customers less than the
+                specified id, and 'after_id' returns
+                all customers greater than the specified id.
+                'keyword' will filter the results by the chosen string.
+
+        Returns:
+            A list of customer dicts filtered by your arguments,
+            or an error message indicating what went wrong.
+        """),
+    Endpoint(
+        'stream_customers', 'get', '/customers', (OPTIONAL_DATA,), model=Customer, stream=True,
+        doc="""Like get_customers(), but parse the response as it arrives.
+
+        Meant for very large pages: customers are yielded as soon as
+        they are received, and only one at a time is held in memory.
+        The request is made when iteration starts.
+
+        Args:
+            data: the same filters accepted by get_customers()
+
+        Returns:
+            A generator yielding one customer dict at a time. It raises
+            ValueError if the response is not a list.
+        """),
+    Endpoint(
+        'get_customer', 'get', '/customer/{customer_id}', (Param('customer_id', int),),
+        record_group='customers', model=Customer,
+        doc="""Get a single customer.
+
+        Args:
+            customer_id: the id number obtained from paywhirl's servers.
+                (use the get_customers() method to find your IDs)
+
+        Returns:
+            A dictionary with complete customer data
+            or an error message indicating what went wrong.
+        """),
+    Endpoint(
+        'get_addresses', 'get', '/customer/addresses/{customer_id}', (Param('customer_id', int),),
+        model=Address,
+        doc="""Get all addresses associated with a single customer
+
+        Args:
+            customer_id: the id number obtained from paywhirl's servers.
+                (use the get_customers() method to find your IDs)
+
+        Returns:
+            A dictionary with a list of addresses associated with the
+            customer
+            or an error message indicating what went wrong.
+        """),
+    Endpoint(
+        'get_address', 'get', '/customer/address/{address_id}', (Param('address_id', int),),
+        record_group='addresses', model=Address,
+        doc="""Get all addresses associated with a single customer
+
+        Args:
+            address_id: the id number obtained from paywhirl's servers.
+                (use the get_addresses() method to find your IDs)
+
+        Returns:
+            An address associated with the given id
+            or an error message indicating what went wrong.
+        """),
+    Endpoint(
+        'create_address', 'post', '/customer/address', (DATA,),
+        invalidates=('customers', 'addresses'),
+        doc="""Create a new address for a customer
+
+        Args:
+            data:
+                {
+                    'customer_id': (int),
+                    'first_name': (str),
+                    'last_name': (str),
+                    'address': (str),
+                    'city': (str),
+                    'state': (str),
+                    'zip': (str),
+                    'country': (str),
+                    'phone': (str),
+                }
+
+        Returns:
+            The new address or an error message
+        """),
+    Endpoint(
+        'update_address', 'patch', '/customer/address/{address_id}',
+        (Param('address_id', int), DATA), writes='get_address', invalidates=('customers',),
+        doc="""Update existing address of a customer
+
+        Args:
+            address_id: id of the address to update
+            data:
+                {
+                    'first_name': (str),
+                    'last_name': (str),
+                    'address': (str),
+                    'city': (str),
+                    'state': (str),
+                    'zip': (str),
+                    'country': (str),
+                    'phone': (str),
+                }
+
+        Returns:
+            The updated address or an error message
+        """),
+    Endpoint(
+        'delete_address', 'delete', '/customer/address/{address_id}', (Param('address_id', int),),
+        invalidates=('customers', 'addresses'),
+        doc="""Delete address of a customer
+
+        Args:
+            address_id: id of the address to delete
+
+        Returns:
+            Dictionary with status 'success' or 'failure'.
+        """),
+    Endpoint(
+        'get_profile', 'get', '/customer/profile/{customer_id}', (Param('customer_id', int),),
+        doc="""Get a full profile for a given customer. This includes
+            the customer, the addresses, and the answers to profile
+            questions.
+
+        Args:
+            customer_id: the id number obtained from paywhirl's servers.
+                (use the get_addresses() method to find your IDs)
+
+        Returns:
+            A dictionary associated with the given id that includes
+            customer, addresses, and profile answers
+            or an error message indicating what went wrong.
+        """),
+    Endpoint(
+        'auth_customer', 'post', '/auth/customer', (Param('email', str), Param('password', str)),
+        doc="""Authenticate a customer with supplied data.
+
+        Args:
+            email: customer's email address
+            password: plain-text or bcrypt hashed password
+
+        Returns:
+            Dictionary with status 'success' or 'failure'.
+        """),
+    Endpoint(
+        'create_customer', 'post', '/create/customer', (DATA,),
+        doc="""Create a new customer with supplied data.
+
+        Args:
+            data:
+                {
+                    'first_name': (str),
+                    'last_name': (str),
+                    'email': (str),
+                    'password': (str),
+                    'currency': (str)
+                }
+
+            Only the required key: value pairs are listed above,
+            more information about additional options can be found
+            on the docs site located in the header of this file.
+
+        Returns:
+            A response containing either the created customer dictionary
+            or an error message indicating what went wrong.
+        """),
+    Endpoint(
+        'update_customer', 'post', '/update/customer', (DATA,), writes='get_customer',
+        invalidates=('addresses',),
+        doc="""Update an existing customer (selected by id) with new info.
+
+        Args:
+            data:
+                {
+                    'id': (int),
+                    ...
+                }
+
+            Any element existing in a current customer object should
+            be a viable key-value pair to pass in for modification.
+
+        Returns:
+            A dict containing either the updated customer
+            or an error message indicating what went wrong.
+        """),
+    Endpoint(
+        'delete_customer', 'post', '/delete/customer',
+        (Param('customer_id', int, key='id'), Param('forget', int, None)),
+        invalidates=('customers', 'addresses', 'subscriptions', 'invoices'),
+        doc="""Delete an existing customer by its ID.
+
+        Args:
+            customer_id: this can be found via the get_customers() method.
+            forget: send 1 to make this customer data obfuscated besides soft-deleted.
+
+        Returns:
+            A dictionary with {'status: 'success' or 'fail'}
+            or an error message indicating what went wrong.
+        """),
+
+    # profile questions
+    Endpoint(
+        'get_questions', 'get', '/questions', (Param('return_list_size', int, 100, key='limit'),),
+        cache_group='questions',
+        doc="""Retrieve a list of all questions associated with your
+           account.
+
+        Args:
+            return_list_size: on a successful query, this will
+                specify the number of elements in the returned list.
+                Default value is 100.
+
+        Returns:
+            A list containing answer dicts,
+            or an error message indicating what went wrong.
+        """),
+    Endpoint(
+        'update_answer', 'post', '/update/answer', (DATA,),
+        doc="""Update an existing answer with new info.
+
+        Args:
+            data:
+                {
+                    'customer_id': (int),
+                    'question_name': (str),
+                    'answer': (str),
+                    'address_id': (int)
+                }
+
+        Returns:
+            A dict containing either the updated answer,
+            a list of answers,
+            or an error message indicating what went wrong.
+        """),
+    Endpoint(
+        'get_answers', 'get', '/answers', (Param('customer_id', int),),
+        doc="""Get a list of answers associated with a customer.
+
+        Args:
+            customer_id: the 'id' value from a customer dict.
+                you can find this via the get_customers() method.
+
+        Returns:
+            A list containing answer dictionaries,
+            or an error message indicating what went wrong.
+        """),
+
+    # plans
+    Endpoint(
+        'get_plans', 'get', '/plans', (DATA,), cache_group='plans', model=Plan,
+        doc="""Get a list of plans associated with your account.
+
+        Args:
+            data:
+            {
+                'limit': (int),
+                'order_key': (str),
+                'order_direction': (str),
+                'before_id': (int),
+                'after_id': (int)
+            }
+
+            'limit' defaults to 100. 'order_key' defaults to 'id'.
+            'order_direction' can be 'asc' or 'desc'. Defaults to
+            descending. 'before_id' and 'after_id' will return plans
+            with 'id's less than or greater than the selected 'id'
+            number, respectively.
+
+        Returns:
+            A list containing plan dictionaries,
+            or an error message indicating what went wrong.
+        """),
+    Endpoint(
+        'get_plan', 'get', '/plan/{plan_id}', (Param('plan_id', int),), cache_group='plans',
+        model=Plan,
+        doc="""Get a single plan using the plan's ID
+
+        Args:
+            plan_id: the id number obtained from paywhirl's servers.
+                (use the get_plans() method to find your IDs)
+        Returns:
+            A dictionary with data for a given plan
+            or an error message indicating what went wrong.
+        """),
+    Endpoint(
+        'create_plan', 'post', '/create/plan', (DATA,), invalidates=('plans',),
+        doc="""Create a plan to set rules for how a customer will be billed.
+
+        Args:
+            data: A dictionary containing plan rules.
+            See the docs linked in the header for more info.
+
+        Returns:
+            A dictionary containing the created plan
+            or an error message indicating what went wrong.
+        """),
+    Endpoint(
+        'update_plan', 'post', '/update/plan', (DATA,), invalidates=('plans',),
+        doc="""Update an existing plan selected by a plan's 'id' member.
+
+        Args:
+            data: A dictionary containing plan rules. the 'id' field
+                is required.
+            See the docs linked in the header for more info.
+
+        Returns:
+            A dictionary containing the updated plan
+            or an error message indicating what went wrong.
+        """),
+
+    # subscriptions
+    Endpoint(
+        'get_subscriptions', 'get', '/subscriptions/{customer_id}',
+        (Param('customer_id', int), Param('status', str, 'active')), model=Subscription,
+        doc="""Retrieve a list of all subscriptions for a given customer.
+
+        Args:
+            customer_id: This can be found using the get_customers()
+                method.
+            status: Any of 'active', 'all' or 'canceled'
+
+        Returns:
+            A list containing plan dictionaries
+            or an error message indicating what went wrong.
+        """),
+    Endpoint(
+        'get_subscription', 'get', '/subscription/{subscription_id}',
+        (Param('subscription_id', int),),
+        record_group='subscriptions', model=Subscription,
+        doc="""Retrieve a single subscription by passing in an ID.
+
+        Args:
+            subscription_id: These can be found by using the
+                get_subscriptions() method.
+
+        Returns:
+            A single dict containing subscription information
+            or an error message indicating what went wrong.
+        """),
+    Endpoint(
+        'subscribe_customer', 'post', '/subscribe/customer', (DATA,), idempotency=KEYED,
+        invalidates=('customers', 'subscriptions', 'invoices'),
+        doc="""Subscribe a customer to a given plan.
+
+        Args:
+            data:
+                {
+                    'customer_id': (int),
+                    'plan_id': (int),
+                    'quantity': (int),
+                    'promo_id': (int),
+                    'trial_end': (int)
+                }
+            customer_id: The existing customer. (These can be found
+                with the get_customers() method).
+
+            plan_id: The plan to subscribe to. (These can be found
+                with the get_plans() method).
+
+            trial_end(optional): A UNIX timestamp indicating when a
+                trial period should end. The docs linked in the header
+                have extra information on how to generate these.
+                Defaults to no trial.
+
+            promo_id(optional): An existing promo code ID number.
+                (These can be found with the get_promos() method).
+
+            quantity(optional): Number of subscriptions to subscribe to.
+                This defaults to 1.
+
+            idempotency_key(optional): A unique string identifying this
+                subscription, e.g. derived from your own order id.
+                Defaults to a random key, which still makes the call
+                safe to retry but can not be recognised when re-run.
+
+        Returns:
+            A dictionary containing information about the subscription
+            or an error message indicating what went wrong.
+        """),
+    Endpoint(
+        'update_subscription', 'post', '/update/subscription',
+        (Param('subscription_id', int), Param('plan_id', int), Param('quantity', int, None),
+         Param('address_id', int, None), Param('installments_left', int, None),
+         Param('trial_end', int, None), Param('card_id', int, None)),
+        writes='get_subscription', invalidates=('invoices',),
+        doc="""Change a customer's subscription to a different plan.
+
+        Args:
+            subscription_id: The current subscription id.
+            plan_id: The new plan for the subscription.
+
+        Returns:
+            A dictionary containing information about the subscription
+            or an error message indicating what went wrong.
+        """),
+    Endpoint(
+        'unsubscribe_customer', 'post', '/unsubscribe/customer', (Param('subscription_id', int),),
+        invalidates=('subscriptions', 'invoices'),
+        doc="""Cancel a customer's existing subscription.
+
+        Args:
+            subscription_id: You can find these by using the
+                get_subscriptions() method for a given customer.
+
+        Returns:
+            A dictionary with {'status: 'success' or 'fail'}
+            or an error message indicating what went wrong.
+        """),
+    Endpoint(
+        'get_subscribers', 'get', '/subscribers', (DATA,), model=Subscription,
+        doc="""Get a list of all active subscribers.
+
+        Args:
+            data:
+            {
+                'limit': (int),
+                'order': (str),
+                'keyword': (str),
+                'starting_after': (int),
+                'starting_before': (int)
+            }
+
+            'limit' defaults to 20.
+            'order' can be 'asc', 'desc', or 'rand'.
+            'starting_after' will return subscribers with
+            subscription IDs greater than 'starting_after'.
+            'starting_before' will return subscribers with
+            subscription IDs greater than 'starting_before'.
+            'keyword' will filter the results by that word.
+
+        Returns:
+            A list containing subscriber dictionaries,
+            or an error message indicating what went wrong.
+        """),
+    Endpoint(
+        'stream_subscribers', 'get', '/subscribers', (OPTIONAL_DATA,), model=Subscription,
+        stream=True,
+        doc="""Like get_subscribers(), but parse the response as it arrives.
+
+        See stream_customers().
+
+        Args:
+            data: the same filters accepted by get_subscribers()
+
+        Returns:
+            A generator yielding one subscriber dict at a time.
+        """),
+
+    # invoices
+    Endpoint(
+        'get_invoice', 'get', '/invoice/{invoice_id}', (Param('invoice_id', int),),
+        record_group='invoices', model=Invoice,
+        doc="""Get the data for a single invoice when given an ID number.
+
+        Args:
+            invoice_id: Pass in a known invoice ID or use get_invoices()
+                to get a collection of them from a single customer.
+
+        Returns:
+            A dictionary containing information about the selected
+            invoice, or an error message indicating what went wrong.
+        """),
+    Endpoint(
+        'update_invoice_next_payment_attempt', 'post', '/invoices/{invoice_id}/next-payment-date',
+        (Param('invoice_id', int),
+         Param('next_payment_attempt_timestamp', int, key='next_payment_attempt'),
+         Param('to_all', int, 0, key='all')),
+        invalidates=('invoices',),
+        doc="""Process an upcoming invoice by invoice id
+
+        Args:
+            invoice_id: Pass in a known invoice ID or use get_invoices()
+                to get a collection of them from a single customer.
+            next_payment_attempt_timestamp: UNIX timestamp of the scheduled date of processing. Must be in the future.
+            See api.paywhirl.com documentation for details
+        Returns:
+            Success or Fail
+        """),
+    Endpoint(
+        'get_invoices', 'get', '/invoices/{customer_id}',
+        (Param('customer_id', int), ALL_INVOICES),
+        model=Invoice,
+        doc="""Get a list of upcoming invoices for a specified customer.
+
+        Args:
+            customer_id: These can be found using the get_customers()
+                method.
+
+        Returns:
+            A dictionary or list of dictionaries containing invoice
+            data, or an error message indicating what went wrong.
+        """),
+    Endpoint(
+        'stream_invoices', 'get', '/invoices/{customer_id}',
+        (Param('customer_id', int), ALL_INVOICES),
+        model=Invoice, stream=True,
+        doc="""Like get_invoices(), but parse the response as it arrives.
+
+        See stream_customers().
+
+        Args:
+            customer_id: These can be found using the get_customers()
+                method.
+
+        Returns:
+            A generator yielding one invoice dict at a time.
+        """),
+    Endpoint(
+        'process_invoice', 'post', '/invoice/{invoice_id}/process',
+        (Param('invoice_id', int), DATA),
+        idempotency=KEYED, invalidates=('invoices', 'subscriptions'),
+        doc="""Process an upcoming invoice by invoice id
+
+        Args:
+            invoice_id: Pass in a known invoice ID or use get_invoices()
+                to get a collection of them from a single customer.
+            data: a dictionary with additional processing params
+            See api.paywhirl.com documentation for details
+            idempotency_key: a unique string identifying this attempt.
+                Defaults to a random key, see subscribe_customer().
+        Returns:
+            Success or Fail
+        """),
+    Endpoint(
+        'mark_invoice_as_paid', 'post', '/invoice/{invoice_id}/mark-as-paid',
+        (Param('invoice_id', int),), invalidates=('invoices', 'subscriptions'),
+        doc="""Mark an upcoming invoice as paid by invoice id
+
+        Args:
+            invoice_id: Pass in a known invoice ID or use get_invoices()
+                to get a collection of them from a single customer.
+        Returns:
+            Success or Fail
+        """),
+    Endpoint(
+        'add_promo_code_to_invoice', 'post', '/invoice/{invoice_id}/add-promo',
+        (Param('invoice_id', int), Param('promo_code', str)), invalidates=('invoices',),
+        doc="""Add a promo code to an upcoming invoice
+
+        Args:
+            invoice_id: Pass in a known invoice ID or use get_invoices()
+                to get a collection of them from a single customer.
+            promo_code: The promo code to apply.
+        Returns:
+            Success or Fail
+        """),
+    Endpoint(
+        'remove_promo_code_from_invoice', 'post', '/invoice/{invoice_id}/remove-promo',
+        (Param('invoice_id', int),), invalidates=('invoices',),
+        doc="""Remove promo code from an upcoming invoice
+
+        Args:
+            invoice_id: Pass in a known invoice ID or use get_invoices()
+                to get a collection of them from a single customer.
+        Returns:
+            Success or Fail
+        """),
+    Endpoint(
+        'update_invoice_card', 'post', '/invoice/{invoice_id}/card',
+        (Param('invoice_id', int), Param('card_id', int)), writes='get_invoice',
+        doc="""Change the card associated with a given invoice
+
+        Args:
+            invoice_id: Pass in a known invoice ID or use get_invoices()
+                to get a collection of them from a single customer.
+            card_id: Pass in a known card ID to set active card.
+        Returns:
+            Success or Fail
+        """),
+    Endpoint(
+        'update_invoice_items', 'post', '/invoice/{invoice_id}/items',
+        (Param('invoice_id', int), Param('line_items', dict, kind=BODY)),
+        invalidates=('invoices',),
+        doc="""Change the number of line items in a give invoice
+
+        Args:
+            invoice_id: Pass in a known invoice ID or use get_invoices()
+                to get a collection of them from a single customer.
+            line_items: Pass in a dictionary of item ids and the updated quantity
+                example:{'1111': 4, '1112', 5}
+        Returns:
+            Success or Fail, and number of items changed
+        """),
+    Endpoint(
+        'create_invoice', 'post', '/invoices', (DATA,), idempotency=KEYED,
+        invalidates=('invoices',),
+        doc="""Create a new invoice
+
+        Args:
+            data: a dictionary describing the invoice and the items
+            See api.paywhirl.com documentation for details
+            idempotency_key: a unique string identifying this invoice.
+                Defaults to a random key, see subscribe_customer().
+        Returns:
+            Success or Fail and invoice_id
+        """),
+    Endpoint(
+        'delete_invoice', 'post', '/delete/invoice', (Param('invoice_id', int, key='id'),),
+        invalidates=('invoices',),
+        doc="""Delete an existing invoice by its ID number.
+
+        Args:
+            invoice_id: this can be found via the get_invoices() method.
+
+        Returns:
+            A dictionary with {'status: 'success' or 'fail'}
+            or an error message indicating what went wrong.
+        """),
+
+    # gateways and charges
+    Endpoint(
+        'get_gateways', 'get', '/gateways', cache_group='gateways',
+        doc="""Returns a list of your payment gateways.
+
+        Returns:
+            A dictionary or list of dictionaries containing gateway
+            data, or an error message indicating what went wrong.
+        """),
+    Endpoint(
+        'get_gateway', 'get', '/gateway/{gateway_id}', (Param('gateway_id', int),),
+        cache_group='gateways',
+        doc="""Get a gateway specified by its ID number.
+
+        Args:
+            gateway_id: this can be found using get_gateways().
+
+        Returns:
+            A dictionary or list of dictionaries containing gateway
+            data, or an error message indicating what went wrong.
+        """),
+    Endpoint(
+        'create_charge', 'post', '/create/charge', (DATA,), idempotency=KEYED,
+        doc="""Attempt to a customer and return an invoice.
+
+        Args:
+            dict:
+                See docs linked in the header for param options.
+            idempotency_key: a unique string identifying this charge.
+                Defaults to a random key, see subscribe_customer().
+
+        Returns:
+            A dictionary containing an invoice, or an error message
+            indicating what went wrong.
+        """),
+    Endpoint(
+        'get_charge', 'get', '/charge/{charge_id}', (Param('charge_id', int),),
+        doc="""Get a single charge using the charge ID.
+
+        Args:
+            charge_id: these can be found in each invoice.
+
+        Returns:
+            A dictionary containing charge information, or an error
+            message indicating what went wrong.
+        """),
+    Endpoint(
+        'refund_charge', 'post', '/refund/charge/{charge_id}', (Param('charge_id', int), DATA),
+        invalidates=('invoices',),
+        doc="""Refund a charge by its ID.
+
+        Args:
+            charge_id: ID of the charge
+            data: dict with refund_amount and mark_only params.
+            See API docs for more info
+
+        Returns:
+            A dictionary containing charge information, or an error
+            message indicating what went wrong.
+        """),
+
+    # cards
+    Endpoint(
+        'get_cards', 'get', '/cards/{customer_id}', (Param('customer_id', int),), model=Card,
+        doc="""Get a list of cards associated with a customer.
+
+        Args:
+            customer_id: these can be obtained via get_customers()
+
+        Returns:
+            A list of dicts containing card information, or an error
+            message indicating what went wrong.
+        """),
+    Endpoint(
+        'get_card', 'get', '/card/{card_id}', (Param('card_id', int),), model=Card,
+        doc="""Get a single card by ID.
+
+        Args:
+            customer_id: these can be via get_customers()
+
+        Returns:
+            A list of dicts containing card information, or an error
+            message indicating what went wrong.
+        """),
+    Endpoint(
+        'create_card', 'post', '/create/card', (DATA,),
+        invalidates=('customers', 'subscriptions', 'invoices'),
+        doc="""Create a payment method and add it to an existing customer.
+
+        Args:
+            data: See docs linked in the header for param options.
+
+        Returns:
+            A dict containing card information, or an error
+            message indicating what went wrong.
+        """),
+    Endpoint(
+        'delete_card', 'post', '/delete/card', (Param('card_id', int, key='id'),),
+        invalidates=('customers', 'subscriptions', 'invoices'),
+        doc="""Delete an existing card by its ID number.
+
+        Args:
+            card_id: this can be found via the get_cards() method.
+
+        Returns:
+            A dictionary with {'status: 'success' or 'fail'}
+            or an error message indicating what went wrong.
+        """),
+
+    # promos
+    Endpoint(
+        'get_promos', 'get', '/promo', cache_group='promos',
+        doc="""Return a list of all promos on file."""),
+    Endpoint(
+        'get_promo', 'get', '/promo/{promo_id}', (Param('promo_id', int),), cache_group='promos',
+        doc="""Get a single promo by ID.
+
+        Args:
+            promo_id: these can be obtained via get_customers()
+
+        Returns:
+            A dict containing promo information, or an error
+            message indicating what went wrong.
+        """),
+    Endpoint(
+        'create_promo', 'post', '/create/promo', (DATA,), invalidates=('promos',),
+        doc="""Create a promo code to use with subscriptions.
+
+        Args:
+            data: See docs linked in the header for param options.
+
+        Returns:
+            A dict containing promo information, or an error
+            message indicating what went wrong.
+        """),
+    Endpoint(
+        'delete_promo', 'post', '/delete/promo', (Param('promo_id', int, key='id'),),
+        invalidates=('promos',),
+        doc="""Delete an existing promo by its ID number.
+
+        Args:
+            promo_id: this can be found via the get_promos() method.
+
+        Returns:
+            A dictionary with {'status: 'success' or 'fail'}
+            or an error message indicating what went wrong.
+        """),
+
+    # emails
+    Endpoint(
+        'get_email_template', 'get', '/email/{template_id}', (Param('template_id', int),),
+        doc="""Get the data for an email template when given an ID number.
+
+        Args:
+            template_id: Pass in a known template ID.
+            You can find these on the paywhirl app template page.
+
+        Returns:
+            A dictionary containing information about the selected
+            template, or an error message indicating what went wrong.
+        """),
+    Endpoint(
+        'send_email', 'post', '/send-email', (DATA,),
+        doc="""Send a system generated email based on one of your pre-
+           defined templates on your paywhirl account page
+
+        Args:
+          see api.paywhirl.com, the list depends on what
+          email templates you have available
+
+        Returns:
+          either a string with "status" => "success" or an error message indicating
+          the need for another parameter
+        """),
+
+    # account
+    Endpoint(
+        'get_account', 'get', '/account', cache_group='account',
+        doc="""Get a dictionary containing your account information."""),
+    Endpoint(
+        'get_stats', 'get', '/stats',
+        doc="""Get invoice and revenue statistics about your account."""),
+    Endpoint(
+        'get_shipping_rules', 'get', '/shipping/', cache_group='shipping_rules',
+        doc="""Get a list of shipping rules in dict format."""),
+    Endpoint(
+        'get_shipping_rule', 'get', '/shipping/{shipping_rule_id}',
+        (Param('shipping_rule_id', int),),
+        cache_group='shipping_rules',
+        doc="""Get the data for a shipping rule when given an ID number.
+
+        Args:
+            shipping_rule_id: Pass in a known template ID.
+            You can find these using the get_shipping_rules() method.
+
+        Returns:
+            A dictionary containing information about the selected
+            rule, or an error message indicating what went wrong.
+        """),
+    Endpoint(
+        'get_tax_rules', 'get', '/tax', cache_group='tax_rules',
+        doc="""Get a list of all tax rules created by your account."""),
+    Endpoint(
+        'get_tax_rule', 'get', '/tax/{rule_id}', (Param('rule_id', int),), cache_group='tax_rules',
+        doc="""Get the data for a tax rule when given an ID number.
+
+        Args:
+            rule_id: Pass in a known tax rule ID.
+            You can find these using the get_tax_rules() method.
+
+        Returns:
+            A dictionary containing information about the selected
+            rule, or an error message indicating what went wrong.
+        """),
+    Endpoint(
+        'get_multi_auth_token', 'post', '/multiauth', (DATA,),
+        doc="""Get a MultiAuth token to use to automatically
+                login a customer to a widget.
+
+        Args:
+            data: See docs linked in the header for param options.
+
+        Returns:
+            A dict containing a multiauth token, or an error
+            message indicating what went wrong.
+        """),
+)
+
+# method name -> declaration, in declaration order
+ENDPOINTS = dict((entry.name, entry) for entry in _ENDPOINTS)  # type: Dict[str, Endpoint]
+
+# route template -> cache group, for the GET endpoints that may be cached
+CACHE_GROUPS = dict((entry.route, entry.cache_group) for entry in _ENDPOINTS
+                    if entry.cache_group is not None)  # type: Dict[str, str]
+
+# route template of a GET endpoint -> group of the records written through
+# to the cache by mutating calls
+RECORD_GROUPS = dict((entry.route, entry.record_group) for entry in _ENDPOINTS
+                     if entry.record_group is not None)  # type: Dict[str, str]
+
+# (verb, route template) of a mutating call -> GET endpoint of the record
+# it returns; keyed by verb too, as update_address() and delete_address()
+# share a route
+WRITES = dict(((entry.verb, entry.route), ENDPOINTS[entry.writes]) for entry in _ENDPOINTS
+              if entry.writes is not None)  # type: Dict[Tuple[str, str], Endpoint]
+
+# (verb, route template) of a mutating call -> cache groups it makes
+# stale; keyed by verb too, like WRITES
+INVALIDATED_BY = dict(((entry.verb, entry.route), entry.invalidates) for entry in _ENDPOINTS
+                      if entry.invalidates)  # type: Dict[Tuple[str, str], Tuple[str, ...]]
+
+# route template of a GET endpoint -> model of the records it returns
+ROUTE_MODELS = dict((entry.route, entry.model) for entry in _ENDPOINTS
+                    if entry.model is not None)  # type: Dict[str, Type[Model]]
@@ -0,0 +1,336 @@
+"""Bulk export
+===========
+
+Exporter writes a full snapshot of an account's plans, customers,
+subscriptions and invoices to JSONL, CSV or Parquet files:
+
+```
+exporter = Exporter(pw, 'snapshots/2024-01-31', fmt='csv', max_workers=16)
+print(exporter.run())
+```
+
+Every resource is written as numbered part files, e.g. customers-00003.csv.
+Plans and customers are read page by page in ascending id order. Each
+part holds chunk_size customers, together with a matching subscriptions
+and invoices part whose records are fetched per customer, max_workers
+calls at a time.
+
+Parts are written under a temporary name and renamed once complete, and
+after each one a checkpoint.json file records the last exported id. Run
+the same export again after an interruption and it resumes from there.
+
+CSV and Parquet files have one column per field of the matching
+paywhirl.models class, plus an 'extra' column holding any other fields
+as JSON. Nested values are JSON encoded too. Parquet columns are all
+strings, since the API is not consistent about quoting numbers. Parquet
+output needs the optional pyarrow dependency
+(pip install paywhirl[parquet]).
+"""
+
+import csv
+import itertools
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .codec import JSONCodec, get_codec
+from .models import Customer, Invoice, Model, Plan, Subscription
+
+RESOURCES = ('plans', 'customers', 'subscriptions', 'invoices')
+
+MODELS = {
+    'plans': Plan,
+    'customers': Customer,
+    'subscriptions': Subscription,
+    'invoices': Invoice,
+}
+
+CHECKPOINT = 'checkpoint.json'
+
+
+def _as_dict(record: Any) -> dict:
+    return record.to_dict() if isinstance(record, Model) else record
+
+
+def _rows(records: List[Any], fields: Tuple[str, ...]) -> Iterator[List[Any]]:
+    """Flatten records into lists of field values plus an 'extra' value."""
+
+    known = frozenset(fields)
+    for record in records:
+        record = _as_dict(record)
+        row = []
+        for name in fields:
+            value = record.get(name)
+            if isinstance(value, (dict, list)):
+                value = json.dumps(value)
+            row.append(value)
+        extra = {key: value for key, value in record.items() if key not in known}
+        row.append(json.dumps(extra) if extra else None)
+        yield row
+
+
+def write_jsonl(path: str, records: List[Any], fields: Tuple[str, ...],
+                codec: JSONCodec) -> None:
+    """Write records as one JSON object per line."""
+
+    # pylint: disable=unused-argument
+    with open(path, 'wb') as out:
+        for record in records:
+            out.write(codec.dumps(_as_dict(record)))
+            out.write(b'\n')
+
+
+def write_csv(path: str, records: List[Any], fields: Tuple[str, ...],
+              codec: JSONCodec) -> None:
+    """Write records as CSV with a header row."""
+
+    # pylint: disable=unused-argument
+    with open(path, 'w', newline='', encoding='utf-8') as out:
+        writer = csv.writer(out)
+        writer.writerow(fields + ('extra',))
+        for row in _rows(records, fields):
+            writer.writerow(['' if value is None else value for value in row])
+
+
+def write_parquet(path: str, records: List[Any], fields: Tuple[str, ...],
+                  codec: JSONCodec) -> None:
+    """Write records as a Parquet file of string columns."""
+
+    # pylint: disable=unused-argument
+    import pyarrow # pylint: disable=import-outside-toplevel,import-error
+    import pyarrow.parquet # pylint: disable=import-outside-toplevel,import-error
+
+    names = fields + ('extra',)
+    columns = [[] for _ in names]  # type: List[List[Optional[str]]]
+    for row in _rows(records, fields):
+        for column, value in zip(columns, row):
+            column.append(None if value is None else str(value))
+    table = pyarrow.table({name: pyarrow.array(column, pyarrow.string())
+                           for name, column in zip(names, columns)})
+    pyarrow.parquet.write_table(table, path)
+
+
+WRITERS = {
+    'jsonl': write_jsonl,
+    'csv': write_csv,
+    'parquet': write_parquet,
+}  # type: Dict[str, Callable[[str, List[Any], Tuple[str, ...], JSONCodec], None]]
+
+
+class ResourceReport:
+    """What an export wrote for one resource.
+
+    Attributes:
+        records: the number of records written.
+        parts: the number of part files written.
+        bytes: the total size of those files.
+        seconds: the time spent fetching and writing them.
+    """
+
+    records: int
+    parts: int
+    bytes: int
+    seconds: float
+
+    def __init__(self) -> None:
+        self.records = 0
+        self.parts = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    @property
+    def rate(self) -> float:
+        """Records written per second."""
+
+        return self.records / self.seconds if self.seconds else 0.0
+
+
+class ExportReport:
+    """Throughput of one Exporter.run().
+
+    Attributes:
+        resources: a ResourceReport per exported resource name.
+        elapsed: the wall clock duration of the run, in seconds.
+    """
+
+    resources: Dict[str, ResourceReport]
+    elapsed: float
+
+    def __init__(self, resources: Iterable[str]) -> None:
+        self.resources = {name: ResourceReport() for name in resources}
+        self.elapsed = 0.0
+
+    @property
+    def records(self) -> int:
+        """The number of records written for all resources."""
+
+        return sum(report.records for report in self.resources.values())
+
+    def __str__(self) -> str:
+        lines = []
+        for name, report in self.resources.items():
+            lines.append(str.format(
+                '{0}: {1} records in {2} parts, {3:.1f} MB, {4:.0f} records/s',
+                name, report.records, report.parts, report.bytes / 1e6, report.rate))
+        lines.append(str.format('total: {0} records in {1:.1f}s, {2:.0f} records/s',
+                                self.records, self.elapsed,
+                                self.records / self.elapsed if self.elapsed else 0.0))
+        return '\n'.join(lines)
+
+
+class Exporter:
+    """Resumable snapshot of an account into part files."""
+
+    def __init__( # pylint: disable=too-many-arguments
+            self,
+            client: Any,
+            directory: str,
+            fmt: str = 'jsonl',
+            resources: Iterable[str] = RESOURCES,
+            chunk_size: int = 1000,
+            max_workers: int = 8,
+            json_codec: Union[str, JSONCodec] = None) -> None:
+        """Prepare an export.
+
+        Args:
+            client: the PayWhirl client to read from. Give it a
+                pool_maxsize of at least max_workers.
+            directory: where part files and the checkpoint are
+                written; created if missing.
+            fmt: 'jsonl', 'csv' or 'parquet'.
+            resources: the resources to export, a subset of RESOURCES.
+                Subscriptions and invoices are fetched per customer.
+            chunk_size: the number of plans or customers per part.
+            max_workers: the number of per-customer calls made at once.
+            json_codec: the JSON backend used for JSONL output.
+        """
+
+        if fmt not in WRITERS:
+            raise ValueError(str.format('unknown export format {0!r}', fmt))
+        if fmt == 'parquet':
+            try:
+                import pyarrow.parquet # pylint: disable=import-outside-toplevel,import-error,unused-import
+            except ImportError:
+                raise ImportError(
+                    'Parquet export requires pyarrow: pip install paywhirl[parquet]') from None
+        resources = tuple(resources)
+        for name in resources:
+            if name not in RESOURCES:
+                raise ValueError(str.format('unknown export resource {0!r}', name))
+
+        self._client = client
+        self._directory = directory
+        self._fmt = fmt
+        self._resources = resources
+        self._chunk_size = chunk_size
+        self._max_workers = max_workers
+        self._codec = get_codec(json_codec)
+        self._write = WRITERS[fmt]
+        self._checkpoint = {}  # type: Dict[str, Any]
+        self._report = ExportReport(resources)
+
+    def run(self) -> ExportReport:
+        """Export everything not exported yet.
+
+        Returns:
+            The ExportReport of this run; resumed runs only count what
+            they wrote themselves.
+
+        Raises:
+            ValueError: the directory holds a checkpoint of an export
+                with a different format or resources.
+            Any error raised by the client. Progress up to the last
+                complete part is kept.
+        """
+
+        started = time.perf_counter()
+        os.makedirs(self._directory, exist_ok=True)
+        self._load_checkpoint()
+        try:
+            if 'plans' in self._resources:
+                self._export('plans', ('plans',), self._client.iter_plans)
+            per_customer = tuple(name for name in self._resources if name != 'plans')
+            if per_customer:
+                self._export('customers', per_customer, self._client.iter_customers)
+        finally:
+            self._report.elapsed = time.perf_counter() - started
+        return self._report
+
+    def _export(self, cursor: str, names: Tuple[str, ...],
+                iterate: Callable[..., Iterator[Any]]) -> None:
+        state = self._checkpoint['cursors'].setdefault(
+            cursor, {'last_id': None, 'part': 0, 'done': False})
+        if state['done']:
+            return
+
+        data = {'after_id': state['last_id']} if state['last_id'] is not None else None
+        records = iterate(data, page_size=min(self._chunk_size, 100), prefetch=True)
+        while True:
+            fetch_started = time.perf_counter()
+            chunk = list(itertools.islice(records, self._chunk_size))
+            elapsed = time.perf_counter() - fetch_started
+            if not chunk:
+                break
+            if cursor in names:
+                self._write_part(cursor, state['part'], chunk, elapsed)
+            if cursor == 'customers':
+                ids = [customer['id'] for customer in chunk]
+                if 'subscriptions' in names:
+                    self._fan_out('subscriptions', state['part'], ids,
+                                  'get_subscriptions', status='all')
+                if 'invoices' in names:
+                    self._fan_out('invoices', state['part'], ids,
+                                  'get_invoices', all_invoices=True)
+            state['last_id'] = chunk[-1]['id']
+            state['part'] += 1
+            self._save_checkpoint()
+
+        state['done'] = True
+        self._save_checkpoint()
+
+    def _fan_out(self, name: str, part: int, ids: List[Any], method: str,
+                 **kwargs: Any) -> None:
+        started = time.perf_counter()
+        records = []  # type: List[Any]
+        for result in self._client.map(method, ids, self._max_workers, **kwargs):
+            value = result.get()
+            if isinstance(value, list):
+                records.extend(value)
+            elif value:
+                records.append(value)
+        self._write_part(name, part, records, time.perf_counter() - started)
+
+    def _write_part(self, name: str, part: int, records: List[Any],
+                    fetch_time: float) -> None:
+        started = time.perf_counter()
+        path = os.path.join(self._directory,
+                            str.format('{0}-{1:05d}.{2}', name, part, self._fmt))
+        self._write(path + '.tmp', records, MODELS[name].field_names, self._codec)
+        os.replace(path + '.tmp', path)
+
+        report = self._report.resources[name]
+        report.records += len(records)
+        report.parts += 1
+        report.bytes += os.path.getsize(path)
+        report.seconds += fetch_time + time.perf_counter() - started
+
+    def _load_checkpoint(self) -> None:
+        path = os.path.join(self._directory, CHECKPOINT)
+        checkpoint = {'format': self._fmt, 'resources': list(self._resources),
+                      'cursors': {}}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as stored:
+                saved = json.load(stored)
+            if (saved['format'], saved['resources']) != (self._fmt, list(self._resources)):
+                raise ValueError(str.format(
+                    '{0} belongs to a {1} export of {2}', path,
+                    saved['format'], ', '.join(saved['resources'])))
+            checkpoint = saved
+        self._checkpoint = checkpoint
+
+    def _save_checkpoint(self) -> None:
+        path = os.path.join(self._directory, CHECKPOINT)
+        with open(path + '.tmp', 'w', encoding='utf-8') as out:
+            json.dump(self._checkpoint, out)
+        os.replace(path + '.tmp', path)
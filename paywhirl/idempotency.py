@@ -0,0 +1,177 @@
+"""Idempotency records
+===================
+
+create_charge(), subscribe_customer(), create_invoice() and
+process_invoice() always send an Idempotency-Key header: the key passed
+by the caller, or a random one. It lets the server recognise a repeated
+attempt, so a 'post' RetryPolicy can safely retry these calls.
+paywhirl.bulk.BulkRunner passes the key of each operation, so that
+re-running a batch sends the same keys again.
+
+An IdempotencyStore also remembers the response of every call made with
+a caller supplied key. Calling again with the same key, e.g. when
+re-running a batch after a crash, returns the remembered response
+without sending anything:
+
+```
+backend = SQLiteBackend('/var/lib/paywhirl/idempotency.sqlite')
+pw = PayWhirl(api_key, api_secret, idempotency=IdempotencyStore(backend=backend))
+for order in orders:
+    pw.create_charge(charge_for(order), idempotency_key='order-' + str(order.id))
+```
+
+Records are kept in memory by default. A SQLiteBackend keeps them across
+runs and shares them between processes; do not share it with a
+ResponseCache. Keys are kept apart per client API base and key, like
+cache entries, so clients of different accounts may share a store.
+Concurrent calls with the same key wait for the first one instead of
+sending a duplicate. Reusing a key for a different request
+raises ValueError. Failed calls are not recorded.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Tuple, Union
+
+from .backends import CacheBackend, MemoryBackend
+from .cache import cache_key
+from .codec import JSONCodec, get_codec
+
+GROUP = 'idempotency'
+
+
+def new_key() -> str:
+    """Return a random idempotency key."""
+
+    return os.urandom(16).hex()
+
+
+class IdempotencyStore:
+    """Responses of completed calls, keyed by idempotency key."""
+
+    ttl: float
+    backend: CacheBackend
+    lease_timeout: float
+    poll_interval: float
+
+    def __init__( # pylint: disable=too-many-arguments
+            self,
+            ttl: float = 86400,
+            backend: CacheBackend = None,
+            lease_timeout: float = 60,
+            poll_interval: float = 0.05,
+            json_codec: Union[str, JSONCodec] = None) -> None:
+        """Create a store.
+
+        Args:
+            ttl: seconds a response is remembered for. Defaults to a day.
+            backend: where records are kept. Defaults to a
+                MemoryBackend of 100000 entries.
+            lease_timeout: the longest a call with a given key is
+                waited for by concurrent calls with the same key.
+            poll_interval: how often those calls check whether it
+                completed.
+            json_codec: the JSON backend records are stored with.
+        """
+
+        self.ttl = ttl
+        self.backend = backend if backend is not None else MemoryBackend(maxsize=100000)
+        self.lease_timeout = lease_timeout
+        self.poll_interval = poll_interval
+        self._codec = get_codec(json_codec)
+        self._lock = threading.Lock()
+        self._counters = {'replayed': 0, 'recorded': 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    @staticmethod
+    def _fingerprint(path: str, params: Any) -> str:
+        import hashlib # pylint: disable=import-outside-toplevel
+        return hashlib.sha256(cache_key(path, params).encode('utf-8')).hexdigest()
+
+    def _lookup(self, name: str, key: str, fingerprint: str) -> Tuple[bool, Any]:
+        entry = self.backend.get(name)
+        if entry is None or entry[0] <= time.time():
+            return False, None
+        record = self._codec.loads(entry[1])
+        if record['request'] != fingerprint:
+            raise ValueError(str.format(
+                'idempotency key {0!r} was already used for another request', key))
+        self._count('replayed')
+        return True, record['response']
+
+    def _record(self, name: str, fingerprint: str, response: Any) -> None:
+        data = self._codec.dumps({'request': fingerprint, 'response': response})
+        self.backend.set(name, GROUP, time.time() + self.ttl, data)
+        self._count('recorded')
+
+    def run(self, key: str, path: str, params: Any, send: Callable[[], Any],
+            scope: str = '') -> Any:
+        """Return the recorded response for key, or call send() and record it.
+
+        scope is the paywhirl.cache.client_scope() of the calling client.
+        """
+
+        name = GROUP + ':' + scope + key
+        fingerprint = self._fingerprint(path, params)
+        deadline = time.monotonic() + self.lease_timeout
+        while True:
+            found, response = self._lookup(name, key, fingerprint)
+            if found:
+                return response
+            if self.backend.acquire(name, self.lease_timeout):
+                break
+            if time.monotonic() >= deadline:
+                raise TimeoutError(str.format(
+                    'call with idempotency key {0!r} still in progress', key))
+            time.sleep(self.poll_interval)
+
+        try:
+            # it may have completed while the lease was being acquired
+            found, response = self._lookup(name, key, fingerprint)
+            if found:
+                return response
+            response = send()
+            self._record(name, fingerprint, response)
+            return response
+        finally:
+            self.backend.release(name)
+
+    async def arun(self, key: str, path: str, params: Any,
+                   send: Callable[[], Awaitable[Any]], scope: str = '') -> Any:
+        """Async counterpart of run() for AsyncPayWhirl."""
+
+        import asyncio # pylint: disable=import-outside-toplevel
+
+        name = GROUP + ':' + scope + key
+        fingerprint = self._fingerprint(path, params)
+        deadline = time.monotonic() + self.lease_timeout
+        while True:
+            found, response = self._lookup(name, key, fingerprint)
+            if found:
+                return response
+            if self.backend.acquire(name, self.lease_timeout):
+                break
+            if time.monotonic() >= deadline:
+                raise TimeoutError(str.format(
+                    'call with idempotency key {0!r} still in progress', key))
+            await asyncio.sleep(self.poll_interval)
+
+        try:
+            found, response = self._lookup(name, key, fingerprint)
+            if found:
+                return response
+            response = await send()
+            self._record(name, fingerprint, response)
+            return response
+        finally:
+            self.backend.release(name)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the replayed and recorded counters of this process."""
+
+        with self._lock:
+            return dict(self._counters)
@@ -0,0 +1,212 @@
+"""Generated endpoint methods
+==========================
+
+The methods of PayWhirl and AsyncPayWhirl for each entry of
+paywhirl.endpoints.ENDPOINTS live in paywhirl/endpoint_methods.py, which
+is generated by this module and checked in, so that linters, editors and
+tracebacks see ordinary source. Each method does no more work per call
+than a hand-written one: format the path, build the parameters and call
+the client's request pipeline, with the method name as the
+current_endpoint (see paywhirl.metrics).
+
+For get_invoices(), source() returns:
+
+```
+def get_invoices(self, customer_id: int, all_invoices: bool = False) -> Any:
+    token = _set('get_invoices')
+    try:
+        params = {'all': _convert_get_invoices_all_invoices(all_invoices)}
+        return self._request('get', _path_get_invoices(customer_id), params)
+    finally:
+        _reset(token)
+```
+
+where _path_get_invoices is the endpoint's precompiled '/invoices/{0}'.format.
+On AsyncPayWhirl the same method is a coroutine awaiting _request().
+
+After changing an endpoint, regenerate the module with
+
+    python -m paywhirl.methods
+
+and check that it is up to date with --check.
+"""
+
+import inspect
+import os
+import sys
+from typing import List, Optional
+
+from .endpoints import BODY, ENDPOINTS, FIELD, KEYED, PATH, REQUIRED, Endpoint
+
+PATH_NAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'endpoint_methods.py')
+
+_HEADER = '''\
+# Generated from paywhirl/endpoints.py by paywhirl/methods.py, do not edit.
+# Regenerate with: python -m paywhirl.methods
+"""Endpoint methods of PayWhirl (EndpointMethods) and AsyncPayWhirl
+(AsyncEndpointMethods), see paywhirl.methods."""
+# pylint: disable=line-too-long,too-many-lines,too-many-public-methods
+# pylint: disable=too-many-arguments,no-member
+
+from typing import Any, AsyncIterator, Iterator
+
+from .endpoints import ENDPOINTS
+from .metrics import current_endpoint
+
+_set = current_endpoint.set
+_reset = current_endpoint.reset
+'''
+
+
+def _default(value: object) -> str:
+    if value is not None and not isinstance(value, (bool, int, float, str)):
+        raise ValueError(str.format('default {0!r} can not be generated', value))
+    return repr(value)
+
+
+def _params(entry: Endpoint) -> List[str]:
+    """Return the lines building 'params', the request body or query string."""
+
+    required = []
+    optional = []
+    for param in entry.params:
+        if param.kind == BODY:
+            return ['params = ' + param.name]
+        if param.kind != FIELD:
+            continue
+        key = param.key or param.name
+        value = param.name
+        if param.convert is not None:
+            value = str.format('_convert_{0}_{1}({1})', entry.name, param.name)
+        if param.default is None:
+            optional.append((param.name, key, value))
+        else:
+            required.append(str.format('{0!r}: {1}', key, value))
+
+    if not required and not optional:
+        return ['params = None']
+    lines = ['params = {' + ', '.join(required) + '}']
+    for name, key, value in optional:
+        lines.append(str.format('if {0} is not None:', name))
+        lines.append(str.format('    params[{0!r}] = {1}', key, value))
+    return lines
+
+
+def _signature(entry: Endpoint, asynchronous: bool) -> str:
+    arguments = ['self']
+    for param in entry.params:
+        annotation = getattr(param.type, '__name__', 'Any')
+        if param.default is REQUIRED:
+            arguments.append(str.format('{0}: {1}', param.name, annotation))
+        else:
+            arguments.append(str.format('{0}: {1} = {2}', param.name, annotation,
+                                        _default(param.default)))
+    if entry.idempotency == KEYED:
+        arguments.append('idempotency_key: str = None')
+    if entry.stream:
+        returns = 'AsyncIterator[Any]' if asynchronous else 'Iterator[Any]'
+        return str.format('def {0}({1}) -> {2}:', entry.name, ', '.join(arguments), returns)
+    prefix = 'async def' if asynchronous else 'def'
+    return str.format('{0} {1}({2}) -> Any:', prefix, entry.name, ', '.join(arguments))
+
+
+def source(entry: Endpoint, asynchronous: bool = False, doc: bool = False) -> str:
+    """Return the source of the method generated for an endpoint.
+
+    Args:
+        entry: the endpoint.
+        asynchronous: return the AsyncPayWhirl method.
+        doc: include its docstring.
+    """
+
+    path_args = [param.name for param in entry.params if param.kind == PATH]
+    path = str.format('_path_{0}({1})', entry.name, ', '.join(path_args)) \
+        if path_args else repr(entry.path)
+    body = _params(entry)
+
+    lines = [_signature(entry, asynchronous)]
+    if doc and entry.doc:
+        docstring = inspect.cleandoc(entry.doc).replace('\\', '\\\\')
+        docstring = '\n'.join(('    ' + line).rstrip() for line in docstring.split('\n'))
+        lines.append('    """' + docstring.lstrip() + '\n    """')
+        lines.append('')
+
+    if entry.stream:
+        # the request is only made once the generator is iterated
+        lines.extend('    ' + line for line in body)
+        lines.append(str.format('    return self._stream({0}, params, {1!r})', path, entry.name))
+        return '\n'.join(lines) + '\n'
+
+    if entry.idempotency == KEYED:
+        call = str.format('self._idempotent_post({0}, params, idempotency_key)', path)
+    else:
+        call = str.format('self._request({0!r}, {1}, params)', entry.verb, path)
+    if asynchronous:
+        call = 'await ' + call
+    lines.append(str.format('    token = _set({0!r})', entry.name))
+    lines.append('    try:')
+    lines.extend('        ' + line for line in body)
+    lines.append('        return ' + call)
+    lines.append('    finally:')
+    lines.append('        _reset(token)')
+    return '\n'.join(lines) + '\n'
+
+
+def _constants(entry: Endpoint) -> List[str]:
+    lines = []
+    lookup = str.format('ENDPOINTS[{0!r}]', entry.name)
+    if any(param.kind == PATH for param in entry.params):
+        lines.append(str.format('_path_{0} = {1}.format_path', entry.name, lookup))
+    for index, param in enumerate(entry.params):
+        if param.kind == FIELD and param.convert is not None:
+            lines.append(str.format('_convert_{0}_{1} = {2}.params[{3}].convert',
+                                    entry.name, param.name, lookup, index))
+    return lines
+
+
+def _indent(text: str) -> str:
+    return ''.join('    ' + line if line.strip() else line
+                   for line in text.splitlines(True))
+
+
+def module_source() -> str:
+    """Return the source of paywhirl/endpoint_methods.py."""
+
+    parts = [_HEADER]
+    constants = []  # type: List[str]
+    for entry in ENDPOINTS.values():
+        constants.extend(_constants(entry))
+    parts.append('\n'.join(constants) + '\n')
+
+    for name, asynchronous, doc in (
+            ('EndpointMethods', False, 'The endpoint methods of PayWhirl.'),
+            ('AsyncEndpointMethods', True, 'The endpoint methods of AsyncPayWhirl.')):
+        methods = [_indent(source(entry, asynchronous, doc=True))
+                   for entry in ENDPOINTS.values()]
+        parts.append(str.format('\nclass {0}:\n    """{1}"""\n\n', name, doc)
+                     + '\n'.join(methods))
+    return '\n'.join(parts)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Write paywhirl/endpoint_methods.py, or with --check, compare it."""
+
+    argv = sys.argv[1:] if argv is None else argv
+    generated = module_source()
+    if argv == ['--check']:
+        with open(PATH_NAME, encoding='utf-8') as current:
+            if current.read() == generated:
+                return 0
+        print(PATH_NAME + ' is out of date, run python -m paywhirl.methods',
+              file=sys.stderr)
+        return 1
+    if argv:
+        print('usage: python -m paywhirl.methods [--check]', file=sys.stderr)
+        return 2
+    with open(PATH_NAME, 'w', encoding='utf-8') as out:
+        out.write(generated)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
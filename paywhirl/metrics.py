@@ -0,0 +1,233 @@
+"""Request instrumentation
+=======================
+
+Clients call 'before_request' and 'after_request' hooks around every HTTP
+request they make, passing a RequestEvent describing it. Without hooks no
+event is created, so instrumentation costs nothing when unused.
+
+MetricsCollector is a ready-made 'after_request' hook aggregating latency
+histograms, wait and decode times, payload sizes, status codes and
+retries per endpoint:
+
+```
+metrics = MetricsCollector()
+pw = PayWhirl(api_key, api_secret, metrics=metrics)
+...
+print(metrics.snapshot()['get_customer']['mean_wait_time'])
+print(metrics.to_prometheus())
+```
+
+Endpoints are identified by the name of the client method making the
+request, e.g. 'process_invoice', so that per-record calls are
+aggregated. Requests made without one are identified by HTTP method and
+route template, e.g. 'POST /invoice/{id}/process'.
+
+The wait time of a request covers DNS resolution, connecting, the TLS
+handshake and server processing together: the requests and urllib3
+transports do not report when each of these phases ends.
+"""
+
+import bisect
+import contextvars
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .cache import route
+
+# upper bounds, in seconds, of the latency histogram buckets
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name of the endpoint method currently being called, e.g. 'get_customer',
+# set by the generated endpoint methods (see paywhirl.methods)
+current_endpoint = contextvars.ContextVar('paywhirl_endpoint', default=None)
+
+
+class RequestEvent: # pylint: disable=too-many-instance-attributes,too-few-public-methods
+    """What a client knows about one API request.
+
+    Attributes:
+        method: the lower case HTTP method.
+        endpoint: the name of the client method that made the request,
+            e.g. 'get_customer', None when called directly.
+        path: the requested path, e.g. '/invoice/123/process'
+        route: the path with ids replaced, e.g. '/invoice/{id}/process'
+        started: the wall clock time the request started at.
+        duration: seconds spent in total, including retries and backoff.
+        wait_time: seconds between sending the last attempt and
+            receiving its response headers. It includes DNS
+            resolution, connecting and the TLS handshake when a new
+            connection was opened, as well as server processing.
+        decode_time: seconds spent decoding the JSON response body.
+        attempts: the number of HTTP requests made, 1 unless retried.
+        status: the HTTP status of the last attempt, None if it failed
+            to connect.
+        bytes_sent: the size of the request body.
+        bytes_received: the size of the response body.
+        error: the exception the request raised, if any.
+        context: free for hooks to carry data from before to after.
+    """
+
+    __slots__ = ('method', 'endpoint', 'path', 'route', 'started', 'duration',
+                 'wait_time', 'decode_time', 'attempts', 'status', 'bytes_sent',
+                 'bytes_received', 'error', 'context', '_clock')
+
+    def __init__(self, method: str, path: str) -> None:
+        self.method = method
+        self.endpoint = current_endpoint.get()
+        self.path = path
+        self.route = route(path)
+        self.started = time.time()
+        self.duration = 0.0
+        self.wait_time = 0.0
+        self.decode_time = 0.0
+        self.attempts = 0
+        self.status = None  # type: Optional[int]
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.error = None  # type: Optional[BaseException]
+        self.context = None  # type: Any
+        self._clock = time.perf_counter()
+
+    def finish(self) -> None:
+        """Record the total duration of the request."""
+
+        self.duration = time.perf_counter() - self._clock
+
+
+class _Series: # pylint: disable=too-few-public-methods,too-many-instance-attributes
+    __slots__ = ('method', 'route', 'count', 'errors', 'duration', 'wait', 'decode', 'buckets',
+                 'bytes_sent', 'bytes_received', 'retries', 'statuses')
+
+    def __init__(self, method: str, template: str) -> None:
+        self.method = method
+        self.route = template
+        self.count = 0
+        self.errors = 0
+        self.duration = 0.0
+        self.wait = 0.0
+        self.decode = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.retries = 0
+        self.statuses = {}  # type: Dict[int, int]
+
+
+class MetricsCollector:
+    """Thread-safe per-endpoint request statistics."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._series = {}  # type: Dict[str, _Series]
+
+    def record(self, event: RequestEvent) -> None:
+        """Add a finished request; use as an 'after_request' hook."""
+
+        method = event.method.upper()
+        key = event.endpoint or method + ' ' + event.route
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(method, event.route)
+            series.count += 1
+            series.errors += event.error is not None
+            series.duration += event.duration
+            series.wait += event.wait_time
+            series.decode += event.decode_time
+            series.buckets[bisect.bisect_left(BUCKETS, event.duration)] += 1
+            series.bytes_sent += event.bytes_sent
+            series.bytes_received += event.bytes_received
+            series.retries += max(0, event.attempts - 1)
+            if event.status is not None:
+                series.statuses[event.status] = series.statuses.get(event.status, 0) + 1
+
+    def reset(self) -> None:
+        """Forget everything recorded so far."""
+
+        with self._lock:
+            self._series.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return the statistics keyed by endpoint method name.
+
+        Each value holds the HTTP method and route, count, errors, total
+        and mean duration, total and mean wait_time, decode_time,
+        bytes_sent, bytes_received, retries, a status code count dict
+        and a cumulative latency histogram keyed by bucket upper bound.
+        """
+
+        with self._lock:
+            items = sorted(self._series.items())
+            snapshot = {}
+            for key, series in items:
+                cumulative = 0
+                histogram = {}
+                for bound, count in zip(BUCKETS + (float('inf'),), series.buckets):
+                    cumulative += count
+                    histogram[bound] = cumulative
+                snapshot[key] = {
+                    'method': series.method,
+                    'route': series.route,
+                    'count': series.count,
+                    'errors': series.errors,
+                    'duration': series.duration,
+                    'mean_duration': series.duration / series.count,
+                    'wait_time': series.wait,
+                    'mean_wait_time': series.wait / series.count,
+                    'decode_time': series.decode,
+                    'bytes_sent': series.bytes_sent,
+                    'bytes_received': series.bytes_received,
+                    'retries': series.retries,
+                    'statuses': dict(series.statuses),
+                    'histogram': histogram,
+                }
+            return snapshot
+
+    def to_prometheus(self, prefix: str = 'paywhirl') -> str:
+        """Render the statistics in the Prometheus text exposition format."""
+
+        lines = []  # type: List[str]
+
+        def family(name: str, kind: str, text: str) -> str:
+            name = prefix + '_' + name
+            lines.append(str.format('# HELP {0} {1}', name, text))
+            lines.append(str.format('# TYPE {0} {1}', name, kind))
+            return name
+
+        snapshot = self.snapshot()
+        labels = {}
+        for key, stats in snapshot.items():
+            labels[key] = str.format('endpoint="{0}",method="{1}",route="{2}"',
+                                     key, stats['method'], stats['route'])
+
+        name = family('request_duration_seconds', 'histogram',
+                      'Time spent on PayWhirl API requests.')
+        for key, stats in snapshot.items():
+            for bound, count in stats['histogram'].items():
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(str.format('{0}_bucket{{{1},le="{2}"}} {3}',
+                                        name, labels[key], le, count))
+            lines.append(str.format('{0}_sum{{{1}}} {2!r}', name, labels[key], stats['duration']))
+            lines.append(str.format('{0}_count{{{1}}} {2}', name, labels[key], stats['count']))
+
+        for metric, field, text in (
+                ('request_wait_seconds_total', 'wait_time',
+                 'Time spent waiting for response headers: DNS, connect, TLS and server.'),
+                ('response_decode_seconds_total', 'decode_time',
+                 'Time spent decoding response bodies.'),
+                ('request_bytes_total', 'bytes_sent', 'Request body bytes sent.'),
+                ('response_bytes_total', 'bytes_received', 'Response body bytes received.'),
+                ('retries_total', 'retries', 'Extra attempts made after failures.'),
+                ('errors_total', 'errors', 'Requests that raised an exception.')):
+            name = family(metric, 'counter', text)
+            for key, stats in snapshot.items():
+                lines.append(str.format('{0}{{{1}}} {2}', name, labels[key], stats[field]))
+
+        name = family('responses_total', 'counter', 'Responses by HTTP status code.')
+        for key, stats in snapshot.items():
+            for status, count in sorted(stats['statuses'].items()):
+                lines.append(str.format('{0}{{{1},status="{2}"}} {3}',
+                                        name, labels[key], status, count))
+
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,391 @@
+"""Local mirror
+============
+
+Mirror keeps a sqlite copy of an account's customers, subscriptions and
+invoices, refreshed incrementally, so that lookups are served locally in
+microseconds instead of through the API:
+
+```
+mirror = Mirror(pw, '/var/lib/paywhirl/mirror.sqlite')
+print(mirror.sync())          # run periodically, e.g. from cron
+customer = mirror.get_customer(123)
+```
+
+A regular sync only asks the API for customers and subscribers past the
+highest id already mirrored (the 'after_id' and 'starting_after'
+cursors), then refreshes the invoices of every customer it found. A full
+sync walks everything again to pick up changes to older records and
+deletes the records that are gone; invoices are then refreshed for every
+customer.
+
+Each row stores a fingerprint of the record, so a sync only writes the
+records that are new or changed and leaves identical ones untouched.
+Invoices are fetched max_workers customers at a time, and written about
+page_size at a time, in one transaction per batch of customers.
+
+Subscriptions are read from get_subscribers(), which only lists active
+ones. Like SQLiteBackend, a mirror file can be read by several threads
+and processes while one of them syncs.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from .codec import JSONCodec, get_codec
+from .models import Model
+
+TABLES = ('customers', 'subscriptions', 'invoices')
+
+# bound parameters per statement, below SQLITE_MAX_VARIABLE_NUMBER of
+# every sqlite version
+_MAX_VARIABLES = 500
+
+
+class TableReport: # pylint: disable=too-few-public-methods
+    """What a sync did to one table.
+
+    Attributes:
+        fetched: the number of records received from the API.
+        inserted: the number of new records stored.
+        updated: the number of stored records that had changed.
+        deleted: the number of stored records that no longer exist.
+    """
+
+    fetched: int
+    inserted: int
+    updated: int
+    deleted: int
+
+    def __init__(self) -> None:
+        self.fetched = 0
+        self.inserted = 0
+        self.updated = 0
+        self.deleted = 0
+
+    @property
+    def unchanged(self) -> int:
+        """The number of fetched records that were already up to date."""
+
+        return self.fetched - self.inserted - self.updated
+
+
+class SyncReport: # pylint: disable=too-few-public-methods
+    """The outcome of one Mirror.sync().
+
+    Attributes:
+        tables: a TableReport per table.
+        elapsed: the duration of the sync, in seconds.
+    """
+
+    tables: Dict[str, TableReport]
+    elapsed: float
+
+    def __init__(self) -> None:
+        self.tables = {name: TableReport() for name in TABLES}
+        self.elapsed = 0.0
+
+    def __str__(self) -> str:
+        lines = []
+        for name, report in self.tables.items():
+            lines.append(str.format(
+                '{0}: {1} fetched, {2} new, {3} changed, {4} unchanged, {5} deleted',
+                name, report.fetched, report.inserted, report.updated,
+                report.unchanged, report.deleted))
+        lines.append(str.format('took {0:.1f}s', self.elapsed))
+        return '\n'.join(lines)
+
+
+class Mirror:
+    """A sqlite mirror of customers, subscriptions and invoices."""
+
+    path: str
+
+    _SCHEMA = tuple(
+        statement.format(table) for table in TABLES for statement in (
+            'CREATE TABLE IF NOT EXISTS {0} ('
+            ' id INTEGER PRIMARY KEY, customer_id INTEGER,'
+            ' fingerprint BLOB NOT NULL, data BLOB NOT NULL, synced REAL NOT NULL)',
+            'CREATE INDEX IF NOT EXISTS {0}_customer ON {0} (customer_id)',
+        ))
+
+    def __init__( # pylint: disable=too-many-arguments,too-many-positional-arguments
+            self,
+            client: Any,
+            path: str,
+            page_size: int = 100,
+            max_workers: int = 8,
+            json_codec: Union[str, JSONCodec] = None,
+            busy_timeout: float = 5.0) -> None:
+        """Open (and create if needed) a mirror database.
+
+        Args:
+            client: the PayWhirl client used to sync. Give it a
+                pool_maxsize of at least max_workers.
+            path: the database file.
+            page_size: the number of records requested per page, and
+                written per transaction.
+            max_workers: the number of get_invoices() calls made at once.
+            json_codec: the JSON backend records are stored with.
+            busy_timeout: seconds to wait for another process holding
+                the database lock. Defaults to 5.
+        """
+
+        self.path = path
+        self._client = client
+        self._page_size = page_size
+        self._max_workers = max_workers
+        self._codec = get_codec(json_codec)
+        self._busy_timeout = busy_timeout
+        self._local = threading.local()
+        conn = self._connection()
+        for statement in self._SCHEMA:
+            conn.execute(statement)
+
+    def _connection(self) -> sqlite3.Connection:
+        # one connection per thread and per process, as in SQLiteBackend
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self._busy_timeout,
+                                   isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def sync(self, full: bool = False) -> SyncReport:
+        """Bring the mirror up to date.
+
+        Args:
+            full: walk every record instead of only the new ones, to
+                also pick up changes and deletions. Defaults to False.
+
+        Returns:
+            A SyncReport of what was fetched and written.
+        """
+
+        started = time.perf_counter()
+        report = SyncReport()
+        customers = self._walk('customers', self._client.iter_customers, 'after_id',
+                               full, report)
+        self._walk('subscriptions', self._client.iter_subscribers, 'starting_after',
+                   full, report)
+        if full:
+            customers = self.customer_ids()
+            # invoices of deleted customers
+            report.tables['invoices'].deleted += self._connection().execute(
+                'DELETE FROM invoices WHERE customer_id NOT IN (SELECT id FROM customers)'
+            ).rowcount
+        self.sync_invoices(customers, report)
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    def _walk(self, table: str, iterate: Any, cursor_param: str, full: bool,
+              report: SyncReport) -> List[int]:
+        conn = self._connection()
+        data = None
+        if not full:
+            last_id = conn.execute(str.format('SELECT MAX(id) FROM {0}', table)).fetchone()[0]
+            if last_id is not None:
+                data = {cursor_param: last_id}
+        if full:
+            conn.execute('CREATE TEMP TABLE IF NOT EXISTS seen (id INTEGER PRIMARY KEY)')
+            conn.execute('DELETE FROM seen')
+
+        ids = []  # type: List[int]
+        page = []  # type: List[Any]
+        for record in iterate(data, page_size=self._page_size, prefetch=True):
+            page.append(record)
+            if len(page) == self._page_size:
+                ids.extend(self._store(table, page, report.tables[table], full))
+                page = []
+        ids.extend(self._store(table, page, report.tables[table], full))
+
+        if full:
+            report.tables[table].deleted += conn.execute(str.format(
+                'DELETE FROM {0} WHERE id NOT IN (SELECT id FROM seen)', table)).rowcount
+        return ids
+
+    def sync_invoices(self, customer_ids: Iterable[int],
+                      report: SyncReport = None) -> SyncReport:
+        """Refresh the invoices of some customers.
+
+        Invoices are fetched max_workers customers at a time, and
+        written in one transaction per batch of about page_size
+        invoices. Stored invoices of these customers that the API no
+        longer returns are deleted.
+
+        Args:
+            customer_ids: the customers whose invoices are refreshed.
+            report: a SyncReport to add to, or None for a new one.
+
+        Returns:
+            The SyncReport.
+        """
+
+        report = report or SyncReport()
+        results = self._client.map_as_completed(
+            'get_invoices', customer_ids, self._max_workers, all_invoices=True)
+        batch = {}  # type: Dict[int, Any]
+        fetched = 0
+        for result in results:
+            value = result.get()
+            if isinstance(value, list):
+                invoices = value
+            else:
+                # a single invoice comes back as a bare object
+                invoices = [value] if isinstance(value, dict) and 'id' in value else []
+            batch[result.item] = invoices
+            fetched += len(invoices)
+            if fetched >= self._page_size:
+                self._store_invoices(batch, report.tables['invoices'])
+                batch = {}
+                fetched = 0
+        self._store_invoices(batch, report.tables['invoices'])
+        return report
+
+    def _store_invoices(self, batch: Dict[int, List[Any]], report: TableReport) -> None:
+        """Write the invoices of some customers and delete the ones gone."""
+
+        if not batch:
+            return
+        rows = {}  # type: Dict[int, Tuple[Any, bytes, bytes]]
+        for customer_id, invoices in batch.items():
+            rows.update(self._rows(invoices, customer_id))
+        conn = self._connection()
+        conn.execute('CREATE TEMP TABLE IF NOT EXISTS synced (id INTEGER PRIMARY KEY)')
+        conn.execute('CREATE TEMP TABLE IF NOT EXISTS kept (id INTEGER PRIMARY KEY)')
+        conn.execute('BEGIN')
+        try:
+            self._write(conn, 'invoices', rows, report)
+            conn.execute('DELETE FROM synced')
+            conn.execute('DELETE FROM kept')
+            conn.executemany('INSERT INTO synced VALUES (?)',
+                             [(customer_id,) for customer_id in batch])
+            conn.executemany('INSERT INTO kept VALUES (?)', [(row_id,) for row_id in rows])
+            report.deleted += conn.execute(
+                'DELETE FROM invoices WHERE customer_id IN (SELECT id FROM synced)'
+                ' AND id NOT IN (SELECT id FROM kept)').rowcount
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _rows(self, records: List[Any],
+              customer_id: Optional[int] = None) -> Dict[int, Tuple[Any, bytes, bytes]]:
+        """Return the owner, fingerprint and data of records, by id."""
+
+        rows = {}
+        for record in records:
+            if isinstance(record, Model):
+                record = record.to_dict()
+            data = self._codec.dumps(record)
+            rows[record['id']] = (record.get('customer_id', customer_id),
+                                  hashlib.blake2b(data, digest_size=16).digest(), data)
+        return rows
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection, table: str,
+               rows: Dict[int, Tuple[Any, bytes, bytes]], report: TableReport) -> None:
+        """Write the new and changed rows, inside the caller's transaction."""
+
+        ids = list(rows)
+        report.fetched += len(ids)
+        stored = {}
+        for start in range(0, len(ids), _MAX_VARIABLES):
+            chunk = ids[start:start + _MAX_VARIABLES]
+            stored.update(conn.execute(str.format(
+                'SELECT id, fingerprint FROM {0} WHERE id IN ({1})',
+                table, ','.join('?' * len(chunk))), chunk).fetchall())
+        now = time.time()
+        for record_id, (owner, fingerprint, data) in rows.items():
+            previous = stored.get(record_id)
+            if previous == fingerprint:
+                continue
+            if previous is None:
+                report.inserted += 1
+            else:
+                report.updated += 1
+            conn.execute(str.format('INSERT OR REPLACE INTO {0} VALUES (?, ?, ?, ?, ?)',
+                                    table), (record_id, owner, fingerprint, data, now))
+
+    def _store(self, table: str, records: List[Any], report: TableReport,
+               seen: bool) -> List[int]:
+        """Write the new and changed records; return every record id."""
+
+        if not records:
+            return []
+        rows = self._rows(records)
+        conn = self._connection()
+        conn.execute('BEGIN')
+        try:
+            self._write(conn, table, rows, report)
+            if seen:
+                conn.executemany('INSERT OR IGNORE INTO seen VALUES (?)',
+                                 [(record_id,) for record_id in rows])
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return list(rows)
+
+    def _get(self, table: str, record_id: int) -> Optional[dict]:
+        row = self._connection().execute(
+            str.format('SELECT data FROM {0} WHERE id = ?', table), (record_id,)).fetchone()
+        return None if row is None else self._codec.loads(row[0])
+
+    def _of_customer(self, table: str, customer_id: int) -> List[dict]:
+        rows = self._connection().execute(
+            str.format('SELECT data FROM {0} WHERE customer_id = ? ORDER BY id', table),
+            (customer_id,)).fetchall()
+        return [self._codec.loads(row[0]) for row in rows]
+
+    def get_customer(self, customer_id: int) -> Optional[dict]:
+        """Return a mirrored customer, or None if it is not mirrored."""
+
+        return self._get('customers', customer_id)
+
+    def get_subscription(self, subscription_id: int) -> Optional[dict]:
+        """Return a mirrored subscription, or None if it is not mirrored."""
+
+        return self._get('subscriptions', subscription_id)
+
+    def get_invoice(self, invoice_id: int) -> Optional[dict]:
+        """Return a mirrored invoice, or None if it is not mirrored."""
+
+        return self._get('invoices', invoice_id)
+
+    def get_subscriptions(self, customer_id: int) -> List[dict]:
+        """Return the mirrored subscriptions of a customer."""
+
+        return self._of_customer('subscriptions', customer_id)
+
+    def get_invoices(self, customer_id: int) -> List[dict]:
+        """Return the mirrored invoices of a customer."""
+
+        return self._of_customer('invoices', customer_id)
+
+    def customer_ids(self) -> List[int]:
+        """Return the ids of every mirrored customer."""
+
+        return [row[0] for row in self._connection().execute('SELECT id FROM customers')]
+
+    def count(self, table: str) -> int:
+        """Return the number of records mirrored in one of TABLES."""
+
+        if table not in TABLES:
+            raise ValueError(str.format('unknown mirror table {0!r}', table))
+        return self._connection().execute(
+            str.format('SELECT COUNT(*) FROM {0}', table)).fetchone()[0]
+
+    def close(self) -> None:
+        """Close the connection of the calling thread."""
+
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,226 @@
+"""Typed response models
+=====================
+
+By default every response is returned as plain dicts. Clients created
+with models=True return compact model objects instead, from the endpoints
+declared with a model in paywhirl.endpoints:
+
+```
+pw = PayWhirl(api_key, api_secret, models=True)
+for customer in pw.iter_customers():
+    print(customer.id, customer.email)
+```
+
+Models store their known fields in __slots__, which takes a fraction of
+the memory of a dict per record. Fields the model does not know about are
+kept in an `extra` dict (None when there are none), and attribute access
+falls back to it. Known fields missing from a response read as None.
+Nested records, such as the plan of a subscription, stay raw until first
+accessed. Models also support item access (`customer['email']`,
+`customer.get('email')`), so code written for dicts keeps working.
+
+Models are built from the decoded response, which the response cache,
+conditional requests and coalesced callers share. To never hold a whole
+large list at once, use them with the stream_* methods, which decode and
+convert one record at a time.
+"""
+
+from typing import Any, Dict, FrozenSet, Iterator, Optional, Tuple, Type
+
+_MISSING = object()
+
+
+def _nested(slot: str, model: str) -> property:
+    """A property converting the raw value in slot to model when first read."""
+
+    def getter(self: 'Model') -> Any:
+        value = getattr(self, slot)
+        cls = MODELS[model]
+        if isinstance(value, dict):
+            value = cls.from_dict(value)
+            setattr(self, slot, value)
+        elif isinstance(value, list) and value and isinstance(value[0], dict):
+            value = [cls.from_dict(item) for item in value]
+            setattr(self, slot, value)
+        return value
+
+    return property(getter)
+
+
+class Model:
+    """Base class of the response models."""
+
+    __slots__ = ('extra',)
+
+    _keys = {}  # type: Dict[str, str]
+    _slots = frozenset()  # type: FrozenSet[str]
+
+    # the names of the known fields, in declaration order
+    field_names = ()  # type: Tuple[str, ...]
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        # JSON key -> slot name; nested fields live in '_'-prefixed slots
+        cls._keys = {slot.lstrip('_'): slot for slot in cls.__slots__}
+        cls._slots = frozenset(cls.__slots__)
+        cls.field_names = tuple(cls._keys)
+        MODELS[cls.__name__] = cls
+
+    def __init__(self, **fields: Any) -> None:
+        # slots of fields missing from the response stay unset, which
+        # reads as None but keeps them out of to_dict()
+        self.extra = None  # type: Optional[Dict[str, Any]]
+        self._update(fields)
+
+    def _update(self, data: Dict[str, Any]) -> None:
+        keys = self._keys
+        for key, value in data.items():
+            slot = keys.get(key)
+            if slot is not None:
+                setattr(self, slot, value)
+            else:
+                if self.extra is None:
+                    self.extra = {}
+                self.extra[key] = value
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Model':
+        """Build a model from a decoded JSON object."""
+
+        return cls(**data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the record as a plain dict, with the fields the API sent."""
+
+        data = {}
+        for key, slot in self._keys.items():
+            try:
+                value = object.__getattribute__(self, slot)
+            except AttributeError:
+                continue
+            if isinstance(value, Model):
+                value = value.to_dict()
+            elif isinstance(value, list):
+                value = [item.to_dict() if isinstance(item, Model) else item
+                         for item in value]
+            data[key] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __getattr__(self, name: str) -> Any:
+        # only called for unset slots and names that are neither slots
+        # nor properties
+        if name in self._slots:
+            return None
+        extra = object.__getattribute__(self, 'extra')
+        if extra is not None and name in extra:
+            return extra[name]
+        raise AttributeError(str.format('{0} has no field {1!r}',
+                                        type(self).__name__, name))
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a field like dict.get() would."""
+
+        slot = self._keys.get(key)
+        if slot is None:
+            return self.extra.get(key, default) if self.extra else default
+        try:
+            object.__getattribute__(self, slot)
+        except AttributeError:
+            return default
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.to_dict())
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self): # pylint: disable=unidiomatic-typecheck
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return str.format('<{0} id={1!r}>', type(self).__name__,
+                          getattr(self, 'id', None))
+
+
+MODELS = {}  # type: Dict[str, Type[Model]]
+
+
+class Customer(Model):
+    """A customer, as returned by get_customer() and get_customers()."""
+
+    __slots__ = ('id', 'user_id', 'first_name', 'last_name', 'email', 'phone',
+                 'address', 'city', 'state', 'zip', 'country', 'currency',
+                 'gateway_id', 'gateway_type', 'gateway_reference',
+                 'default_card', 'metadata', 'utm_source', 'utm_medium',
+                 'utm_campaign', 'utm_term', 'utm_content', 'utm_group',
+                 'created_at', 'updated_at', 'deleted_at')
+
+
+class Address(Model):
+    """A customer address, as returned by get_address() and get_addresses()."""
+
+    __slots__ = ('id', 'customer_id', 'first_name', 'last_name', 'address',
+                 'city', 'state', 'zip', 'country', 'phone',
+                 'created_at', 'updated_at')
+
+
+class Plan(Model):
+    """A billing plan, as returned by get_plan() and get_plans()."""
+
+    __slots__ = ('id', 'user_id', 'name', 'sku', 'description', 'active',
+                 'currency', 'setup_fee', 'billing_amount', 'billing_interval',
+                 'billing_frequency', 'billing_cycle_anchor', 'trial_days',
+                 'installments', 'require_shipping', 'tags',
+                 'created_at', 'updated_at')
+
+
+class Card(Model):
+    """A payment card, as returned by get_card() and get_cards()."""
+
+    __slots__ = ('id', 'customer_id', 'brand', 'last4', 'exp_month',
+                 'exp_year', 'gateway_reference', 'created_at', 'updated_at')
+
+
+class Subscription(Model):
+    """A subscription, as returned by get_subscription(s) and get_subscribers()."""
+
+    __slots__ = ('id', 'customer_id', 'plan_id', 'quantity', 'status',
+                 'address_id', 'card_id', 'promo_id', 'current_period_start',
+                 'current_period_end', 'trial_start', 'trial_end',
+                 'installments_left', 'cancel_at_period_end', 'canceled_at',
+                 'created_at', 'updated_at', '_plan', '_customer')
+
+    plan = _nested('_plan', 'Plan')
+    customer = _nested('_customer', 'Customer')
+
+
+class Invoice(Model):
+    """An invoice, as returned by get_invoice() and get_invoices()."""
+
+    __slots__ = ('id', 'customer_id', 'subscription_id', 'status', 'paid',
+                 'currency', 'subtotal', 'tax', 'shipping', 'discount',
+                 'amount_due', 'due_date', 'next_payment_attempt',
+                 'attempt_count', 'promo_id', 'card_id', 'items',
+                 'created_at', 'updated_at', '_customer', '_subscription')
+
+    customer = _nested('_customer', 'Customer')
+    subscription = _nested('_subscription', 'Subscription')
+
+
+def to_models(model: Type[Model], data: Any) -> Any:
+    """Convert a decoded response (an object or a list of them) to models."""
+
+    if isinstance(data, list):
+        return [model.from_dict(item) if isinstance(item, dict) else item
+                for item in data]
+    if isinstance(data, dict):
+        return model.from_dict(data)
+    return data
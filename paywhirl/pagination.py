@@ -0,0 +1,146 @@
+"""Cursor pagination helpers shared by the sync and async clients."""
+
+import contextvars
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+
+def _page_params(data: Optional[dict], cursor_param: str, cursor: Any,
+                 page_size: int) -> dict:
+    params = dict(data or {})
+    params['limit'] = page_size
+    if cursor is not None:
+        params[cursor_param] = cursor
+    return params
+
+
+def _check_page(page: Any) -> Any:
+    # streamed pages are iterators, checked by their parser instead
+    if not isinstance(page, (list, Iterator, AsyncIterator)):
+        raise ValueError(str.format('expected a list page, got {0!r}', page))
+    return page
+
+
+def _next_cursor(cursor: Any, last: Any, cursor_key: str, cursor_param: str) -> Any:
+    after = last[cursor_key]
+    if after == cursor:
+        raise ValueError(str.format('{0} {1!r} did not advance, the API ignored {0}',
+                                    cursor_param, after))
+    return after
+
+
+def paginate(fetch: Callable[[dict], Any],
+             data: Optional[dict],
+             cursor_param: str,
+             cursor_key: str = 'id',
+             page_size: int = 100,
+             prefetch: bool = False) -> Iterator[Any]:
+    """Lazily walk a cursor paginated list endpoint.
+
+    Iteration ends at the first page holding fewer than page_size
+    records, so page_size must not exceed the largest limit the API
+    accepts.
+
+    Args:
+        fetch: a client method taking the request params, such as
+            PayWhirl.get_customers. Without prefetch, it may also
+            return an iterator of records, such as
+            PayWhirl.stream_customers does.
+        data: extra params sent with every page request. The cursor
+            param found here, if any, is used as the starting point.
+        cursor_param: the name of the request param holding the cursor,
+            for example 'after_id' or 'starting_after'
+        cursor_key: the record field the next cursor is read from.
+        page_size: the number of records requested per page.
+        prefetch: fetch the next page on a background thread while the
+            current one is being consumed.
+
+    Yields:
+        One record at a time. Only the current (and, with prefetch,
+        the next) page is ever held in memory.
+
+    Raises:
+        ValueError: a page is not a list, or the last record of a page
+            is the one the page was requested after.
+    """
+
+    cursor = (data or {}).get(cursor_param)
+
+    def fetch_page(after: Any) -> list:
+        return _check_page(fetch(_page_params(data, cursor_param, after, page_size)))
+
+    if not prefetch:
+        while True:
+            count = 0
+            for record in fetch_page(cursor):
+                count += 1
+                yield record
+            if count < page_size:
+                return
+            cursor = _next_cursor(cursor, record, # pylint: disable=undefined-loop-variable
+                                  cursor_key, cursor_param)
+
+    # pylint: disable=import-outside-toplevel
+    from concurrent.futures import ThreadPoolExecutor
+
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending = executor.submit(context.run, fetch_page, cursor)
+        while pending is not None:
+            page = pending.result()
+            pending = None
+            if len(page) >= page_size:
+                cursor = _next_cursor(cursor, page[-1], cursor_key, cursor_param)
+                pending = executor.submit(context.run, fetch_page, cursor)
+            yield from page
+
+
+async def apaginate(fetch: Callable[[dict], Any],
+                    data: Optional[dict],
+                    cursor_param: str,
+                    cursor_key: str = 'id',
+                    page_size: int = 100,
+                    prefetch: bool = False) -> AsyncIterator[Any]:
+    """Async counterpart of paginate() for AsyncPayWhirl.
+
+    With prefetch, the next page request runs as a concurrent task.
+    """
+
+    # pylint: disable=import-outside-toplevel
+    import asyncio
+    import inspect
+
+    cursor = (data or {}).get(cursor_param)
+
+    async def fetch_page(after: Any) -> Any:
+        page = fetch(_page_params(data, cursor_param, after, page_size))
+        if inspect.isawaitable(page):
+            page = await page
+        return _check_page(page)
+
+    pending = asyncio.ensure_future(fetch_page(cursor))
+    try:
+        while pending is not None:
+            page = await pending
+            pending = None
+            if not isinstance(page, list):
+                # a streamed page: the next cursor is known at its end
+                count = 0
+                async for record in page:
+                    count += 1
+                    yield record
+                if count >= page_size:
+                    cursor = _next_cursor(cursor, record, # pylint: disable=undefined-loop-variable
+                                          cursor_key, cursor_param)
+                    pending = fetch_page(cursor)
+                continue
+            if len(page) >= page_size:
+                cursor = _next_cursor(cursor, page[-1], cursor_key, cursor_param)
+                next_page = fetch_page(cursor)
+                pending = asyncio.ensure_future(next_page) if prefetch else next_page
+            for record in page:
+                yield record
+    finally:
+        if isinstance(pending, asyncio.Future):
+            pending.cancel()
+        elif pending is not None:
+            pending.close()
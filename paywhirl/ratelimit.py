@@ -0,0 +1,140 @@
+"""Client side rate limiting
+=========================
+
+A RateLimiter is a thread-safe token bucket. Pass the same instance to
+any number of PayWhirl and AsyncPayWhirl clients to keep their combined
+request rate under the limit:
+
+```
+limiter = RateLimiter(rate=20, burst=40)
+pw = PayWhirl(api_key, api_secret, rate_limiter=limiter)
+apw = AsyncPayWhirl(api_key, api_secret, rate_limiter=limiter)
+```
+
+Every response is fed back to the limiter. A 429 status, a Retry-After
+header or an exhausted X-RateLimit-Remaining header pauses all callers
+until the server is ready again and, when adaptive, lowers the sustained
+rate, which then creeps back up while requests keep succeeding.
+"""
+
+import threading
+import time
+from typing import Any, Mapping, Optional
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Convert a Retry-After header into a number of seconds to wait."""
+
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime # pylint: disable=import-outside-toplevel
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class RateLimiter:
+    """Token bucket shared by every client it is passed to."""
+
+    rate: float
+    max_rate: float
+    min_rate: float
+    burst: float
+    adaptive: bool
+
+    def __init__(self, rate: float, burst: int = None, adaptive: bool = True,
+                 min_rate: float = None) -> None:
+        """Create a limiter.
+
+        Args:
+            rate: the sustained number of requests allowed per second.
+            burst: how many requests may be sent back to back after an
+                idle period. Defaults to rate (one second worth).
+            adaptive: lower the rate when the server answers 429 and
+                raise it back towards rate as requests succeed.
+                Defaults to True.
+            min_rate: the lowest rate adaptation may reach.
+                Defaults to a tenth of rate.
+        """
+
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.rate = float(rate)
+        self.max_rate = float(rate)
+        self.min_rate = float(min_rate or rate / 10.0)
+        self.burst = float(burst or max(1.0, rate))
+        self.adaptive = adaptive
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return how long to wait before using it.
+
+        Never blocks, so it is safe to call from an event loop.
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst,
+                               self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1.0
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._blocked_until - now)
+
+    def acquire(self) -> None:
+        """Block the calling thread until a request may be sent."""
+
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """Wait, without blocking the event loop, until a request may be sent."""
+
+        import asyncio # pylint: disable=import-outside-toplevel
+
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for the given number of seconds."""
+
+        with self._lock:
+            self._blocked_until = max(self._blocked_until,
+                                      time.monotonic() + seconds)
+
+    def observe(self, status: int, headers: Mapping[str, Any]) -> None:
+        """Adjust the limiter from the status and headers of a response.
+
+        Args:
+            status: the HTTP status code of the response.
+            headers: a case-insensitive mapping of response headers.
+        """
+
+        delay = parse_retry_after(headers.get('Retry-After'))
+        if delay is None and headers.get('X-RateLimit-Remaining') == '0':
+            delay = parse_retry_after(headers.get('X-RateLimit-Reset'))
+            if delay is not None and delay > 3600:
+                # an absolute epoch timestamp rather than a delay
+                delay = max(0.0, delay - time.time())
+        if delay is None and status == 429:
+            delay = 1.0 / self.rate
+        if delay:
+            self.pause(delay)
+
+        if not self.adaptive:
+            return
+        with self._lock:
+            if status == 429:
+                self.rate = max(self.min_rate, self.rate / 2.0)
+            elif self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 100.0)
@@ -0,0 +1,138 @@
+"""Retry policies
+==============
+
+PayWhirl retries failed requests according to one RetryPolicy per HTTP
+method. By default only GET requests are retried (since 1.4: earlier
+versions never retried). A mutating request (POST, PATCH, DELETE) is
+retried only when its method has a policy *and* the call carries an
+idempotency key, so that the server can recognise a repeated attempt and
+never applies the operation twice. create_charge(), subscribe_customer(),
+create_invoice() and process_invoice() always send one:
+
+```
+policy = RetryPolicy(max_retries=5)
+pw = PayWhirl(api_key, api_secret,
+              retry_policies={'get': policy, 'post': policy})
+pw.create_charge(data, idempotency_key='order-1234')
+print(policy.stats.snapshot())
+```
+
+Pass retry_policies={} to disable retries entirely.
+"""
+
+import random
+import threading
+from typing import Dict, Optional
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+
+class RetryStats:
+    """Thread-safe counters describing how a RetryPolicy was used.
+
+    Attributes:
+        retries: the number of extra attempts made.
+        recovered: the number of calls that succeeded after retrying.
+        exhausted: the number of calls that failed after using up
+            every retry.
+    """
+
+    retries: int
+    recovered: int
+    exhausted: int
+
+    def __init__(self) -> None:
+        self.retries = 0
+        self.recovered = 0
+        self.exhausted = 0
+        self._lock = threading.Lock()
+
+    def add(self, name: str, count: int = 1) -> None:
+        """Increment one of the counters."""
+
+        with self._lock:
+            setattr(self, name, getattr(self, name) + count)
+
+    def snapshot(self) -> Dict[str, int]:
+        """Return the counters as a dict."""
+
+        with self._lock:
+            return {'retries': self.retries,
+                    'recovered': self.recovered,
+                    'exhausted': self.exhausted}
+
+
+class RetryPolicy:
+    """When and how long to wait before retrying a failed request."""
+
+    max_retries: int
+    backoff_factor: float
+    max_backoff: float
+    jitter: bool
+    retry_statuses: frozenset
+    stats: RetryStats
+
+    def __init__(self, max_retries: int = 3, backoff_factor: float = 0.5,
+                 max_backoff: float = 30.0, jitter: bool = True,
+                 retry_statuses: tuple = (429, 500, 502, 503, 504)) -> None:
+        """Create a retry policy.
+
+        Args:
+            max_retries: the number of extra attempts after the first
+                one fails. Defaults to 3.
+            backoff_factor: the base delay in seconds. Attempt n waits
+                up to backoff_factor * 2 ** n. Defaults to 0.5.
+            max_backoff: the longest delay between two attempts.
+                Defaults to 30 seconds.
+            jitter: pick a random delay between zero and the
+                exponential bound ("full jitter") so that many clients
+                do not retry in lockstep. Defaults to True.
+            retry_statuses: the HTTP status codes worth retrying.
+                Connection errors and timeouts are always retried.
+        """
+
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.stats = RetryStats()
+
+    def retries_status(self, status: int) -> bool:
+        """True when a response with this status should be retried."""
+
+        return status in self.retry_statuses
+
+    def next_delay(self, attempt: int, retry_after: float = None) -> Optional[float]:
+        """Return how long to sleep before retrying, or None to give up.
+
+        Args:
+            attempt: the number of attempts already made, minus one.
+            retry_after: a delay requested by the server. The backoff
+                never waits less than this.
+        """
+
+        if attempt >= self.max_retries:
+            if attempt:
+                self.stats.add('exhausted')
+            return None
+        delay = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_backoff))
+        self.stats.add('retries')
+        return delay
+
+
+def default_policies() -> Dict[str, RetryPolicy]:
+    """The policies used when a client is given no retry_policies."""
+
+    return {'get': RetryPolicy()}
+
+
+def is_idempotent(method: str, headers: Optional[dict]) -> bool:
+    """True when repeating the request can not apply it twice."""
+
+    return method == 'get' or bool(headers and headers.get(IDEMPOTENCY_HEADER))
+
@@ -0,0 +1,101 @@
+"""Request coalescing
+==================
+
+When many threads or tasks ask for the same resource at the same moment,
+a SingleFlight lets the first caller make the request while the others
+wait for it and receive the same result (or exception):
+
+```
+flight = SingleFlight()
+pw = PayWhirl(api_key, api_secret, single_flight=flight)
+# 50 threads calling pw.get_plan(7) at once make a single request
+print(flight.coalesced)
+```
+
+Only GET requests are coalesced, and only between clients of the same
+account and API base, so one SingleFlight can be shared by clients with
+different credentials. Every caller receives the very same response
+object, so treat coalesced responses as read-only.
+"""
+
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call: # pylint: disable=too-few-public-methods
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None  # type: Any
+        self.error = None  # type: BaseException
+
+
+class SingleFlight:
+    """Deduplicate concurrent identical calls, for threads and asyncio."""
+
+    coalesced: int
+
+    def __init__(self) -> None:
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._calls = {}  # type: Dict[Hashable, _Call]
+        self._futures = {}  # type: Dict[Hashable, asyncio.Future]
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """Return func(), sharing one call between concurrent callers of key."""
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def ado(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Async counterpart of do(), for callers on the same event loop."""
+
+        import asyncio # pylint: disable=import-outside-toplevel
+
+        loop = asyncio.get_event_loop()
+        key = (loop, key)
+        future = self._futures.get(key)
+        if future is not None:
+            with self._lock:
+                self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = self._futures[key] = loop.create_future()
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as err:
+            future.set_exception(err)
+            # mark the exception as retrieved in case nobody else waited
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._futures[key]
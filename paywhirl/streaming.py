@@ -0,0 +1,273 @@
+"""Streaming JSON arrays
+=====================
+
+List endpoints can return very large arrays. ArrayParser decodes such a
+body incrementally, chunk by chunk, handing out each element as soon as
+it is complete, so only one record (plus a partial chunk) has to be held
+in memory at a time. A record split across chunks is decoded once, when
+the chunk completing it arrives:
+
+```
+parser = ArrayParser()
+for chunk in chunks:
+    for record in parser.feed(chunk):
+        ...
+parser.close()
+```
+
+Elements are decoded with a JSONCodec (see paywhirl.codec) when one is
+given, and the client stream_* methods, which are built on the parser,
+pass their own. Without one, or with the stdlib codec, the json module
+decodes each element straight out of the buffer.
+"""
+
+import codecs
+import json
+import re
+from typing import Any, AsyncIterator, Iterable, Iterator, List, Optional
+
+from .codec import JSONCodec, StdlibCodec
+
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_NUMBER_TAIL = re.compile(r'[0-9.eE+-]*')
+_STRING_BODY = re.compile(r'[^"\\]*')
+_NOT_STRUCTURAL = re.compile(r'[^"\[\]{}]*')
+_SCALAR = re.compile(r'[^ \t\n\r,\]]*')
+
+# parser states
+_START, _FIRST, _VALUE, _SEPARATOR, _DONE, _OTHER = range(6)
+
+
+class ArrayParser:
+    """Incremental parser of a JSON document holding a single array."""
+
+    def __init__(self, codec: JSONCodec = None) -> None:
+        """Create a parser.
+
+        Args:
+            codec: the JSONCodec decoding the elements. Defaults to the
+                json module.
+        """
+
+        # raw_decode() of the json module finds the end of an element
+        # while decoding it; other codecs are handed each element once
+        # the parser found its end
+        self._codec = None if type(codec) is StdlibCodec else codec # pylint: disable=unidiomatic-typecheck
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._state = _START
+        # the pieces of an incomplete object, array or string, and where
+        # scanning them for its end stopped
+        self._pending = None  # type: Optional[List[str]]
+        self._depth = 0
+        self._in_string = False
+        self._skip = 0
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Add the next chunk of the body.
+
+        Returns:
+            The array elements completed by this chunk, often none.
+
+        Raises:
+            ValueError: the body is not valid JSON.
+        """
+
+        text = self._utf8.decode(chunk)
+        if self._pending is not None:
+            self._pending.append(text)
+            if self._scan(text) is None:
+                return []
+            self._buffer = ''.join(self._pending)
+            self._pending = None
+        else:
+            self._buffer += text
+        return self._parse(False)
+
+    def close(self) -> List[Any]:
+        """Signal the end of the body.
+
+        Returns:
+            The last array elements, if any were still incomplete.
+
+        Raises:
+            ValueError: the body is truncated, not valid JSON, or does
+                not hold an array.
+        """
+
+        self._buffer += self._utf8.decode(b'', final=True)
+        if self._pending is not None:
+            self._buffer = ''.join(self._pending) + self._buffer
+            self._pending = None
+        items = self._parse(True)
+        if self._state == _OTHER:
+            raise ValueError(str.format('expected a list page, got {0!r}',
+                                        self._load(self._buffer)))
+        if self._state != _DONE:
+            raise ValueError('truncated JSON array')
+        return items
+
+    def _parse(self, final: bool) -> List[Any]:
+        # pylint: disable=too-many-branches,too-many-statements
+        buffer = self._buffer
+        state = self._state
+        pos = 0
+        items = []
+        while state != _OTHER:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos == len(buffer):
+                break
+            char = buffer[pos]
+            if state == _START:
+                if char != '[':
+                    # not an array, e.g. an error message; kept whole
+                    # so close() can report it
+                    state = _OTHER
+                    break
+                state = _FIRST
+                pos += 1
+            elif state == _FIRST and char == ']':
+                state = _DONE
+                pos += 1
+            elif state in (_FIRST, _VALUE) and self._codec is not None:
+                end = self._end(buffer, pos, char, final)
+                if end is None:
+                    if self._pending is not None:
+                        pos = len(buffer)
+                    break
+                items.append(self._load(buffer[pos:end]))
+                state = _SEPARATOR
+                pos = end
+            elif state in (_FIRST, _VALUE):
+                try:
+                    item, end = self._decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    if char in '{["':
+                        # decoded again only once its end has arrived
+                        self._depth, self._in_string, self._skip = 0, False, 0
+                        if self._scan(buffer[pos:]) is not None:
+                            raise
+                        self._pending = [buffer[pos:]]
+                        pos = len(buffer)
+                    break
+                if (not final and isinstance(item, (int, float))
+                        and _NUMBER_TAIL.match(buffer, end).end() == len(buffer)):
+                    # the number may continue in the next chunk
+                    break
+                items.append(item)
+                state = _SEPARATOR
+                pos = end
+            elif state == _SEPARATOR:
+                if char == ',':
+                    state = _VALUE
+                elif char == ']':
+                    state = _DONE
+                else:
+                    raise ValueError(str.format(
+                        'expected "," or "]" in JSON array, got {0!r}', char))
+                pos += 1
+            else:
+                raise ValueError('extra data after JSON array')
+
+        self._state = state
+        self._buffer = buffer if state == _OTHER else buffer[pos:]
+        return items
+
+    def _load(self, text: str) -> Any:
+        if self._codec is None:
+            return json.loads(text)
+        return self._codec.loads(text.encode('utf-8'))
+
+    def _end(self, buffer: str, pos: int, char: str, final: bool) -> Optional[int]:
+        """Return the end of the element starting at pos.
+
+        None when it may continue in the next chunk. An incomplete
+        object, array or string is then left pending.
+        """
+
+        if char in '{["':
+            self._depth, self._in_string, self._skip = 0, False, 0
+            end = self._scan(buffer[pos:])
+            if end is not None:
+                return pos + end
+            if final:
+                raise ValueError('truncated JSON array')
+            self._pending = [buffer[pos:]]
+            return None
+        end = _SCALAR.match(buffer, pos).end()
+        if end == len(buffer) and not final:
+            return None
+        return end
+
+    def _scan(self, text: str) -> Optional[int]:
+        """Scan the next piece of the pending value.
+
+        Returns:
+            The offset in text just past the end of the value, or None
+            if it does not end in this piece.
+        """
+
+        depth = self._depth
+        in_string = self._in_string
+        pos = self._skip
+        end = len(text)
+        while pos < end:
+            if in_string:
+                pos = _STRING_BODY.match(text, pos).end()
+                if pos == end:
+                    break
+                if text[pos] == '\\':
+                    # may skip past the end, into the next piece
+                    pos += 2
+                    continue
+                in_string = False
+                pos += 1
+                if not depth:
+                    return pos
+            else:
+                pos = _NOT_STRUCTURAL.match(text, pos).end()
+                if pos == end:
+                    break
+                char = text[pos]
+                pos += 1
+                if char == '"':
+                    in_string = True
+                elif char in '[{':
+                    depth += 1
+                else:
+                    depth -= 1
+                    if not depth:
+                        return pos
+        self._depth = depth
+        self._in_string = in_string
+        self._skip = pos - end
+        return None
+
+
+def iter_array(chunks: Iterable[bytes], codec: JSONCodec = None) -> Iterator[Any]:
+    """Yield the elements of the JSON array whose body arrives as chunks.
+
+    codec decodes the elements, see ArrayParser.
+    """
+
+    parser = ArrayParser(codec)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+async def aiter_array(chunks: AsyncIterator[bytes],
+                      codec: JSONCodec = None) -> AsyncIterator[Any]:
+    """Async counterpart of iter_array()."""
+
+    parser = ArrayParser(codec)
+    async for chunk in chunks:
+        for item in parser.feed(chunk):
+            yield item
+    for item in parser.close():
+        yield item
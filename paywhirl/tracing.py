@@ -0,0 +1,77 @@
+"""Distributed tracing
+===================
+
+A Tracer emits one OpenTelemetry client span per API request made by a
+client, named after the endpoint method that made it:
+
+```
+from paywhirl.tracing import Tracer
+pw = PayWhirl(api_key, api_secret, tracer=Tracer())
+pw.process_invoice(123, {})   # span 'PayWhirl process_invoice'
+```
+
+Spans carry the endpoint method, HTTP method, route template (e.g.
+'/invoice/{id}/process', never the raw id), status code, attempt count
+and duration. They are parented to whatever span is current where the
+endpoint method was called, including from PayWhirl.map() worker threads
+and AsyncPayWhirl tasks. Requests answered from a cache make no span.
+
+opentelemetry-api is optional and only imported when a Tracer is created.
+Without it, the Tracer is disabled and clients skip tracing entirely.
+"""
+
+from typing import Any
+
+from .metrics import RequestEvent
+
+
+class Tracer:
+    """Request hooks emitting OpenTelemetry spans."""
+
+    enabled: bool
+
+    def __init__(self, tracer: Any = None) -> None:
+        """Create a tracer.
+
+        Args:
+            tracer: an opentelemetry.trace.Tracer. Defaults to the one
+                returned by the global tracer provider for 'paywhirl'.
+        """
+
+        try:
+            from opentelemetry import trace # pylint: disable=import-outside-toplevel
+        except ImportError:
+            self.enabled = False
+            return
+        self.enabled = True
+        self._trace = trace
+        self._tracer = tracer or trace.get_tracer('paywhirl')
+
+    def before_request(self, event: RequestEvent) -> None:
+        """Start the span of a request; a 'before_request' hook."""
+
+        name = event.endpoint or event.route
+        event.context = self._tracer.start_span(
+            'PayWhirl ' + name,
+            kind=self._trace.SpanKind.CLIENT,
+            attributes={
+                'paywhirl.method': name,
+                'http.method': event.method.upper(),
+                'http.route': event.route,
+            })
+
+    def after_request(self, event: RequestEvent) -> None:
+        """End the span of a request; an 'after_request' hook."""
+
+        span = event.context
+        if span is None:
+            return
+        if event.status is not None:
+            span.set_attribute('http.status_code', event.status)
+        span.set_attribute('paywhirl.attempts', event.attempts)
+        span.set_attribute('paywhirl.duration_ms', event.duration * 1000.0)
+        if event.error is not None:
+            span.record_exception(event.error)
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR,
+                                               type(event.error).__name__))
+        span.end()
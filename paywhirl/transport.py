@@ -0,0 +1,753 @@
+"""HTTP transports
+===============
+
+PayWhirl sends its requests through a transport, chosen with the
+transport argument of the client:
+
+- 'requests' (the default) uses a pooled requests.Session.
+- 'stdlib' is a small keep-alive connection pool built on the standard
+  library's http.client. It needs no third party package and imports
+  several times faster, which matters in short-lived processes such as
+  serverless functions, where every cold start pays for it.
+- 'urllib3' uses a urllib3.PoolManager directly, skipping the per
+  request work of requests.Session (hooks, cookies, environment
+  settings).
+- 'http2' uses httpx (pip install paywhirl[http2]). HTTPS connections
+  negotiate HTTP/2, so any number of concurrent calls, from threads
+  sharing the client, are multiplexed over a single connection.
+  Plain http:// URLs fall back to HTTP/1.1.
+
+```
+pw = PayWhirl(api_key, api_secret, transport='http2')
+```
+
+A Transport instance can be passed as well. MemoryTransport answers
+from canned responses without any network, for tests:
+
+```
+transport = MemoryTransport({'GET /customer/{id}': {'id': 1, 'email': 'a@b.c'}})
+pw = PayWhirl(api_key, api_secret, transport=transport)
+assert pw.get_customer(1)['id'] == 1
+assert transport.requests[0].path == '/customer/1'
+```
+
+Third party libraries, and http.client and ssl, are only imported when
+the transport using them is created, so that importing paywhirl stays
+cheap and a client using 'stdlib' never loads requests. Every transport
+raises HTTPError for 4xx and 5xx responses. With 'requests', it is also a
+requests.exceptions.HTTPError.
+"""
+
+import datetime
+import json
+import select
+import threading
+import time
+import zlib
+from typing import (Any, Callable, Dict, Iterator, List, Mapping, NamedTuple, Optional,
+                    Tuple, Union)
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+
+class HTTPError(IOError):
+    """An API request was answered with a 4xx or 5xx status.
+
+    Attributes:
+        response: the response, with status_code, reason, headers and
+            text attributes.
+    """
+
+    def __init__(self, message: str, response: Any = None) -> None:
+        super().__init__(message)
+        self.response = response
+        self.request = getattr(response, 'request', None)
+
+
+def _error_message(resp: Any) -> str:
+    # the same message requests' raise_for_status() uses
+    kind = 'Client' if resp.status_code < 500 else 'Server'
+    return str.format('{0} {1} Error: {2} for url: {3}',
+                      resp.status_code, kind, resp.reason, resp.url)
+
+
+class Transport:
+    """Interface of an HTTP transport.
+
+    Attributes:
+        errors: the exceptions request() raises when a connection
+            fails or times out, which a RetryPolicy may retry.
+    """
+
+    name = 'abstract'
+    errors = ()  # type: Tuple[type, ...]
+
+    def request(self, method: str, url: str, params: dict = None, # pylint: disable=too-many-arguments
+                data: bytes = None, headers: Dict[str, str] = None,
+                timeout: Any = None, verify: bool = True, stream: bool = False) -> Any:
+        """Send a request and return its response.
+
+        The response has the attributes of requests.Response that the
+        client uses: status_code, reason, url, headers, elapsed,
+        content, text, iter_content() and close(), and can be used as a
+        context manager (see Response). With stream, the body is only
+        read through iter_content().
+        """
+
+        raise NotImplementedError
+
+    def raise_for_status(self, resp: Any) -> None:
+        """Raise HTTPError if resp has a 4xx or 5xx status."""
+
+        if resp.status_code >= 400:
+            raise HTTPError(_error_message(resp), response=resp)
+
+    def close(self) -> None:
+        """Close every pooled connection."""
+
+
+class Response:
+    """The parts of requests.Response used by the client.
+
+    Returned by every transport but 'requests'. Subclasses read the body
+    in _read() and _chunks(), and give the connection back in close().
+    """
+
+    def __init__(self, status_code: int, reason: str, url: str, headers: Mapping[str, str],
+                 elapsed: float) -> None:
+        self.status_code = status_code
+        self.reason = reason
+        self.url = url
+        self.headers = headers
+        self.elapsed = datetime.timedelta(seconds=elapsed)
+        self._content = None  # type: Optional[bytes]
+
+    def __enter__(self) -> 'Response':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _read(self) -> bytes:
+        raise NotImplementedError
+
+    def _chunks(self, chunk_size: int) -> Iterator[bytes]:
+        raise NotImplementedError
+
+    @property
+    def content(self) -> bytes:
+        """The whole (decompressed) body."""
+
+        if self._content is None:
+            try:
+                self._content = self._read()
+            finally:
+                self.close()
+        return self._content
+
+    @property
+    def text(self) -> str:
+        """The body decoded to text."""
+
+        charset = 'utf-8'
+        for part in (self.headers.get('Content-Type') or '').split(';')[1:]:
+            name, _, value = part.strip().partition('=')
+            if name.lower() == 'charset' and value:
+                charset = value.strip('"\'')
+        return self.content.decode(charset, 'replace')
+
+    def json(self) -> Any:
+        """The body decoded from JSON."""
+
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size: int = 1) -> Iterator[bytes]:
+        """Yield the body in chunks of at most chunk_size bytes as it arrives."""
+
+        if self._content is not None:
+            for start in range(0, len(self._content), chunk_size):
+                yield self._content[start:start + chunk_size]
+            return
+        try:
+            yield from self._chunks(chunk_size)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Give the connection back to the pool, or close it if unread."""
+
+
+_requests_error = None
+
+
+def _requests_http_error() -> type:
+    """Return an HTTPError that is also a requests.exceptions.HTTPError."""
+
+    global _requests_error # pylint: disable=global-statement
+
+    if _requests_error is None:
+        import requests # pylint: disable=import-outside-toplevel
+
+        class RequestsHTTPError(HTTPError, requests.exceptions.HTTPError):
+            """HTTPError raised by the 'requests' transport."""
+
+        _requests_error = RequestsHTTPError
+    return _requests_error
+
+
+class RequestsTransport(Transport):
+    """A pooled requests.Session."""
+
+    name = 'requests'
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10,
+                 pool_block: bool = False) -> None:
+        # pylint: disable=import-outside-toplevel
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.errors = (requests.ConnectionError, requests.Timeout)
+        self._error = _requests_http_error()
+
+    def request(self, method: str, url: str, params: dict = None, # pylint: disable=too-many-arguments
+                data: bytes = None, headers: Dict[str, str] = None,
+                timeout: Any = None, verify: bool = True, stream: bool = False) -> Any:
+        return self.session.request(method, url, params=params, data=data, headers=headers,
+                                    timeout=timeout, verify=verify, stream=stream)
+
+    def raise_for_status(self, resp: Any) -> None:
+        if resp.status_code >= 400:
+            raise self._error(_error_message(resp), response=resp)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def _query_pairs(params: Optional[dict]) -> List[Tuple[str, str]]:
+    """Flatten params into (name, value) strings the way requests does.
+
+    None values are left out, list and tuple values repeat their name,
+    and anything else, bools included, is sent as str(value).
+    """
+
+    pairs = []
+    for name, value in (params or {}).items():
+        for item in value if isinstance(value, (list, tuple)) else (value,):
+            if item is None:
+                continue
+            if isinstance(item, bytes):
+                item = item.decode('utf-8')
+            pairs.append((name, item if isinstance(item, str) else str(item)))
+    return pairs
+
+
+def _query_url(url: str, params: Optional[dict]) -> str:
+    """Append params to url the way requests does, leaving out None values."""
+
+    query = urlencode(_query_pairs(params))
+    if not query:
+        return url
+    return url + ('&' if '?' in url else '?') + query
+
+
+def _timeouts(timeout: Any) -> Tuple[Optional[float], Optional[float]]:
+    """Split a timeout, a number or a (connect, read) tuple, in two."""
+
+    if isinstance(timeout, tuple):
+        return timeout[0], timeout[1]
+    return timeout, timeout
+
+
+def _dropped(conn: Any) -> bool:
+    """True when an idle connection was closed by the server."""
+
+    if conn.sock is None:
+        return True
+    try:
+        # an idle connection only becomes readable when it is closed.
+        # select() is limited to descriptors below FD_SETSIZE, so poll()
+        # is used where available (everywhere but Windows)
+        if hasattr(select, 'poll'):
+            poller = select.poll()
+            poller.register(conn.sock, select.POLLIN)
+            return bool(poller.poll(0))
+        return bool(select.select([conn.sock], [], [], 0)[0])
+    except (OSError, ValueError):
+        return True
+
+
+def transient(error: BaseException) -> bool:
+    """False when a transport error can not be fixed by retrying.
+
+    That is the case of a server certificate failing verification,
+    which every transport reports as one of its errors (an OSError for
+    'stdlib'), wrapping the ssl.SSLCertVerificationError.
+    """
+
+    import ssl # pylint: disable=import-outside-toplevel
+
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, ssl.SSLCertVerificationError):
+            return False
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return True
+
+
+class HTTPClientResponse(Response):
+    """A response of the 'stdlib' transport."""
+
+    def __init__(self, raw: Any, release: Callable[[bool], None], url: str,
+                 elapsed: float) -> None:
+        super().__init__(raw.status, raw.reason, url, raw.headers, elapsed)
+        self._raw = raw
+        self._release = release  # type: Optional[Callable[[bool], None]]
+        self._gzip = raw.headers.get('Content-Encoding', '').lower() == 'gzip'
+
+    def _read(self) -> bytes:
+        data = self._raw.read()
+        return zlib.decompress(data, 31) if self._gzip and data else data
+
+    def _chunks(self, chunk_size: int) -> Iterator[bytes]:
+        decoder = zlib.decompressobj(31) if self._gzip else None
+        while True:
+            chunk = self._raw.read1(chunk_size)
+            if not chunk:
+                break
+            if decoder is not None:
+                chunk = decoder.decompress(chunk)
+            if chunk:
+                yield chunk
+        if decoder is not None:
+            tail = decoder.flush()
+            if tail:
+                yield tail
+
+    def close(self) -> None:
+        if self._release is not None:
+            release, self._release = self._release, None
+            release(self._raw.isclosed() and not self._raw.will_close)
+
+
+class HTTPClientTransport(Transport):
+    """Keep-alive connections of the standard library's http.client.
+
+    pool_maxsize idle connections are kept per host. pool_connections
+    and pool_block have no effect.
+    """
+
+    name = 'stdlib'
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10,
+                 pool_block: bool = False) -> None:
+        # pylint: disable=unused-argument
+        import http.client # pylint: disable=import-outside-toplevel
+
+        self._client = http.client
+        self.errors = (OSError, http.client.HTTPException)
+        self._pool_maxsize = pool_maxsize
+        self._idle = {}  # type: Dict[Tuple[str, str, bool], List[Any]]
+        self._lock = threading.Lock()
+        self._contexts = {}  # type: Dict[bool, Any]
+
+    def _context(self, verify: bool) -> Any:
+        # building a context loads the CA certificates, so it is done once
+        context = self._contexts.get(verify)
+        if context is None:
+            import ssl # pylint: disable=import-outside-toplevel
+            if verify:
+                context = ssl.create_default_context()
+            else:
+                context = ssl._create_unverified_context() # pylint: disable=protected-access
+            self._contexts[verify] = context
+        return context
+
+    def _connection(self, key: Tuple[str, str, bool]) -> Any:
+        with self._lock:
+            idle = self._idle.get(key)
+            while idle:
+                conn = idle.pop()
+                if not _dropped(conn):
+                    return conn
+                conn.close()
+        scheme, netloc, verify = key
+        if scheme == 'https':
+            return self._client.HTTPSConnection(netloc, context=self._context(verify))
+        return self._client.HTTPConnection(netloc)
+
+    def _release(self, key: Tuple[str, str, bool], conn: Any, reusable: bool) -> None:
+        if reusable:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self._pool_maxsize:
+                    idle.append(conn)
+                    return
+        conn.close()
+
+    def request(self, method: str, url: str, params: dict = None, # pylint: disable=too-many-arguments
+                data: bytes = None, headers: Dict[str, str] = None,
+                timeout: Any = None, verify: bool = True,
+                stream: bool = False) -> HTTPClientResponse:
+        url = _query_url(url, params)
+        parts = urlsplit(url)
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+
+        key = (parts.scheme, parts.netloc, verify)
+        conn = self._connection(key)
+        connect_timeout, read_timeout = _timeouts(timeout)
+        headers = dict(headers or {})
+        headers.setdefault('Accept-Encoding', 'gzip')
+        started = time.perf_counter()
+        try:
+            if conn.sock is None:
+                conn.timeout = connect_timeout
+                conn.connect()
+            conn.sock.settimeout(read_timeout)
+            conn.request(method.upper(), target, body=data, headers=headers)
+            raw = conn.getresponse()
+        except BaseException:
+            conn.close()
+            raise
+
+        resp = HTTPClientResponse(raw, lambda reusable: self._release(key, conn, reusable),
+                                  url, time.perf_counter() - started)
+        if not stream:
+            resp.content # pylint: disable=pointless-statement
+        return resp
+
+    def close(self) -> None:
+        with self._lock:
+            idle = [conn for conns in self._idle.values() for conn in conns]
+            self._idle.clear()
+        for conn in idle:
+            conn.close()
+
+
+class URLLib3Response(Response):
+    """A response of the 'urllib3' transport."""
+
+    def __init__(self, raw: Any, url: str, elapsed: float) -> None:
+        super().__init__(raw.status, raw.reason, url, raw.headers, elapsed)
+        self._raw = raw
+
+    def _read(self) -> bytes:
+        return self._raw.data
+
+    def _chunks(self, chunk_size: int) -> Iterator[bytes]:
+        return self._raw.stream(chunk_size, decode_content=True)
+
+    def close(self) -> None:
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            if not raw.closed:
+                # unread: the connection can not be reused
+                raw.close()
+            raw.release_conn()
+
+
+class URLLib3Transport(Transport):
+    """A urllib3.PoolManager, without the per request overhead of requests."""
+
+    name = 'urllib3'
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10,
+                 pool_block: bool = False) -> None:
+        try:
+            import urllib3 # pylint: disable=import-outside-toplevel,import-error
+        except ImportError as err:
+            raise ImportError(
+                'the urllib3 transport requires urllib3: pip install urllib3') from err
+
+        self._urllib3 = urllib3
+        self.errors = (urllib3.exceptions.HTTPError,)
+        self._pool = dict(num_pools=pool_connections, maxsize=pool_maxsize, block=pool_block)
+        self._managers = {}  # type: Dict[bool, Any]
+        self._lock = threading.Lock()
+
+    def _manager(self, verify: bool) -> Any:
+        manager = self._managers.get(verify)
+        if manager is None:
+            with self._lock:
+                manager = self._managers.get(verify)
+                if manager is None:
+                    manager = self._managers[verify] = self._urllib3.PoolManager(
+                        cert_reqs='CERT_REQUIRED' if verify else 'CERT_NONE', **self._pool)
+        return manager
+
+    def request(self, method: str, url: str, params: dict = None, # pylint: disable=too-many-arguments
+                data: bytes = None, headers: Dict[str, str] = None,
+                timeout: Any = None, verify: bool = True,
+                stream: bool = False) -> URLLib3Response:
+        url = _query_url(url, params)
+        connect_timeout, read_timeout = _timeouts(timeout)
+        headers = dict(headers or {})
+        headers.setdefault('Accept-Encoding', 'gzip')
+        started = time.perf_counter()
+        raw = self._manager(verify).request(
+            method.upper(), url, body=data, headers=headers,
+            timeout=self._urllib3.Timeout(connect=connect_timeout, read=read_timeout),
+            retries=False, redirect=False, preload_content=not stream)
+        return URLLib3Response(raw, url, time.perf_counter() - started)
+
+    def close(self) -> None:
+        with self._lock:
+            managers = list(self._managers.values())
+            self._managers.clear()
+        for manager in managers:
+            manager.clear()
+
+
+class HTTPXResponse(Response):
+    """A response of the 'http2' transport."""
+
+    def __init__(self, raw: Any, elapsed: float) -> None:
+        super().__init__(raw.status_code, raw.reason_phrase, str(raw.url), raw.headers,
+                         elapsed)
+        self._raw = raw
+
+    def _read(self) -> bytes:
+        return self._raw.read()
+
+    def _chunks(self, chunk_size: int) -> Iterator[bytes]:
+        return self._raw.iter_bytes(chunk_size)
+
+    def close(self) -> None:
+        self._raw.close()
+
+
+class HTTP2Transport(Transport):
+    """An httpx.Client speaking HTTP/2 over HTTPS.
+
+    Concurrent requests to a host share one multiplexed connection.
+    pool_maxsize caps the number of connections, pool_connections and
+    pool_block have no effect. With prior_knowledge, HTTP/2 is spoken
+    from the first byte, without negotiation, also over plain http://
+    (h2c); only use it with servers known to support HTTP/2.
+
+    With many threads starting requests at once, httpx's synchronous
+    HTTP/2 client (httpcore 1.0) can send stream ids out of order, which
+    a server answers by closing the connection. The calls in flight then
+    fail with a connection error, which RetryPolicy retries for GET and
+    idempotency keyed requests.
+    """
+
+    name = 'http2'
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10,
+                 pool_block: bool = False, prior_knowledge: bool = False) -> None:
+        # pylint: disable=unused-argument
+        try:
+            # pylint: disable=import-outside-toplevel,import-error,unused-import
+            import httpx
+            import h2
+        except ImportError as err:
+            raise ImportError(
+                'the http2 transport requires httpx[http2]: pip install paywhirl[http2]') from err
+
+        self._httpx = httpx
+        self.errors = (httpx.TransportError,)
+        self._limits = httpx.Limits(max_connections=pool_maxsize,
+                                    max_keepalive_connections=pool_maxsize)
+        self._http1 = not prior_knowledge
+        # verification is a setting of the httpx client, so there is one
+        # client per setting
+        self._clients = {}  # type: Dict[bool, Any]
+        self._lock = threading.Lock()
+
+    def _client(self, verify: bool) -> Any:
+        client = self._clients.get(verify)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(verify)
+                if client is None:
+                    client = self._clients[verify] = self._httpx.Client(
+                        http1=self._http1, http2=True, verify=verify, limits=self._limits)
+        return client
+
+    def request(self, method: str, url: str, params: dict = None, # pylint: disable=too-many-arguments
+                data: bytes = None, headers: Dict[str, str] = None,
+                timeout: Any = None, verify: bool = True,
+                stream: bool = False) -> HTTPXResponse:
+        client = self._client(verify)
+        connect_timeout, read_timeout = _timeouts(timeout)
+        request = client.build_request(
+            method.upper(), _query_url(url, params), content=data, headers=headers,
+            timeout=self._httpx.Timeout(read_timeout, connect=connect_timeout))
+        started = time.perf_counter()
+        raw = client.send(request, stream=stream)
+        return HTTPXResponse(raw, time.perf_counter() - started)
+
+    def close(self) -> None:
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+
+class _Headers(dict):
+    """Case-insensitive headers of a MemoryResponse."""
+
+    def __init__(self, headers: Mapping[str, str] = None) -> None:
+        super().__init__((name.lower(), value) for name, value in (headers or {}).items())
+
+    def __getitem__(self, name: str) -> str:
+        return super().__getitem__(name.lower())
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and super().__contains__(name.lower())
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return super().get(name.lower(), default)
+
+
+_REASONS = {200: 'OK', 201: 'Created', 204: 'No Content', 304: 'Not Modified',
+            400: 'Bad Request', 401: 'Unauthorized', 404: 'Not Found',
+            422: 'Unprocessable Entity', 429: 'Too Many Requests',
+            500: 'Internal Server Error', 502: 'Bad Gateway',
+            503: 'Service Unavailable', 504: 'Gateway Timeout'}
+
+
+class MemoryRequest(NamedTuple):
+    """A request received by a MemoryTransport.
+
+    Attributes:
+        method: the upper case HTTP method
+        path: the path of the URL, without query string
+        params: the query string as a dict, with a list for a
+            repeated name
+        body: the decoded JSON body, None without one
+        headers: the request headers
+    """
+
+    method: str
+    path: str
+    params: Dict[str, Any]
+    body: Any
+    headers: Dict[str, str]
+
+
+class MemoryResponse(Response):
+    """A response of a MemoryTransport."""
+
+    def __init__(self, status_code: int, body: Any, url: str,
+                 headers: Mapping[str, str] = None) -> None:
+        super().__init__(status_code, _REASONS.get(status_code, ''), url, _Headers(headers),
+                         0.0)
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        elif not isinstance(body, bytes):
+            body = json.dumps(body).encode('utf-8')
+        self._body = body
+
+    def _read(self) -> bytes:
+        return self._body
+
+    def _chunks(self, chunk_size: int) -> Iterator[bytes]:
+        for start in range(0, len(self._body), chunk_size):
+            yield self._body[start:start + chunk_size]
+
+
+class MemoryTransport(Transport):
+    """Answer requests from canned responses, for tests.
+
+    Responses are looked up by 'METHOD /path', first with the actual path
+    ('GET /customer/12'), then with its numeric segments replaced by {id}
+    ('GET /customer/{id}'), as in paywhirl.metrics. A response is one of:
+
+    - a body: a JSON serializable value, str or bytes, sent with 200 OK
+    - a (status, body) or (status, body, headers) tuple
+    - a callable, called with the MemoryRequest, returning one of the
+      above. It may also raise ConnectionError or TimeoutError to
+      simulate a network failure.
+
+    Requests without a response are answered with 404 Not Found. Every
+    request is recorded in requests, in order.
+    """
+
+    name = 'memory'
+    errors = (ConnectionError, TimeoutError)
+
+    responses: Dict[str, Any]
+    requests: List[MemoryRequest]
+
+    def __init__(self, responses: Dict[str, Any] = None) -> None:
+        self.responses = dict(responses or {})
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def add(self, key: str, response: Any) -> None:
+        """Answer requests matching key, e.g. 'POST /charge', with response."""
+
+        self.responses[key] = response
+
+    def request(self, method: str, url: str, params: dict = None, # pylint: disable=too-many-arguments
+                data: bytes = None, headers: Dict[str, str] = None,
+                timeout: Any = None, verify: bool = True,
+                stream: bool = False) -> MemoryResponse:
+        from .cache import route # pylint: disable=import-outside-toplevel
+
+        url = _query_url(url, params)
+        parts = urlsplit(url)
+        query = {}  # type: Dict[str, Any]
+        for name, value in parse_qsl(parts.query, keep_blank_values=True):
+            if name not in query:
+                query[name] = value
+            elif isinstance(query[name], list):
+                query[name].append(value)
+            else:
+                query[name] = [query[name], value]
+        method = method.upper()
+        request = MemoryRequest(method, parts.path, query,
+                                json.loads(data) if data else None, dict(headers or {}))
+        with self._lock:
+            self.requests.append(request)
+
+        response = self.responses.get(method + ' ' + parts.path)
+        if response is None:
+            response = self.responses.get(method + ' ' + route(parts.path))
+        if callable(response):
+            response = response(request)
+        if response is None:
+            return MemoryResponse(
+                404, {'error': 'no response for ' + method + ' ' + parts.path}, url)
+        if isinstance(response, tuple):
+            return MemoryResponse(response[0], response[1], url,
+                                  response[2] if len(response) > 2 else None)
+        return MemoryResponse(200, response, url)
+
+
+TRANSPORTS = {
+    'requests': RequestsTransport,
+    'stdlib': HTTPClientTransport,
+    'urllib3': URLLib3Transport,
+    'http2': HTTP2Transport,
+}  # type: Dict[str, type]
+
+
+def get_transport(transport: Union[None, str, Transport] = None, pool_connections: int = 10,
+                  pool_maxsize: int = 10, pool_block: bool = False,
+                  **options: Any) -> Transport:
+    """Resolve a transport name, instance or None into a Transport.
+
+    None picks 'requests'. Pool settings and options, passed on to the
+    constructor of the transport (e.g. prior_knowledge=True for
+    'http2'), only apply to named transports.
+    """
+
+    if isinstance(transport, Transport):
+        return transport
+    name = 'requests' if transport is None else transport
+    if name not in TRANSPORTS:
+        raise ValueError(str.format('unknown transport {0!r}', transport))
+    return TRANSPORTS[name](pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                            pool_block=pool_block, **options)
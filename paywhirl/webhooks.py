@@ -0,0 +1,552 @@
+"""Webhook events
+==============
+
+A WebhookDispatcher receives the webhooks PayWhirl posts to your server
+(invoice paid, subscription created...) and runs your handlers on a pool
+of worker threads, so the HTTP request can be answered right away:
+
+```
+hooks = WebhookDispatcher(webhook_secret, max_workers=8)
+
+@hooks.on('invoice.paid')
+def invoice_paid(event):
+    fulfil(event.data.customer_id, event.data.amount_due)
+
+# in the view receiving POST /paywhirl/webhook
+try:
+    hooks.receive(request.body, request.headers.get(hooks.signature_header))
+except SignatureError:
+    return 400
+except queue.Full:
+    return 503   # PayWhirl delivers the event again later
+return 200
+```
+
+The signature scheme and payload shape below are assumptions, not taken
+from PayWhirl's API documentation; check them against a real delivery.
+By default the X-PayWhirl-Signature header (SIGNATURE_HEADER) is expected
+to hold the hex HMAC-SHA256 of the raw request body, keyed with the
+webhook secret. The header name and the digest are arguments of the
+dispatchers. Payloads with a missing or wrong signature raise
+SignatureError before anything is decoded. Several secrets can be given
+while one is rotated.
+
+Payloads are expected to be JSON objects with an 'id', a 'type', the
+affected record in 'data' and a 'created_at'. Event.data is the record
+as the model of paywhirl.models named by the first part of the type
+('invoice.paid' -> Invoice), or a dict with models=False or for types
+without a model.
+
+Events are delivered at least once, so a redelivered event id is
+recognised and dropped. An EventLog keeps the ids, for three days by
+default, in a CacheBackend: in memory, or in a SQLiteBackend to share
+them with other processes. An event whose handler failed is forgotten,
+so that a later delivery runs it again.
+
+Handlers are registered for a type ('invoice.paid'), a type prefix
+('invoice.*') or every event ('*'). The queue in front of the workers is
+bounded: when handlers fall behind, receive() waits up to its timeout for
+room and then raises queue.Full. Events are handled in parallel, so two
+events about the same record may be handled out of order. With
+max_workers=0, handlers run inside receive(), and their exceptions
+propagate.
+
+AsyncWebhookDispatcher does the same for asyncio applications, with a
+bounded asyncio.Queue and worker tasks; its handlers may be coroutines.
+"""
+
+import hashlib
+import hmac
+import logging
+import queue
+import threading
+import time
+from typing import (Any, Callable, Dict, List, NamedTuple, Optional, Sequence,
+                    Union)
+
+from .backends import CacheBackend, MemoryBackend
+from .codec import JSONCodec, get_codec
+from .models import MODELS, to_models
+
+# assumed defaults, see the module docstring
+SIGNATURE_HEADER = 'X-PayWhirl-Signature'
+DIGEST = 'sha256'
+
+GROUP = 'webhook'
+
+_LOGGER = logging.getLogger(__name__)
+
+Handler = Callable[['Event'], Any]
+Digest = Union[str, Callable[..., Any]]
+
+
+class SignatureError(ValueError):
+    """The signature of a webhook payload is missing or wrong."""
+
+
+def sign(payload: bytes, secret: Union[str, bytes], digest: Digest = DIGEST) -> str:
+    """Return the hex HMAC of a payload, as expected in SIGNATURE_HEADER.
+
+    digest is a hashlib name or constructor, SHA-256 by default.
+    """
+
+    if isinstance(secret, str):
+        secret = secret.encode('utf-8')
+    return hmac.new(secret, payload, digest).hexdigest()
+
+
+def verify_signature(payload: bytes, signature: Optional[str],
+                     secrets: Sequence[Union[str, bytes]], digest: Digest = DIGEST) -> None:
+    """Check the signature of a payload against any of secrets.
+
+    Raises:
+        SignatureError: the signature is missing or matches none of them.
+    """
+
+    if not signature:
+        raise SignatureError('missing webhook signature')
+    signature = signature.strip().lower()
+    for secret in secrets:
+        if hmac.compare_digest(sign(payload, secret, digest), signature):
+            return
+    raise SignatureError('webhook signature does not match')
+
+
+class Event(NamedTuple):
+    """A webhook event.
+
+    Attributes:
+        id: the event id, unique per event but shared by redeliveries.
+        type: e.g. 'invoice.paid'.
+        data: the record the event is about, as a model or a dict.
+        created_at: when the event happened, as sent by PayWhirl.
+        payload: the whole decoded payload.
+    """
+
+    id: str
+    type: str
+    data: Any
+    created_at: Any
+    payload: Dict[str, Any]
+
+
+def parse_event(body: bytes, json_codec: Union[str, JSONCodec] = None,
+                models: bool = True) -> Event:
+    """Decode a webhook payload into an Event.
+
+    Payloads without an id are identified by a hash of their body, which
+    a redelivery shares.
+
+    Raises:
+        ValueError: the payload is not a JSON object with a type.
+    """
+
+    payload = get_codec(json_codec).loads(body)
+    if not isinstance(payload, dict) or not isinstance(payload.get('type'), str):
+        raise ValueError('webhook payload is not an event')
+    event_type = payload['type']
+    data = payload.get('data')
+    if models:
+        model = MODELS.get(event_type.split('.', 1)[0].capitalize())
+        if model is not None:
+            data = to_models(model, data)
+    event_id = payload.get('id')
+    if event_id is None:
+        event_id = hashlib.sha256(body).hexdigest()
+    return Event(str(event_id), event_type, data, payload.get('created_at'), payload)
+
+
+class EventLog:
+    """The ids of handled events, used to drop redeliveries.
+
+    While an event is being handled its id is leased, so that concurrent
+    deliveries of it, even to other processes sharing the backend, are
+    dropped too. If the process dies, the lease expires after
+    lease_timeout seconds and the event is accepted again.
+    """
+
+    ttl: float
+    backend: CacheBackend
+    lease_timeout: float
+
+    def __init__(self, ttl: float = 3 * 86400, backend: CacheBackend = None,
+                 lease_timeout: float = 600) -> None:
+        """Create a log.
+
+        Args:
+            ttl: seconds a handled event id is remembered for. Defaults
+                to three days, longer than PayWhirl keeps redelivering.
+            backend: where ids are kept. Defaults to a MemoryBackend of
+                100000 entries.
+            lease_timeout: the longest an event is expected to wait in
+                the queue and be handled.
+        """
+
+        self.ttl = ttl
+        self.backend = backend if backend is not None else MemoryBackend(maxsize=100000)
+        self.lease_timeout = lease_timeout
+
+    def claim(self, event_id: str) -> bool:
+        """Return False when the event was handled or is being handled."""
+
+        key = GROUP + ':' + event_id
+        entry = self.backend.get(key)
+        if entry is not None and entry[0] > time.time():
+            return False
+        return self.backend.acquire(key, self.lease_timeout)
+
+    def done(self, event_id: str) -> None:
+        """Remember that the event was handled."""
+
+        key = GROUP + ':' + event_id
+        self.backend.set(key, GROUP, time.time() + self.ttl, b'')
+        self.backend.release(key)
+
+    def forget(self, event_id: str) -> None:
+        """Give up a claim, so that the next delivery is handled."""
+
+        self.backend.release(GROUP + ':' + event_id)
+
+
+def log_error(event: Event, error: BaseException) -> None:
+    """The default on_error of dispatchers: log the traceback.
+
+    It is logged as an error of the 'paywhirl.webhooks' logger.
+    """
+
+    _LOGGER.exception('Exception in handler of webhook event %s (%s)', event.id, event.type,
+                     exc_info=error)
+
+
+class _Dispatcher:
+    """Signature checks, parsing, deduplication and handler lookup.
+
+    Attributes:
+        signature_header: the request header holding the signature.
+    """
+
+    signature_header: str
+
+    def __init__( # pylint: disable=too-many-arguments
+            self,
+            secret: Union[str, bytes, Sequence[Union[str, bytes]]],
+            log: Optional[EventLog] = None,
+            models: bool = True,
+            json_codec: Union[str, JSONCodec] = None,
+            on_error: Callable[[Event, BaseException], Any] = log_error,
+            signature_header: str = SIGNATURE_HEADER,
+            digest: Digest = DIGEST) -> None:
+        self._secrets = [secret] if isinstance(secret, (str, bytes)) else list(secret)
+        if not self._secrets:
+            raise ValueError('no webhook secret')
+        self.signature_header = signature_header
+        self._digest = digest
+        self.log = log if log is not None else EventLog()
+        self._models = models
+        self._codec = get_codec(json_codec)
+        self._on_error = on_error
+        self._handlers = {}  # type: Dict[str, List[Handler]]
+        self._resolved = {}  # type: Dict[str, List[Handler]]
+        self._lock = threading.Lock()
+        self._counters = {'received': 0, 'rejected': 0, 'duplicates': 0,
+                          'handled': 0, 'failed': 0}
+
+    def on(self, event_type: str, handler: Handler = None) -> Any: # pylint: disable=invalid-name
+        """Register a handler for a type, a 'prefix.*' or '*'.
+
+        Can be used as a decorator. Handlers of an event run one after the
+        other: exact type first, then prefix, then '*'.
+        """
+
+        if handler is None:
+            return lambda func: self.on(event_type, func)
+        with self._lock:
+            self._handlers.setdefault(event_type, []).append(handler)
+            self._resolved = {}
+        return handler
+
+    def handlers(self, event_type: str) -> List[Handler]:
+        """Return the handlers of a type, in the order they run."""
+
+        found = self._resolved.get(event_type)
+        if found is None:
+            prefix = event_type.split('.', 1)[0] + '.*'
+            found = []
+            for key in (event_type, prefix, '*'):
+                found.extend(self._handlers.get(key, ()))
+            self._resolved[event_type] = found
+        return found
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _accept(self, body: bytes, signature: Optional[str]) -> Optional[Event]:
+        """Verify and parse a payload; None if it is a redelivery."""
+
+        self._count('received')
+        try:
+            verify_signature(body, signature, self._secrets, self._digest)
+            event = parse_event(body, self._codec, self._models)
+        except ValueError:
+            self._count('rejected')
+            raise
+        if not self.log.claim(event.id):
+            self._count('duplicates')
+            return None
+        return event
+
+    def _succeeded(self, event: Event) -> None:
+        self.log.done(event.id)
+        self._count('handled')
+
+    def _failed(self, event: Event) -> None:
+        self.log.forget(event.id)
+        self._count('failed')
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of events received, rejected (bad signature
+        or payload), dropped as duplicates, handled and failed, and how
+        many are waiting in the queue."""
+
+        with self._lock:
+            counters = dict(self._counters)
+        counters['queued'] = self._queued()
+        return counters
+
+    def _queued(self) -> int:
+        raise NotImplementedError
+
+
+class WebhookDispatcher(_Dispatcher):
+    """Dispatches webhook events to handlers on a pool of worker threads."""
+
+    def __init__( # pylint: disable=too-many-arguments
+            self,
+            secret: Union[str, bytes, Sequence[Union[str, bytes]]],
+            max_workers: int = 8,
+            queue_size: int = 1000,
+            log: Optional[EventLog] = None,
+            models: bool = True,
+            json_codec: Union[str, JSONCodec] = None,
+            on_error: Callable[[Event, BaseException], Any] = log_error,
+            signature_header: str = SIGNATURE_HEADER,
+            digest: Digest = DIGEST) -> None:
+        """Create a dispatcher.
+
+        Args:
+            secret: the webhook secret, or a list of the secrets accepted.
+            max_workers: the number of threads running handlers. With 0,
+                handlers run inside receive().
+            queue_size: the number of events waiting for a worker before
+                receive() blocks.
+            log: the EventLog redeliveries are recognised with.
+                Defaults to one in memory.
+            models: convert event data to models. Defaults to True.
+            json_codec: the JSON backend payloads are decoded with.
+            on_error: called with the event and the exception when a
+                handler fails in a worker. Defaults to log_error().
+            signature_header: the request header holding the signature.
+                Defaults to SIGNATURE_HEADER.
+            digest: the hashlib name or constructor of the HMAC digest.
+                Defaults to 'sha256'.
+        """
+
+        super().__init__(secret, log, models, json_codec, on_error,
+                         signature_header, digest)
+        self._max_workers = max_workers
+        self._queue = queue.Queue(maxsize=queue_size)  # type: queue.Queue
+        self._workers = []  # type: List[threading.Thread]
+
+    def receive(self, body: bytes, signature: Optional[str],
+                timeout: Optional[float] = 10.0) -> Optional[Event]:
+        """Verify, decode and queue one webhook payload.
+
+        Args:
+            body: the raw request body.
+            signature: the value of the signature_header request header.
+            timeout: seconds to wait for room in a full queue, None to
+                wait as long as it takes.
+
+        Returns:
+            The event, or None when it is a redelivery.
+
+        Raises:
+            SignatureError: the signature is missing or wrong.
+            ValueError: the payload is not an event.
+            queue.Full: the queue stayed full for timeout seconds.
+        """
+
+        event = self._accept(body, signature)
+        if event is None:
+            return None
+        if not self._max_workers:
+            self._run(event, raise_errors=True)
+            return event
+        if not self._workers:
+            self._start()
+        try:
+            self._queue.put(event, timeout=timeout)
+        except queue.Full:
+            self.log.forget(event.id)
+            raise
+        return event
+
+    def _start(self) -> None:
+        with self._lock:
+            while len(self._workers) < self._max_workers:
+                worker = threading.Thread(target=self._work, daemon=True,
+                                          name='paywhirl-webhooks')
+                worker.start()
+                self._workers.append(worker)
+
+    def _work(self) -> None:
+        while True:
+            event = self._queue.get()
+            try:
+                if event is None:
+                    return
+                self._run(event)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, event: Event, raise_errors: bool = False) -> None:
+        try:
+            for handler in self.handlers(event.type):
+                handler(event)
+        except Exception as err: # pylint: disable=broad-except
+            self._failed(event)
+            if raise_errors:
+                raise
+            if self._on_error is not None:
+                self._on_error(event, err)
+        else:
+            self._succeeded(event)
+
+    def join(self) -> None:
+        """Wait until every queued event has been handled."""
+
+        self._queue.join()
+
+    def _queued(self) -> int:
+        return self._queue.qsize()
+
+    def close(self) -> None:
+        """Handle the queued events, then stop the workers."""
+
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for _ in workers:
+            self._queue.put(None)
+        for worker in workers:
+            worker.join()
+
+    def __enter__(self) -> 'WebhookDispatcher':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+class AsyncWebhookDispatcher(_Dispatcher):
+    """Dispatches webhook events to handlers on asyncio worker tasks.
+
+    Handlers may be coroutine functions or plain functions; plain ones run
+    on the event loop and must not block.
+    """
+
+    def __init__( # pylint: disable=too-many-arguments
+            self,
+            secret: Union[str, bytes, Sequence[Union[str, bytes]]],
+            max_workers: int = 8,
+            queue_size: int = 1000,
+            log: Optional[EventLog] = None,
+            models: bool = True,
+            json_codec: Union[str, JSONCodec] = None,
+            on_error: Callable[[Event, BaseException], Any] = log_error,
+            signature_header: str = SIGNATURE_HEADER,
+            digest: Digest = DIGEST) -> None:
+        """Create a dispatcher. Takes the arguments of WebhookDispatcher."""
+
+        super().__init__(secret, log, models, json_codec, on_error,
+                         signature_header, digest)
+        self._max_workers = max_workers
+        self._queue_size = queue_size
+        # created in the running loop by the first receive()
+        self._queue = None  # type: Any
+        self._workers = []  # type: List[Any]
+
+    async def receive(self, body: bytes, signature: Optional[str],
+                      timeout: Optional[float] = 10.0) -> Optional[Event]:
+        """Async counterpart of WebhookDispatcher.receive()."""
+
+        import asyncio # pylint: disable=import-outside-toplevel
+
+        event = self._accept(body, signature)
+        if event is None:
+            return None
+        if not self._max_workers:
+            await self._run(event, raise_errors=True)
+            return event
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self._queue_size)
+            self._workers = [asyncio.ensure_future(self._work())
+                             for _ in range(self._max_workers)]
+        try:
+            await asyncio.wait_for(self._queue.put(event), timeout)
+        except asyncio.TimeoutError:
+            self.log.forget(event.id)
+            raise queue.Full() from None
+        return event
+
+    async def _work(self) -> None:
+        while True:
+            event = await self._queue.get()
+            try:
+                await self._run(event)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, event: Event, raise_errors: bool = False) -> None:
+        import inspect # pylint: disable=import-outside-toplevel
+
+        try:
+            for handler in self.handlers(event.type):
+                result = handler(event)
+                if inspect.isawaitable(result):
+                    await result
+        except Exception as err: # pylint: disable=broad-except
+            self._failed(event)
+            if raise_errors:
+                raise
+            if self._on_error is not None:
+                self._on_error(event, err)
+        else:
+            self._succeeded(event)
+
+    async def join(self) -> None:
+        """Wait until every queued event has been handled."""
+
+        if self._queue is not None:
+            await self._queue.join()
+
+    def _queued(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def close(self) -> None:
+        """Handle the queued events, then stop the workers."""
+
+        import asyncio # pylint: disable=import-outside-toplevel
+
+        await self.join()
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._queue = None
+
+    async def __aenter__(self) -> 'AsyncWebhookDispatcher':
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
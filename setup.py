@@ -5,7 +5,7 @@ with open("README.md", "r") as fh:
 
 setuptools.setup(
     name="paywhirl",
-    version="1.3",
+    version="1.4",
     author="PayWhirl",
     author_email="developer@paywhirl.com",
     description="Python client for PayWhirl API",
@@ -13,10 +13,17 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/paywhirl/python-pwclient",
     packages=setuptools.find_packages(),
+    extras_require={
+        'async': ['aiohttp>=3.6'],
+        'tracing': ['opentelemetry-api'],
+        'speedups': ['orjson'],
+        'parquet': ['pyarrow'],
+        'http2': ['httpx[http2]'],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
-    python_requires='>=3.5',
+    python_requires='>=3.7',
 )
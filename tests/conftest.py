@@ -0,0 +1,32 @@
+import pytest
+
+from paywhirl import PayWhirl
+from paywhirl.transport import MemoryTransport
+
+
+@pytest.fixture
+def transport():
+    return MemoryTransport()
+
+
+@pytest.fixture
+def make_client(transport):
+    clients = []
+
+    def make(api_key='key', **kwargs):
+        client = PayWhirl(api_key, 'secret', transport=transport, **kwargs)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record the delays of time.sleep() instead of sleeping."""
+
+    delays = []
+    monkeypatch.setattr('time.sleep', delays.append)
+    return delays
@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import pytest
+
+from paywhirl import HTTPError
+
+web = pytest.importorskip('aiohttp.web')
+
+from paywhirl.aio import AsyncPayWhirl  # pylint: disable=wrong-import-position
+
+
+def run(scenario, routes):
+    """Serve routes ({'GET /path': handler}) locally while scenario(client, seen) runs."""
+
+    async def main():
+        seen = []
+
+        async def dispatch(request):
+            body = await request.read()
+            seen.append((request.method, request.path, dict(request.query),
+                         dict(request.headers), json.loads(body) if body else None))
+            handler = routes.get(request.method + ' ' + request.path)
+            if handler is None:
+                return web.json_response({'error': 'not found'}, status=404)
+            status, payload = handler(request)
+            return web.json_response(payload, status=status)
+
+        app = web.Application()
+        app.router.add_route('*', '/{tail:.*}', dispatch)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # pylint: disable=protected-access
+        try:
+            async with AsyncPayWhirl('key', 'secret', api_base='http://127.0.0.1:' + str(port),
+                                     retry_policies={}) as client:
+                return await scenario(client, seen)
+        finally:
+            await runner.cleanup()
+
+    return asyncio.run(main())
+
+
+def test_get_sends_credentials_and_decodes():
+    async def scenario(pw, seen):
+        assert await pw.get_plan(7) == {'id': 7}
+        assert seen[0][3]['api-key'] == 'key'
+        assert seen[0][3]['api-secret'] == 'secret'
+
+    run(scenario, {'GET /plan/7': lambda request: (200, {'id': 7})})
+
+
+def test_query_params_are_normalized_like_the_sync_client():
+    async def scenario(pw, seen):
+        await pw.get_customers({'limit': 10, 'keyword': None, 'active': True})
+        assert seen[0][2] == {'limit': '10', 'active': 'True'}
+
+    run(scenario, {'GET /customers': lambda request: (200, [])})
+
+
+def test_error_status_raises_http_error():
+    async def scenario(pw, seen):
+        with pytest.raises(HTTPError) as raised:
+            await pw.get_plan(7)
+        assert raised.value.response.status_code == 422
+        assert raised.value.response.json() == {'error': 'invalid'}
+
+    run(scenario, {'GET /plan/7': lambda request: (422, {'error': 'invalid'})})
+
+
+def test_keyed_post_sends_json_and_idempotency_key():
+    async def scenario(pw, seen):
+        await pw.create_charge({'amount': 5}, idempotency_key='order-1')
+        method, _, _, headers, body = seen[0]
+        assert method == 'POST'
+        assert headers['Idempotency-Key'] == 'order-1'
+        assert body == {'amount': 5}
+
+    run(scenario, {'POST /create/charge': lambda request: (200, {'id': 1})})
+
+
+def test_iter_customers_pages():
+    pages = {None: [{'id': 1}, {'id': 2}], '2': [{'id': 3}], '3': []}
+
+    async def scenario(pw, seen):
+        ids = [customer['id'] async for customer in pw.iter_customers(page_size=2)]
+        assert ids == [1, 2, 3]
+
+    run(scenario, {'GET /customers': lambda request: (200, pages[request.query.get('after_id')])})
+
+
+def test_unsupported_transport_raises_type_error():
+    with pytest.raises(TypeError, match='aiohttp'):
+        AsyncPayWhirl('key', 'secret', transport='urllib3')
@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+from paywhirl import MemoryBackend, ResponseCache, SQLiteBackend
+from paywhirl.cache import FORMAT_STAMP
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def backend(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryBackend()
+    return SQLiteBackend(str(tmp_path / 'cache.sqlite'))
+
+
+def test_lease_is_exclusive_until_released(backend):
+    assert backend.acquire('k', 10)
+    assert not backend.acquire('k', 10)
+    backend.release('k')
+    assert backend.acquire('k', 10)
+
+
+def test_lease_expires(backend):
+    assert backend.acquire('k', 0.01)
+    time.sleep(0.02)
+    assert backend.acquire('k', 10)
+
+
+def test_sqlite_leases_are_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    first, second = SQLiteBackend(path), SQLiteBackend(path)
+    assert first.acquire('k', 10)
+    assert not second.acquire('k', 10)
+    first.release('k')
+    assert second.acquire('k', 10)
+
+
+def test_fetch_caches_until_ttl(backend):
+    cache = ResponseCache(ttl=60, backend=backend)
+    calls = []
+
+    def send():
+        calls.append(1)
+        return [{'id': 1}]
+
+    assert cache.fetch('/plans', {}, send) == [{'id': 1}]
+    assert cache.fetch('/plans', {}, send) == [{'id': 1}]
+    assert len(calls) == 1
+    assert cache.stats()['hits'] == 1
+
+
+def test_expired_entry_is_served_stale_while_leased(backend):
+    cache = ResponseCache(ttl=60, backend=backend)
+    cache.fetch('/plans', {}, lambda: ['old'])
+    key = '/plans'
+    backend.set(key, 'plans', time.time() - 1, backend.get(key)[1])
+    assert backend.acquire(key, 10)  # someone else is refreshing it
+
+    assert cache.fetch('/plans', {}, lambda: ['new']) == ['old']
+    assert cache.stats()['stale'] == 1
+    backend.release(key)
+    assert cache.fetch('/plans', {}, lambda: ['new']) == ['new']
+
+
+def test_entries_without_format_stamp_are_ignored(backend):
+    cache = ResponseCache(ttl=60, backend=backend)
+    backend.set('/plans', 'plans', time.time() + 60, b'pw0:["other version"]')
+    assert cache.fetch('/plans', {}, lambda: ['fresh']) == ['fresh']
+    assert backend.get('/plans')[1].startswith(FORMAT_STAMP)
+
+
+def test_accounts_sharing_a_backend_are_kept_apart(tmp_path, transport, make_client):
+    path = str(tmp_path / 'cache.sqlite')
+    transport.add('GET /plans', lambda request: [{'account': request.headers['api-key']}])
+    first = make_client(api_key='first', cache=ResponseCache(backend=SQLiteBackend(path)))
+    second = make_client(api_key='second', cache=ResponseCache(backend=SQLiteBackend(path)))
+    staging = make_client(api_key='first', api_base='https://staging.example.com',
+                          cache=ResponseCache(backend=SQLiteBackend(path)))
+
+    assert first.get_plans({}) == [{'account': 'first'}]
+    assert second.get_plans({}) == [{'account': 'second'}]
+    assert first.get_plans({}) == [{'account': 'first'}]
+    staging.get_plans({})
+    assert len(transport.requests) == 3
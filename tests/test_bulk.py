@@ -0,0 +1,108 @@
+import pytest
+
+from paywhirl.bulk import DONE, FAILED, SKIPPED, UNKNOWN, BulkRunner, Journal, Operation
+
+
+def times_out_once():
+    calls = []
+
+    def respond(request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise TimeoutError()
+        return {'id': 1}
+
+    return respond
+
+
+def statuses(report):
+    return dict((outcome.operation.method, outcome.status) for outcome in report.outcomes)
+
+
+def test_resume_skips_done_and_resends_failed(tmp_path, transport, make_client):
+    pw = make_client(retry_policies={})
+    transport.add('POST /update/customer', (400, {}))
+    journal = str(tmp_path / 'journal.sqlite')
+    ops = [Operation('update_customer', ({'id': 1},), key='customer-1'),
+           Operation('get_account')]
+    transport.add('GET /account', {'id': 9})
+
+    report = BulkRunner(pw, journal=journal).run(ops)
+    assert statuses(report) == {'update_customer': FAILED, 'get_account': DONE}
+
+    transport.add('POST /update/customer', {'id': 1})
+    report = BulkRunner(pw, journal=Journal(journal)).run(ops)
+    assert statuses(report) == {'update_customer': DONE, 'get_account': SKIPPED}
+    assert report.ok
+    assert len(transport.requests) == 3
+
+
+def test_timed_out_charge_is_resent_with_the_same_key(transport, make_client):
+    pw = make_client(retry_policies={})
+    transport.add('POST /create/charge', times_out_once())
+    runner = BulkRunner(pw)
+    ops = [Operation('create_charge', ({'customer_id': 1, 'amount': 5},), key='order-1')]
+
+    assert statuses(runner.run(ops)) == {'create_charge': UNKNOWN}
+    assert statuses(runner.run(ops)) == {'create_charge': DONE}
+    keys = [request.headers['Idempotency-Key'] for request in transport.requests]
+    assert keys == ['order-1'] * 2
+
+
+def test_timed_out_unkeyed_operation_needs_retry_unknown(transport, make_client):
+    pw = make_client(retry_policies={})
+    transport.add('POST /update/customer', times_out_once())
+    runner = BulkRunner(pw)
+    ops = [Operation('update_customer', ({'id': 1},), key='customer-1')]
+
+    assert statuses(runner.run(ops)) == {'update_customer': UNKNOWN}
+    assert statuses(runner.run(ops)) == {'update_customer': UNKNOWN}
+    assert len(transport.requests) == 1
+    assert statuses(runner.run(ops, retry_unknown=True)) == {'update_customer': DONE}
+
+
+@pytest.mark.parametrize('status', [500, 502, 504])
+def test_server_error_of_unsafe_call_is_unknown(transport, make_client, status):
+    pw = make_client(retry_policies={})
+    transport.add('POST /create/card', (status, {}))
+    transport.add('POST /create/charge', (status, {}))
+    runner = BulkRunner(pw)
+    ops = [Operation('create_card', ({'customer_id': 1},), key='card-1'),
+           Operation('create_charge', ({'amount': 5},), key='order-1')]
+
+    assert statuses(runner.run(ops)) == {'create_card': UNKNOWN, 'create_charge': FAILED}
+    runner.run(ops)
+    assert [request.path for request in transport.requests].count('/create/card') == 1
+
+
+def test_changes_need_an_explicit_key(transport, make_client):
+    runner = BulkRunner(make_client())
+
+    with pytest.raises(ValueError, match='needs a key'):
+        runner.run([Operation('create_charge', ({'amount': 5},))])
+    assert not transport.requests
+
+
+def test_duplicate_keys_are_rejected(make_client):
+    runner = BulkRunner(make_client())
+    ops = [Operation('get_plan', (1,)), Operation('get_plan', (1,))]
+
+    with pytest.raises(ValueError, match='duplicate'):
+        runner.run(ops)
+
+
+def test_operation_idempotency_key_is_kept(transport, make_client):
+    pw = make_client()
+    transport.add('POST /create/charge', {'id': 1})
+    ops = [Operation('create_charge', ({'amount': 5},), {'idempotency_key': 'order-1'},
+                     key='charge-1')]
+
+    BulkRunner(pw).run(ops)
+    assert transport.requests[0].headers['Idempotency-Key'] == 'order-1'
+
+
+def test_dry_run_sends_nothing(transport, make_client):
+    pw = make_client()
+    report = BulkRunner(pw).run([Operation('get_account')], dry_run=True)
+    assert report.counts() == {'pending': 1}
+    assert not transport.requests
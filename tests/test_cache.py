@@ -0,0 +1,15 @@
+from paywhirl import ResponseCache
+
+
+def test_reference_get_is_cached_and_invalidated(transport, make_client):
+    cache = ResponseCache(ttl=60)
+    pw = make_client(cache=cache)
+    transport.add('GET /plans', [{'id': 1}])
+    transport.add('POST /update/plan', {'id': 1})
+
+    pw.get_plans({})
+    pw.get_plans({})
+    assert len(transport.requests) == 1
+    pw.update_plan({'id': 1})
+    pw.get_plans({})
+    assert len(transport.requests) == 3
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from paywhirl.codec import CODECS, JSONCodec, StdlibCodec, get_codec
+
+DOCUMENT = {'id': 1, 'name': 'Zoë', 'amount': 12.5, 'tags': ['a', None, True], 'nested': {}}
+
+
+class RecordingCodec(JSONCodec):
+    """The json module, recording what it encoded and decoded."""
+
+    name = 'recording'
+
+    def __init__(self):
+        self.dumped = []
+        self.loaded = []
+
+    def dumps(self, obj):
+        self.dumped.append(obj)
+        return json.dumps(obj).encode('utf-8')
+
+    def loads(self, data):
+        self.loaded.append(data)
+        return json.loads(data)
+
+
+@pytest.mark.parametrize('name', sorted(CODECS))
+def test_round_trip(name):
+    pytest.importorskip(name if name != 'stdlib' else 'json')
+    codec = get_codec(name)
+
+    data = codec.dumps(DOCUMENT)
+    assert isinstance(data, bytes)
+    assert codec.loads(data) == DOCUMENT
+    assert json.loads(data) == DOCUMENT
+
+
+def test_stdlib_output_is_compact():
+    assert StdlibCodec().dumps({'a': [1, 2]}) == b'{"a":[1,2]}'
+
+
+def test_get_codec():
+    codec = RecordingCodec()
+    assert get_codec(codec) is codec
+    assert isinstance(get_codec('stdlib'), StdlibCodec)
+    assert get_codec().name in CODECS
+    assert get_codec() is get_codec()
+    with pytest.raises(ValueError, match='unknown JSON codec'):
+        get_codec('simplejson')
+
+
+def test_client_encodes_and_decodes_with_its_codec(transport, make_client):
+    codec = RecordingCodec()
+    pw = make_client(json_codec=codec)
+    transport.add('POST /create/customer', lambda request: (201, request.body))
+
+    assert pw.create_customer({'email': 'jane@example.com'}) == {'email': 'jane@example.com'}
+    assert codec.dumped == [{'email': 'jane@example.com'}]
+    assert len(codec.loaded) == 1
+    assert transport.requests[0].body == {'email': 'jane@example.com'}
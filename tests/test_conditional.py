@@ -0,0 +1,61 @@
+import pytest
+
+from paywhirl import ConditionalCache, HTTPError
+
+
+def etagged(request):
+    if request.headers.get('If-None-Match') == '"v1"':
+        return (304, b'')
+    return (200, [{'id': 1}], {'ETag': '"v1"', 'Last-Modified': 'Fri, 16 Oct 2026 10:00:00 GMT'})
+
+
+def test_unchanged_response_is_reused(transport, make_client):
+    conditional = ConditionalCache()
+    pw = make_client(conditional=conditional)
+    transport.add('GET /plans', etagged)
+
+    first = pw.get_plans({})
+    assert pw.get_plans({}) is first
+    headers = transport.requests[1].headers
+    assert headers['If-None-Match'] == '"v1"'
+    assert headers['If-Modified-Since'] == 'Fri, 16 Oct 2026 10:00:00 GMT'
+    assert conditional.stats() == {'not_modified': 1, 'modified': 1, 'size': 1}
+
+
+def test_response_without_validators_is_forgotten(transport, make_client):
+    conditional = ConditionalCache()
+    pw = make_client(conditional=conditional)
+    transport.add('GET /plans', [{'id': 1}])
+
+    pw.get_plans({})
+    pw.get_plans({})
+    assert 'If-None-Match' not in transport.requests[1].headers
+    assert conditional.stats()['size'] == 0
+
+
+def test_not_modified_without_validators_raises(transport, make_client):
+    pw = make_client(conditional=ConditionalCache())
+    transport.add('GET /plans', (304, b''))
+
+    with pytest.raises(HTTPError, match='no validators were sent') as raised:
+        pw.get_plans({})
+    assert raised.value.response.status_code == 304
+
+
+def test_validators_are_kept_per_account(transport, make_client):
+    conditional = ConditionalCache()
+    transport.add('GET /plans', etagged)
+    make_client(api_key='first', conditional=conditional).get_plans({})
+    make_client(api_key='second', conditional=conditional).get_plans({})
+
+    assert 'If-None-Match' not in transport.requests[1].headers
+
+
+def test_lru_bound(transport, make_client):
+    conditional = ConditionalCache(maxsize=2)
+    pw = make_client(conditional=conditional)
+    transport.add('GET /plan/{id}', lambda request: (200, {}, {'ETag': request.path}))
+
+    for plan_id in (1, 2, 3):
+        pw.get_plan(plan_id)
+    assert conditional.stats()['size'] == 2
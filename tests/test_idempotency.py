@@ -0,0 +1,69 @@
+import pytest
+
+from paywhirl import IdempotencyStore, SQLiteBackend
+
+
+def test_same_key_replays_the_recorded_response(transport, make_client):
+    store = IdempotencyStore()
+    pw = make_client(idempotency=store)
+    transport.add('POST /create/charge', {'id': 1})
+
+    first = pw.create_charge({'amount': 5}, idempotency_key='order-1')
+    second = pw.create_charge({'amount': 5}, idempotency_key='order-1')
+    assert first == second == {'id': 1}
+    assert len(transport.requests) == 1
+    assert transport.requests[0].headers['Idempotency-Key'] == 'order-1'
+    assert store.stats() == {'replayed': 1, 'recorded': 1}
+
+
+def test_reusing_a_key_for_another_request_raises(transport, make_client):
+    pw = make_client(idempotency=IdempotencyStore())
+    transport.add('POST /create/charge', {'id': 1})
+
+    pw.create_charge({'amount': 5}, idempotency_key='order-1')
+    with pytest.raises(ValueError, match='already used'):
+        pw.create_charge({'amount': 6}, idempotency_key='order-1')
+    assert len(transport.requests) == 1
+
+
+def test_failed_calls_are_not_recorded(transport, make_client):
+    pw = make_client(idempotency=IdempotencyStore(), retry_policies={})
+    transport.add('POST /create/charge', (500, {}))
+
+    with pytest.raises(IOError):
+        pw.create_charge({'amount': 5}, idempotency_key='order-1')
+    transport.add('POST /create/charge', {'id': 1})
+    assert pw.create_charge({'amount': 5}, idempotency_key='order-1') == {'id': 1}
+    assert len(transport.requests) == 2
+
+
+def test_records_survive_in_sqlite(tmp_path, transport, make_client):
+    path = str(tmp_path / 'idempotency.sqlite')
+    transport.add('POST /create/charge', {'id': 1})
+
+    make_client(idempotency=IdempotencyStore(backend=SQLiteBackend(path))).create_charge(
+        {'amount': 5}, idempotency_key='order-1')
+    pw = make_client(idempotency=IdempotencyStore(backend=SQLiteBackend(path)))
+    assert pw.create_charge({'amount': 5}, idempotency_key='order-1') == {'id': 1}
+    assert len(transport.requests) == 1
+
+
+def test_random_keys_differ_per_call(transport, make_client):
+    pw = make_client()
+    transport.add('POST /create/charge', {'id': 1})
+
+    pw.create_charge({'amount': 5})
+    pw.create_charge({'amount': 5})
+    keys = [request.headers['Idempotency-Key'] for request in transport.requests]
+    assert len(set(keys)) == 2
+
+
+def test_keys_are_kept_apart_per_account(transport, make_client):
+    store = IdempotencyStore()
+    transport.add('POST /create/charge', lambda request: {'account': request.headers['api-key']})
+
+    first = make_client(api_key='first', idempotency=store)
+    second = make_client(api_key='second', idempotency=store)
+    assert first.create_charge({'amount': 5}, idempotency_key='order-1') == {'account': 'first'}
+    assert second.create_charge({'amount': 5}, idempotency_key='order-1') == {'account': 'second'}
+    assert len(transport.requests) == 2
@@ -0,0 +1,5 @@
+from paywhirl import methods
+
+
+def test_generated_methods_are_up_to_date():
+    assert methods.main(['--check']) == 0
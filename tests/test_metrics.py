@@ -0,0 +1,57 @@
+from paywhirl import MetricsCollector
+from paywhirl.metrics import RequestEvent
+
+
+def test_series_are_keyed_by_endpoint(transport, make_client):
+    metrics = MetricsCollector()
+    pw = make_client(metrics=metrics)
+    transport.add('GET /customer/{id}', {'id': 1})
+    transport.add('GET /invoice/{id}', (404, {}))
+
+    pw.get_customer(1)
+    pw.get_customer(2)
+    try:
+        pw.get_invoice(3)
+    except IOError:
+        pass
+    snapshot = metrics.snapshot()
+    assert sorted(snapshot) == ['get_customer', 'get_invoice']
+    customers = snapshot['get_customer']
+    assert (customers['method'], customers['route']) == ('GET', '/customer/{id}')
+    assert customers['count'] == 2
+    assert customers['statuses'] == {200: 2}
+    assert customers['bytes_received'] == 2 * len(b'{"id": 1}')
+    assert snapshot['get_invoice']['errors'] == 1
+
+
+def test_wait_time_is_aggregated():
+    metrics = MetricsCollector()
+    for wait in (0.25, 0.75):
+        event = RequestEvent('get', '/plans')
+        event.endpoint = 'get_plans'
+        event.wait_time = wait
+        event.finish()
+        metrics.record(event)
+
+    stats = metrics.snapshot()['get_plans']
+    assert stats['wait_time'] == 1.0
+    assert stats['mean_wait_time'] == 0.5
+    assert 'paywhirl_request_wait_seconds_total{endpoint="get_plans",method="GET",' \
+        'route="/plans"} 1.0' in metrics.to_prometheus()
+
+
+def test_direct_requests_are_keyed_by_route():
+    metrics = MetricsCollector()
+    metrics.record(RequestEvent('post', '/invoice/12/process'))
+    assert list(metrics.snapshot()) == ['POST /invoice/{id}/process']
+
+
+def test_hooks_see_every_request(transport, make_client):
+    seen = []
+    pw = make_client()
+    pw.add_hook('before_request', lambda event: seen.append(('before', event.endpoint)))
+    pw.add_hook('after_request', lambda event: seen.append(('after', event.status)))
+    transport.add('GET /account', {})
+
+    pw.get_account()
+    assert seen == [('before', 'get_account'), ('after', 200)]
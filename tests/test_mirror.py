@@ -0,0 +1,90 @@
+import sqlite3
+
+import pytest
+
+from paywhirl.mirror import Mirror
+
+
+@pytest.fixture
+def account(transport):
+    """Customers, subscriptions and invoices served by the transport."""
+
+    data = {
+        'customers': [{'id': 1, 'email': 'a@example.com'}, {'id': 2, 'email': 'b@example.com'}],
+        'subscribers': [{'id': 10, 'customer_id': 1}],
+        'invoices': {1: [{'id': 100, 'amount': 5}], 2: [{'id': 200, 'amount': 7}]},
+    }
+
+    def after(records, cursor, request):
+        start = int(request.params.get(cursor, 0))
+        return [record for record in records if record['id'] > start][:int(request.params['limit'])]
+
+    transport.add('GET /customers', lambda request: after(data['customers'], 'after_id', request))
+    transport.add('GET /subscribers',
+                  lambda request: after(data['subscribers'], 'starting_after', request))
+    transport.add('GET /invoices/{id}',
+                  lambda request: data['invoices'].get(int(request.path.rsplit('/', 1)[1]), []))
+    return data
+
+
+@pytest.fixture
+def mirror(tmp_path, make_client):
+    mirror = Mirror(make_client(), str(tmp_path / 'mirror.sqlite'), page_size=10, max_workers=2)
+    yield mirror
+    mirror.close()
+
+
+def test_sync_mirrors_everything(mirror, account):
+    report = mirror.sync()
+    assert [(table.fetched, table.inserted) for table in report.tables.values()] == \
+        [(2, 2), (1, 1), (2, 2)]
+    assert mirror.get_customer(1) == account['customers'][0]
+    assert mirror.get_subscriptions(1) == account['subscribers']
+    assert mirror.get_invoices(2) == [{'id': 200, 'amount': 7}]
+
+
+def test_regular_sync_only_fetches_new_records(mirror, account, transport):
+    mirror.sync()
+    account['customers'].append({'id': 3, 'email': 'c@example.com'})
+    account['invoices'][3] = [{'id': 300, 'amount': 1}]
+    del transport.requests[:]
+
+    report = mirror.sync()
+    assert report.tables['customers'].inserted == 1
+    assert [request.path for request in transport.requests if 'invoices' in request.path] == \
+        ['/invoices/3']
+    assert mirror.count('invoices') == 3
+
+
+def test_full_sync_updates_and_deletes(mirror, account):
+    mirror.sync()
+    account['customers'][0]['email'] = 'new@example.com'
+    del account['customers'][1]
+    account['invoices'][1] = [{'id': 101, 'amount': 6}]
+
+    report = mirror.sync(full=True)
+    assert report.tables['customers'].updated == 1
+    assert report.tables['customers'].deleted == 1
+    assert report.tables['invoices'].deleted == 2
+    assert mirror.get_customer(1)['email'] == 'new@example.com'
+    assert mirror.get_customer(2) is None
+    assert mirror.get_invoices(1) == [{'id': 101, 'amount': 6}]
+
+
+def test_unchanged_records_are_not_written(mirror, account):
+    mirror.sync()
+    report = mirror.sync(full=True)
+    assert all(table.unchanged == table.fetched for table in report.tables.values())
+
+
+@pytest.mark.skipif(not hasattr(sqlite3.Connection, 'setlimit'), reason='Python 3.11+')
+def test_customer_with_more_invoices_than_sqlite_variables(mirror, account):
+    # the default limit of sqlite before 3.32
+    mirror._connection().setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+    account['invoices'][1] = [{'id': index} for index in range(1000, 3000)]
+    mirror.sync()
+    account['invoices'][1] = account['invoices'][1][1:]
+
+    report = mirror.sync_invoices([1])
+    assert report.tables['invoices'].deleted == 1
+    assert mirror.count('invoices') == 2000
@@ -0,0 +1,72 @@
+import pytest
+
+from paywhirl import ResponseCache
+from paywhirl.models import Customer, Plan, Subscription, to_models
+
+CUSTOMER = {'id': 1, 'email': 'jane@example.com', 'first_name': 'Jane',
+            'loyalty_tier': 'gold'}
+
+
+def test_models_are_returned_when_enabled(transport, make_client):
+    pw = make_client(models=True)
+    transport.add('GET /customer/{id}', CUSTOMER)
+    transport.add('GET /customers', [CUSTOMER, dict(CUSTOMER, id=2)])
+
+    customer = pw.get_customer(1)
+    assert isinstance(customer, Customer)
+    assert (customer.id, customer.email, customer.phone) == (1, 'jane@example.com', None)
+    assert [record.id for record in pw.get_customers({})] == [1, 2]
+
+
+def test_dicts_are_returned_by_default(transport, make_client):
+    pw = make_client()
+    transport.add('GET /customer/{id}', CUSTOMER)
+
+    assert pw.get_customer(1) == CUSTOMER
+
+
+def test_models_read_like_dicts():
+    customer = Customer.from_dict(CUSTOMER)
+
+    assert customer['email'] == 'jane@example.com'
+    assert customer.get('phone', 'none') == 'none'
+    assert customer.loyalty_tier == 'gold'
+    assert customer.extra == {'loyalty_tier': 'gold'}
+    assert customer.to_dict() == CUSTOMER
+    assert set(customer) == set(CUSTOMER)
+    with pytest.raises(KeyError):
+        customer['phone']  # pylint: disable=pointless-statement
+    with pytest.raises(AttributeError):
+        customer.unknown  # pylint: disable=pointless-statement
+
+
+def test_nested_records_are_converted_when_read():
+    subscription = Subscription.from_dict({'id': 5, 'plan': {'id': 7, 'name': 'Gold'}})
+
+    assert isinstance(subscription._plan, dict)
+    assert isinstance(subscription.plan, Plan)
+    assert subscription.plan.name == 'Gold'
+    assert subscription.to_dict() == {'id': 5, 'plan': {'id': 7, 'name': 'Gold'}}
+
+
+def test_to_models_leaves_other_values_alone():
+    assert to_models(Customer, {'error': 'nope'}).extra == {'error': 'nope'}
+    assert to_models(Customer, [CUSTOMER, 'x'])[1] == 'x'
+    assert to_models(Customer, 'x') == 'x'
+
+
+def test_cached_responses_give_each_caller_its_own_records(transport, make_client):
+    pw = make_client(models=True, cache=ResponseCache())
+    transport.add('GET /plans', [{'id': 7, 'name': 'Gold'}])
+
+    first = pw.get_plans({})
+    first[0].name = 'changed'
+    assert pw.get_plans({})[0].name == 'Gold'
+    assert len(transport.requests) == 1
+
+
+def test_streamed_records_are_models(transport, make_client):
+    pw = make_client(models=True)
+    transport.add('GET /customers', [CUSTOMER, dict(CUSTOMER, id=2)])
+
+    assert [type(record) for record in pw.stream_customers()] == [Customer, Customer]
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from paywhirl.pagination import apaginate, paginate
+
+
+def pages_of(records, cap=None, ignore_cursor=False):
+    requests = []
+
+    def fetch(params):
+        requests.append(params)
+        after = 0 if ignore_cursor else params.get('after_id', 0)
+        return [record for record in records if record['id'] > after][:cap or params['limit']]
+
+    return fetch, requests
+
+
+@pytest.mark.parametrize('prefetch', [False, True])
+def test_short_page_ends_iteration(prefetch):
+    records = [{'id': index} for index in range(1, 8)]
+    fetch, requests = pages_of(records)
+
+    assert list(paginate(fetch, None, 'after_id', page_size=3, prefetch=prefetch)) == records
+    assert [params.get('after_id') for params in requests] == [None, 3, 6]
+    assert all(params['limit'] == 3 for params in requests)
+
+
+@pytest.mark.parametrize('prefetch', [False, True])
+def test_full_last_page_needs_one_more_request(prefetch):
+    records = [{'id': index} for index in range(1, 7)]
+    fetch, requests = pages_of(records)
+
+    assert list(paginate(fetch, None, 'after_id', page_size=3, prefetch=prefetch)) == records
+    assert [params.get('after_id') for params in requests] == [None, 3, 6]
+
+
+@pytest.mark.parametrize('prefetch', [False, True])
+def test_ignored_cursor_raises(prefetch):
+    fetch, requests = pages_of([{'id': index} for index in range(1, 8)], ignore_cursor=True)
+
+    with pytest.raises(ValueError, match='did not advance'):
+        list(paginate(fetch, None, 'after_id', page_size=3, prefetch=prefetch))
+    assert len(requests) == 2
+
+
+def test_starts_after_the_given_cursor():
+    fetch, requests = pages_of([{'id': index} for index in range(1, 8)])
+
+    assert [record['id'] for record in paginate(fetch, {'after_id': 5}, 'after_id')] == [6, 7]
+    assert len(requests) == 1
+
+
+@pytest.mark.parametrize('prefetch', [False, True])
+def test_apaginate(prefetch):
+    records = [{'id': index} for index in range(1, 8)]
+    fetch, requests = pages_of(records)
+
+    async def fetch_async(params):
+        return fetch(params)
+
+    async def collect():
+        return [record async for record in apaginate(fetch_async, None, 'after_id',
+                                                     page_size=3, prefetch=prefetch)]
+
+    assert asyncio.run(collect()) == records
+    assert len(requests) == 3
+
+
+def test_iter_customers_walks_the_client(transport, make_client):
+    pages = {None: [{'id': 1}, {'id': 2}], '2': [{'id': 3}]}
+    transport.add('GET /customers',
+                  lambda request: pages[request.params.get('after_id')])
+    pw = make_client()
+
+    assert [record['id'] for record in pw.iter_customers(page_size=2)] == [1, 2, 3]
+    assert len(transport.requests) == 2
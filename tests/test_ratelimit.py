@@ -0,0 +1,97 @@
+import time
+from email.utils import formatdate
+
+import pytest
+
+from paywhirl import HTTPError, RateLimiter
+from paywhirl.ratelimit import parse_retry_after
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace time.monotonic() with a clock advanced by hand."""
+
+    now = [1000.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+
+    def advance(seconds):
+        now[0] += seconds
+
+    return advance
+
+
+def test_burst_then_sustained_rate(clock):
+    limiter = RateLimiter(rate=10, burst=2)
+
+    assert [limiter.reserve() for _ in range(2)] == [0.0, 0.0]
+    assert limiter.reserve() == pytest.approx(0.1)
+    clock(1.0)
+    # refilled up to burst only
+    assert [limiter.reserve() for _ in range(2)] == [0.0, 0.0]
+    assert limiter.reserve() > 0
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('5', 5.0), ('0.5', 0.5), ('-3', 0.0), ('', None), (None, None), ('soon', None)])
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    assert parse_retry_after(formatdate(time.time() + 30, usegmt=True)) == pytest.approx(30, abs=2)
+    assert parse_retry_after(formatdate(time.time() - 30, usegmt=True)) == 0.0
+
+
+def test_retry_after_pauses_every_caller(clock):
+    limiter = RateLimiter(rate=100, adaptive=False)
+    limiter.observe(503, {'Retry-After': '5'})
+
+    assert limiter.reserve() == pytest.approx(5)
+    clock(5)
+    assert limiter.reserve() == 0.0
+
+
+def test_ratelimit_reset_seconds(clock):
+    limiter = RateLimiter(rate=100, adaptive=False)
+    limiter.observe(200, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '30'})
+
+    assert limiter.reserve() == pytest.approx(30)
+
+
+def test_ratelimit_reset_epoch_timestamp(clock):
+    limiter = RateLimiter(rate=100, adaptive=False)
+    reset = str(int(time.time()) + 20)
+    limiter.observe(200, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': reset})
+
+    assert limiter.reserve() == pytest.approx(20, abs=1.5)
+
+
+def test_ratelimit_reset_ignored_while_requests_remain(clock):
+    limiter = RateLimiter(rate=100, adaptive=False)
+    limiter.observe(200, {'X-RateLimit-Remaining': '3', 'X-RateLimit-Reset': '30'})
+
+    assert limiter.reserve() == 0.0
+
+
+def test_adaptive_rate(clock):
+    limiter = RateLimiter(rate=8, min_rate=3)
+
+    limiter.observe(429, {})
+    assert limiter.rate == 4
+    limiter.observe(429, {})
+    assert limiter.rate == 3
+    for _ in range(200):
+        limiter.observe(200, {})
+    assert limiter.rate == 8
+
+
+def test_client_waits_after_a_429(transport, make_client, sleeps):
+    limiter = RateLimiter(rate=100, adaptive=False)
+    pw = make_client(rate_limiter=limiter, retry_policies={})
+    transport.add('GET /account', (429, {}, {'Retry-After': '2'}))
+
+    with pytest.raises(HTTPError):
+        pw.get_account()
+    transport.add('GET /account', {'id': 1})
+    assert pw.get_account() == {'id': 1}
+    assert sleeps and sleeps[0] == pytest.approx(2, abs=0.5)
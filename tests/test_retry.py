@@ -0,0 +1,105 @@
+import pytest
+
+from paywhirl import HTTPError, RetryPolicy
+
+
+def flaky(*responses):
+    """A MemoryTransport response answering with each of responses in turn."""
+
+    remaining = list(responses)
+
+    def respond(request):
+        response = remaining.pop(0)
+        if isinstance(response, BaseException):
+            raise response
+        return response
+
+    return respond
+
+
+def test_get_is_retried_until_it_succeeds(transport, make_client, sleeps):
+    policy = RetryPolicy(max_retries=3, jitter=False, backoff_factor=0.1)
+    pw = make_client(retry_policies={'get': policy})
+    transport.add('GET /account', flaky(ConnectionError(), (503, {}), {'id': 1}))
+
+    assert pw.get_account() == {'id': 1}
+    assert len(transport.requests) == 3
+    assert sleeps == [0.1, 0.2]
+    assert policy.stats.snapshot() == {'retries': 2, 'recovered': 1, 'exhausted': 0}
+
+
+def test_retry_after_sets_the_minimum_delay(transport, make_client, sleeps):
+    policy = RetryPolicy(max_retries=1, jitter=False, backoff_factor=0.1)
+    pw = make_client(retry_policies={'get': policy})
+    transport.add('GET /account', flaky((429, {}, {'Retry-After': '4'}), {'id': 1}))
+
+    assert pw.get_account() == {'id': 1}
+    assert sleeps == [4]
+
+
+def test_retry_after_is_capped_by_max_backoff(transport, make_client, sleeps):
+    policy = RetryPolicy(max_retries=1, jitter=False, max_backoff=2)
+    pw = make_client(retry_policies={'get': policy})
+    transport.add('GET /account', flaky((429, {}, {'Retry-After': '600'}), {'id': 1}))
+
+    pw.get_account()
+    assert sleeps == [2]
+
+
+def test_exhausted_retries_raise(transport, make_client, sleeps):
+    policy = RetryPolicy(max_retries=2, jitter=False)
+    pw = make_client(retry_policies={'get': policy})
+    transport.add('GET /account', (500, {'error': 'down'}))
+
+    with pytest.raises(HTTPError) as raised:
+        pw.get_account()
+    assert raised.value.response.status_code == 500
+    assert len(transport.requests) == 3
+    assert len(sleeps) == 2
+    assert policy.stats.exhausted == 1
+
+
+def test_statuses_not_listed_are_not_retried(transport, make_client, sleeps):
+    pw = make_client(retry_policies={'get': RetryPolicy()})
+    transport.add('GET /account', (404, {}))
+
+    with pytest.raises(HTTPError):
+        pw.get_account()
+    assert len(transport.requests) == 1
+    assert not sleeps
+
+
+def test_post_without_idempotency_key_is_not_retried(transport, make_client, sleeps):
+    pw = make_client(retry_policies={'post': RetryPolicy(jitter=False)})
+    transport.add('POST /update/customer', flaky(TimeoutError(), {'id': 1}))
+
+    with pytest.raises(TimeoutError):
+        pw.update_customer({'id': 1})
+    assert len(transport.requests) == 1
+
+
+def test_keyed_post_is_retried_with_the_same_key(transport, make_client, sleeps):
+    pw = make_client(retry_policies={'post': RetryPolicy(jitter=False)})
+    transport.add('POST /create/charge', flaky(TimeoutError(), (502, {}), {'id': 7}))
+
+    assert pw.create_charge({'amount': 5}) == {'id': 7}
+    keys = set(request.headers['Idempotency-Key'] for request in transport.requests)
+    assert len(transport.requests) == 3
+    assert len(keys) == 1
+
+
+def test_get_is_retried_by_default(transport, make_client, sleeps):
+    pw = make_client()
+    transport.add('GET /account', flaky((503, {}), {'id': 1}))
+
+    assert pw.get_account() == {'id': 1}
+    assert len(transport.requests) == 2
+
+
+def test_retries_can_be_disabled(transport, make_client, sleeps):
+    pw = make_client(retry_policies={})
+    transport.add('GET /account', flaky((503, {}), {'id': 1}))
+
+    with pytest.raises(HTTPError):
+        pw.get_account()
+    assert len(transport.requests) == 1
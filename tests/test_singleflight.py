@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+
+from paywhirl import SingleFlight
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.001)
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {'id': 7}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do('plan', fetch)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flight.do('plan', fetch)))
+                 for _ in range(10)]
+    for thread in followers:
+        thread.start()
+    wait_until(lambda: flight.coalesced == 10)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == [{'id': 7}] * 11
+    assert all(result is results[0] for result in results)
+
+
+def test_errors_are_shared_and_not_remembered():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError('boom')
+
+    with pytest.raises(ValueError):
+        flight.do('plan', fail)
+    assert flight.do('plan', lambda: 1) == 1
+
+
+def test_client_coalesces_identical_gets(transport, make_client):
+    flight = SingleFlight()
+    pw = make_client(single_flight=flight)
+    release = threading.Event()
+
+    def plan(request):
+        release.wait(5)
+        return {'id': 7}
+
+    transport.add('GET /plan/{id}', plan)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(pw.get_plan(7)))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    wait_until(lambda: flight.coalesced == 4)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == [{'id': 7}] * 5
+    assert len(transport.requests) == 1
+
+
+def test_clients_of_different_accounts_are_not_coalesced(transport, make_client):
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def plan(request):
+        release.wait(5)
+        return {'account': request.headers['api-key']}
+
+    transport.add('GET /plan/{id}', plan)
+    clients = [make_client(api_key=key, single_flight=flight) for key in ('first', 'second')]
+    results = {}
+    threads = [threading.Thread(target=lambda pw=pw: results.update({pw: pw.get_plan(7)}))
+               for pw in clients]
+    for thread in threads:
+        thread.start()
+    wait_until(lambda: len(transport.requests) == 2)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert flight.coalesced == 0
+    assert [results[pw] for pw in clients] == [{'account': 'first'}, {'account': 'second'}]
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from paywhirl.codec import JSONCodec
+from paywhirl.streaming import ArrayParser, iter_array
+
+RECORDS = [
+    {'id': 1, 'email': 'a@example.com', 'tags': ['x', {'y': '}]'}]},
+    {'id': 2, 'note': 'quote \\" and backslash \\\\ and é'},
+    'a "string" item',
+    -12.5e3,
+    12345,
+    True,
+    None,
+    [],
+    {},
+]
+
+
+class RecordingCodec(JSONCodec):
+    """The json module, counting the documents it decoded."""
+
+    name = 'recording'
+
+    def __init__(self):
+        self.loaded = []
+
+    def dumps(self, obj):
+        return json.dumps(obj).encode('utf-8')
+
+    def loads(self, data):
+        self.loaded.append(data)
+        return json.loads(data)
+
+
+@pytest.fixture(params=['json', 'codec'])
+def codec(request):
+    return RecordingCodec() if request.param == 'codec' else None
+
+
+def split(data, cuts):
+    bounds = [0] + list(cuts) + [len(data)]
+    return [data[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 64])
+def test_fixed_chunk_sizes(size, codec):
+    data = json.dumps(RECORDS, ensure_ascii=False).encode('utf-8')
+    assert list(iter_array(split(data, range(size, len(data), size)), codec)) == RECORDS
+
+
+def test_every_two_chunk_split(codec):
+    data = json.dumps(RECORDS, ensure_ascii=False).encode('utf-8')
+    for cut in range(len(data) + 1):
+        assert list(iter_array(split(data, [cut]), codec)) == RECORDS
+
+
+def test_records_are_handed_out_once_complete(codec):
+    parser = ArrayParser(codec)
+    assert parser.feed(b'[{"id": 1}, {"id"') == [{'id': 1}]
+    assert parser.feed(b': 2, "nested": {"a": [') == []
+    assert parser.feed(b']}}, 3') == [{'id': 2, 'nested': {'a': []}}]
+    # the number may go on in the next chunk
+    assert parser.feed(b'4') == []
+    assert parser.feed(b']') == [34]
+    assert parser.close() == []
+
+
+@pytest.mark.parametrize('body', [b'[{"id": 1}', b'[1, 2', b'[{"id": tru}]', b'[1 2]'])
+def test_invalid_or_truncated(body, codec):
+    for cut in range(1, len(body)):
+        with pytest.raises(ValueError):
+            list(iter_array(split(body, [cut]), codec))
+
+
+def test_error_object_is_reported(codec):
+    with pytest.raises(ValueError, match='expected a list page'):
+        list(iter_array([b'{"error": ', b'"denied"}'], codec))
+
+
+def test_large_record_split_in_many_chunks(codec):
+    record = {'id': 1, 'blob': 'x' * 200000, 'items': [{'n': n} for n in range(2000)]}
+    data = json.dumps([record, {'id': 2}]).encode('utf-8')
+    chunks = split(data, range(1000, len(data), 1000))
+    assert list(iter_array(chunks, codec)) == [record, {'id': 2}]
+
+
+def test_elements_are_decoded_by_the_codec():
+    codec = RecordingCodec()
+    assert list(iter_array([b'[{"id": 1}, "a", ', b'2.5, true]'], codec)) == [
+        {'id': 1}, 'a', 2.5, True]
+    assert codec.loaded == [b'{"id": 1}', b'"a"', b'2.5', b'true']
+
+
+def test_client_streams_through_its_codec(transport, make_client):
+    codec = RecordingCodec()
+    pw = make_client(json_codec=codec)
+    transport.add('GET /customers', [{'id': 1}, {'id': 2}])
+
+    assert list(pw.stream_customers()) == [{'id': 1}, {'id': 2}]
+    assert codec.loaded == [b'{"id": 1}', b'{"id": 2}']
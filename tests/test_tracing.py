@@ -0,0 +1,61 @@
+import importlib.util
+
+import pytest
+
+from paywhirl.tracing import Tracer
+
+
+@pytest.mark.skipif(importlib.util.find_spec('opentelemetry') is not None,
+                    reason='opentelemetry is installed')
+def test_tracer_is_disabled_without_opentelemetry(transport, make_client):
+    tracer = Tracer()
+    pw = make_client(tracer=tracer)
+    transport.add('GET /account', {'id': 1})
+
+    assert not tracer.enabled
+    assert pw.get_account() == {'id': 1}
+
+
+@pytest.fixture
+def spans():
+    sdk_trace = pytest.importorskip('opentelemetry.sdk.trace')
+    export = pytest.importorskip('opentelemetry.sdk.trace.export')
+    in_memory = pytest.importorskip('opentelemetry.sdk.trace.export.in_memory_span_exporter')
+
+    exporter = in_memory.InMemorySpanExporter()
+    provider = sdk_trace.TracerProvider()
+    provider.add_span_processor(export.SimpleSpanProcessor(exporter))
+    return provider.get_tracer('test'), exporter
+
+
+def test_span_per_request(spans, transport, make_client):
+    otel_tracer, exporter = spans
+    pw = make_client(tracer=Tracer(otel_tracer))
+    transport.add('GET /customer/{id}', {'id': 123})
+
+    with otel_tracer.start_as_current_span('job') as parent:
+        pw.get_customer(123)
+
+    span = next(span for span in exporter.get_finished_spans() if span.name != 'job')
+    assert span.name == 'PayWhirl get_customer'
+    assert span.parent.span_id == parent.get_span_context().span_id
+    assert span.attributes['http.method'] == 'GET'
+    assert span.attributes['http.route'] == '/customer/{id}'
+    assert span.attributes['http.status_code'] == 200
+    assert span.attributes['paywhirl.attempts'] == 1
+
+
+def test_failed_request_marks_the_span(spans, transport, make_client):
+    from opentelemetry.trace import StatusCode
+    from paywhirl import HTTPError
+
+    otel_tracer, exporter = spans
+    pw = make_client(tracer=Tracer(otel_tracer), retry_policies={})
+    transport.add('GET /customer/{id}', (404, {'error': 'not found'}))
+
+    with pytest.raises(HTTPError):
+        pw.get_customer(1)
+
+    [span] = exporter.get_finished_spans()
+    assert span.status.status_code == StatusCode.ERROR
+    assert span.attributes['http.status_code'] == 404
@@ -0,0 +1,69 @@
+import os
+import socket
+import ssl
+from types import SimpleNamespace
+
+import pytest
+
+from paywhirl import PayWhirl, RetryPolicy
+from paywhirl.transport import TRANSPORTS, MemoryTransport, _dropped, get_transport
+
+
+class RecordingTransport(MemoryTransport):
+    """A MemoryTransport remembering the options it was created with."""
+
+    name = 'recording'
+
+    def __init__(self, **options):
+        super().__init__()
+        self.options = options
+
+
+def test_certificate_errors_are_not_retried(transport, make_client, sleeps):
+    def respond(request):
+        try:
+            raise ssl.SSLCertVerificationError('certificate verify failed')
+        except ssl.SSLCertVerificationError as err:
+            # how requests and urllib3 report it
+            raise ConnectionError('connection failed') from err
+
+    pw = make_client(retry_policies={'get': RetryPolicy(max_retries=3)})
+    transport.add('GET /account', respond)
+
+    with pytest.raises(ConnectionError):
+        pw.get_account()
+    assert len(transport.requests) == 1
+    assert sleeps == []
+
+
+def test_get_transport_passes_options(monkeypatch):
+    monkeypatch.setitem(TRANSPORTS, 'recording', RecordingTransport)
+
+    transport = get_transport('recording', pool_maxsize=4, prior_knowledge=True)
+    assert transport.options == {'pool_connections': 10, 'pool_maxsize': 4,
+                                 'pool_block': False, 'prior_knowledge': True}
+
+    with PayWhirl('key', 'secret', transport='recording',
+                  transport_options={'prior_knowledge': True}) as pw:
+        assert pw._transport.options['prior_knowledge'] is True
+
+
+def test_dropped_with_descriptors_above_fd_setsize():
+    try:
+        import resource
+    except ImportError:
+        pytest.skip('no resource module')
+    if resource.getrlimit(resource.RLIMIT_NOFILE)[0] <= 2048:
+        pytest.skip('descriptor limit too low')
+
+    local, remote = socket.socketpair()
+    high = socket.socket(fileno=os.dup2(local.fileno(), 2000))
+    local.close()
+    try:
+        conn = SimpleNamespace(sock=high)
+        assert not _dropped(conn)
+        remote.close()
+        assert _dropped(conn)
+    finally:
+        high.close()
+        remote.close()
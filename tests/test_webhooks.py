@@ -0,0 +1,75 @@
+import json
+import logging
+
+import pytest
+
+from paywhirl.models import Invoice
+from paywhirl.webhooks import (SignatureError, WebhookDispatcher, sign,
+                               verify_signature)
+
+SECRET = 'whsec'
+BODY = json.dumps({'id': 'evt_1', 'type': 'invoice.paid',
+                   'data': {'id': 9, 'amount_due': 100}}).encode('utf-8')
+
+
+def test_valid_signature():
+    verify_signature(BODY, sign(BODY, SECRET), [SECRET])
+    verify_signature(BODY, sign(BODY, SECRET).upper() + '\n', [SECRET])
+
+
+def test_tampered_payload():
+    signature = sign(BODY, SECRET)
+    with pytest.raises(SignatureError, match='does not match'):
+        verify_signature(BODY.replace(b'100', b'1'), signature, [SECRET])
+    with pytest.raises(SignatureError, match='does not match'):
+        verify_signature(BODY, sign(BODY, 'other'), [SECRET])
+
+
+@pytest.mark.parametrize('signature', [None, ''])
+def test_missing_signature(signature):
+    with pytest.raises(SignatureError, match='missing'):
+        verify_signature(BODY, signature, [SECRET])
+
+
+def test_rotated_secrets():
+    verify_signature(BODY, sign(BODY, 'old'), ['new', 'old'])
+
+
+def test_dispatcher_rejects_bad_signatures_before_handling():
+    handled = []
+    hooks = WebhookDispatcher(SECRET, max_workers=0)
+    hooks.on('*', handled.append)
+
+    with pytest.raises(SignatureError):
+        hooks.receive(BODY, None)
+    with pytest.raises(SignatureError):
+        hooks.receive(BODY + b' ', sign(BODY, SECRET))
+    assert handled == []
+    assert hooks.stats()['rejected'] == 2
+
+
+def test_dispatcher_handles_an_event_once():
+    handled = []
+    hooks = WebhookDispatcher(SECRET, max_workers=0)
+    hooks.on('invoice.paid', handled.append)
+
+    event = hooks.receive(BODY, sign(BODY, SECRET))
+    assert hooks.receive(BODY, sign(BODY, SECRET)) is None
+    assert handled == [event]
+    assert isinstance(event.data, Invoice) and event.data.amount_due == 100
+
+
+def test_handler_errors_are_logged(caplog):
+    def fail(event):
+        raise RuntimeError('boom')
+
+    with WebhookDispatcher(SECRET, max_workers=1) as hooks:
+        hooks.on('invoice.paid', fail)
+        with caplog.at_level(logging.ERROR, logger='paywhirl.webhooks'):
+            hooks.receive(BODY, sign(BODY, SECRET))
+            hooks.join()
+
+    [record] = caplog.records
+    assert 'evt_1' in record.getMessage()
+    assert record.exc_info[1].args == ('boom',)
+    assert hooks.stats()['failed'] == 1
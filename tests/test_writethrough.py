@@ -0,0 +1,88 @@
+from paywhirl import ResponseCache
+from paywhirl.endpoints import ENDPOINTS
+
+
+def address(request):
+    return {'id': int(request.path.rsplit('/', 1)[1]), 'city': 'Paris'}
+
+
+def test_updated_record_is_written_through(transport, make_client):
+    cache = ResponseCache(ttls={'addresses': 60})
+    pw = make_client(cache=cache)
+    transport.add('PATCH /customer/address/{id}', address)
+
+    pw.update_address(1, {'city': 'Paris'})
+    assert pw.get_address(1) == {'id': 1, 'city': 'Paris'}
+    assert [request.method for request in transport.requests] == ['PATCH']
+
+
+def test_updating_one_record_keeps_the_others(transport, make_client):
+    cache = ResponseCache(ttls={'addresses': 60})
+    pw = make_client(cache=cache)
+    transport.add('PATCH /customer/address/{id}', address)
+
+    pw.update_address(1, {'city': 'Paris'})
+    pw.update_address(2, {'city': 'Paris'})
+    stats = cache.stats()
+    assert stats['invalidations'] == 0
+    assert stats['size'] == 2
+    pw.get_address(1)
+    assert [request.method for request in transport.requests] == ['PATCH', 'PATCH']
+
+
+def test_delete_drops_the_group(transport, make_client):
+    cache = ResponseCache(ttls={'addresses': 60})
+    pw = make_client(cache=cache)
+    transport.add('PATCH /customer/address/{id}', address)
+    transport.add('DELETE /customer/address/{id}', {'status': 'success'})
+    transport.add('GET /customer/address/{id}', address)
+
+    pw.update_address(1, {'city': 'Paris'})
+    pw.delete_address(2)
+    pw.get_address(1)
+    assert [request.method for request in transport.requests] == ['PATCH', 'DELETE', 'GET']
+
+
+def test_write_without_a_record_invalidates(transport, make_client):
+    cache = ResponseCache(ttls={'addresses': 60})
+    pw = make_client(cache=cache)
+    transport.add('PATCH /customer/address/{id}', address)
+    transport.add('GET /customer/address/{id}', address)
+
+    pw.update_address(1, {'city': 'Paris'})
+    transport.add('PATCH /customer/address/{id}', {'error': 'oops'})
+    pw.update_address(1, {'city': 'Lyon'})
+    pw.get_address(1)
+    assert transport.requests[-1].method == 'GET'
+
+
+def test_record_groups_are_opt_in(transport, make_client):
+    pw = make_client(cache=ResponseCache(ttl=60))
+    transport.add('PATCH /customer/address/{id}', address)
+    transport.add('GET /customer/address/{id}', address)
+
+    pw.update_address(1, {'city': 'Paris'})
+    pw.get_address(1)
+    assert [request.method for request in transport.requests] == ['PATCH', 'GET']
+
+
+def test_every_write_to_cached_records_invalidates():
+    # endpoints changing no record that can be cached
+    unrelated = {'auth_customer', 'create_customer', 'update_answer', 'create_charge',
+                 'send_email', 'get_multi_auth_token'}
+    for entry in ENDPOINTS.values():
+        if entry.verb != 'get' and entry.name not in unrelated:
+            assert entry.writes or entry.invalidates, entry.name
+
+
+def test_new_card_drops_cached_customers(transport, make_client):
+    cache = ResponseCache(ttls={'customers': 60})
+    pw = make_client(cache=cache)
+    transport.add('POST /update/customer', {'id': 1, 'email': 'a@example.com'})
+    transport.add('POST /create/card', {'id': 9})
+    transport.add('GET /customer/{id}', {'id': 1})
+
+    pw.update_customer({'id': 1, 'email': 'a@example.com'})
+    pw.create_card({'customer_id': 1})
+    pw.get_customer(1)
+    assert transport.requests[-1].method == 'GET'